@@ -1,22 +1,158 @@
 from llm.prompt_builder import GeoAwarePromptBuilder
 from llm.yaml_prompt_loader import YamlPromptLoader
-from geo_profiler.geo_profiler import GeoProfiler
+from llm.completion_cache import CompletionCache
+from llm.rate_limiter import AsyncRateLimiter, is_retryable_error, retry_delay
+from llm.token_budget import PromptBudgetReport, compact_sample, estimate_tokens
+from llm.batch_output import parse_batch_output
 from geo_profiler.models import GeoProfile
-from pandas import DataFrame
-import pandas as pd
+from geo_profiler.instrumentation import async_span, record_span, span
+from dataclasses import dataclass, field
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# pandas and the profilers are imported on first use, so that importing this module and
+# building prompts stays cheap for short-lived workers
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from geo_profiler.columnar import ColumnarSource
+    from geo_profiler.batch import BatchProfileResult, CatalogItem
+    from geo_profiler.profile_cache import GeoProfileCache
+
+# Expected completion size used to reserve tokens/min budget before a request is sent
+ESTIMATED_COMPLETION_TOKENS = 400
+
+
+# Outcome of one item of an async description batch
+@dataclass
+class DescriptionResult:
+    key: Hashable
+    description: Optional[str] = None
+    prompt: Optional[str] = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+    latency: float = 0.0
+    prompt_report: Optional[PromptBudgetReport] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Outcome of one dataset of a batched (multi-dataset) request
+@dataclass
+class BatchDescriptionResult:
+    key: Hashable
+    description: Optional[str] = None
+    search_description: Optional[str] = None
+    prompt: Optional[str] = None
+    batched: bool = True                # False when produced by the per-dataset fallback
+    problem: Optional[str] = None       # why the batched answer was not used for this dataset
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def response_usage(response) -> Dict[str, int]:
+    """
+    Token counts reported by an OpenAI-style completion response (empty when it has none).
+    """
+    usage = getattr(response, "usage", None)
+    counts = {}
+    for name in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = getattr(usage, name, None) if usage is not None else None
+        if isinstance(value, int):
+            counts[name] = value
+    return counts
+
+
+def chunk_text(chunk) -> str:
+    """
+    Text delta of one OpenAI-style streaming chunk ("" for role-only and usage chunks).
+    """
+    choices = getattr(chunk, "choices", None)
+    if not choices:
+        return ""
+    delta = getattr(choices[0], "delta", None)
+    return (getattr(delta, "content", None) or "") if delta is not None else ""
+
+
+@dataclass
+class DescriptionStream:
+    """
+    A description being streamed. Iterate it (with `for` after stream_geoaware_description,
+    `async for` after astream_geoaware_description) to receive text deltas as they
+    arrive; the request is sent when iteration starts. Once exhausted, `description`
+    holds the full (stripped) text, and `time_to_first_token` / `total_time` the seconds
+    from sending the request to the first delta and to the end of the stream.
+    """
+    prompt: str
+    description: Optional[str] = None
+    time_to_first_token: Optional[float] = None
+    total_time: Optional[float] = None
+    cached: bool = False
+    usage: Dict[str, int] = field(default_factory=dict)
+    _deltas: Any = field(default=None, repr=False)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._deltas
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._deltas
+
+    def result(self) -> Tuple[str, str]:
+        """
+        Consumes the remaining deltas; (description, prompt) like generate_geoaware_description.
+        """
+        for _ in self._deltas:
+            pass
+        return (self.description, self.prompt)
+
+    async def aresult(self) -> Tuple[str, str]:
+        async for _ in self._deltas:
+            pass
+        return (self.description, self.prompt)
+
 
 class AutoDDGGeo:
 
-    def __init__(self, client, model_name: str, temperature: float = 0.0):
+    def __init__(self, client, model_name: str, temperature: float = 0.0, async_client=None,
+        cache: Optional[CompletionCache] = None,
+        prompt_token_budget: Optional[int] = None,
+        geo_cache: Optional["GeoProfileCache"] = None):
         self.client = client
+        self.async_client = async_client
+        self.cache = cache
+        self.prompt_token_budget = prompt_token_budget
+        self.geo_cache = geo_cache
+        self.last_prompt_report: Optional[PromptBudgetReport] = None
         self.model_name = model_name
         self.temperature = float(temperature)
         self.loader = YamlPromptLoader("prompts.yaml")
-        self.system_message = self.loader.get("system_message")
+        self.system_message = self.loader.get("dataset_description")["system_message"]
+
+    def analyze_geo(self, semantic_profile: str | None, df: "DataFrame | ColumnarSource") -> GeoProfile:
+        """
+        GeoProfile of a DataFrame, a Parquet file path or a pyarrow Table. Without a
+        semantic profile (None), column semantics are inferred locally from the values.
+        """
+        from geo_profiler.geo_profiler import GeoProfiler
+        if semantic_profile is None:
+            with span("analyze_geo", local=True):
+                return GeoProfiler.infer_geo_profile_local(df, cache=self.geo_cache)
+        with span("analyze_geo"):
+            return GeoProfiler.infer_geo_profile(semantic_profile, df, cache=self.geo_cache)
+
+    def analyze_geo_batch(self, items: Sequence["CatalogItem"],
+        max_workers: Optional[int] = None) -> List["BatchProfileResult"]:
+        """
+        Profiles many (semantic profile, dataset path) pairs in parallel; see profile_catalog.
+        """
+        from geo_profiler.batch import profile_catalog
+        return profile_catalog(items, max_workers=max_workers)
 
-    def analyze_geo(self, semantic_profile: str, df: DataFrame) -> GeoProfile:
-        return GeoProfiler.infer_geo_profile(semantic_profile, df)
-    
     def generate_geoaware_description(self, dataset_sample: str,
         dataset_profile: str | None = None,
         use_profile: bool = False,
@@ -29,9 +165,7 @@ class AutoDDGGeo:
         """
         Generates a geo-aware dataset description based on the inferred GeoProfile.
         """
-        builder = GeoAwarePromptBuilder(prompt_type="dataset_description")
-
-        prompt = builder.build_geo_aware_prompt(
+        prompt, self.last_prompt_report = self.build_geoaware_prompt(
             dataset_sample=dataset_sample,
             dataset_profile=dataset_profile,
             use_profile=use_profile,
@@ -43,15 +177,325 @@ class AutoDDGGeo:
             use_geo_profile=use_geo_profile
         )
 
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": self.system_message},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=self.temperature
-        )
+        cache_key = self._cache_key(prompt)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return (cached, prompt)
+
+        description = self._complete(prompt)
+        if cache_key:
+            self.cache.put(cache_key, description)
+
+        return (description, prompt)
+
+    def stream_geoaware_description(self, **prompt_kwargs) -> DescriptionStream:
+        """
+        Streaming variant of generate_geoaware_description (same keyword arguments): the
+        completion is requested with `stream=True` and its text deltas are yielded as
+        they arrive, so a UI can show the description while it is generated. The prompt
+        is built immediately; see DescriptionStream for the result and timings. A cached
+        completion is yielded as a single delta.
+        """
+        prompt, self.last_prompt_report = self.build_geoaware_prompt(**prompt_kwargs)
+        stream = DescriptionStream(prompt=prompt)
+        stream._deltas = self._stream_deltas(stream)
+        return stream
+
+    def astream_geoaware_description(self, **prompt_kwargs) -> DescriptionStream:
+        """
+        Like stream_geoaware_description with `self.async_client`; iterate the result
+        with `async for`. Streams are not retried, since deltas already shown cannot be
+        taken back.
+        """
+        if self.async_client is None:
+            raise ValueError("astream_geoaware_description requires an async_client")
+        prompt, self.last_prompt_report = self.build_geoaware_prompt(**prompt_kwargs)
+        stream = DescriptionStream(prompt=prompt)
+        stream._deltas = self._astream_deltas(stream)
+        return stream
+
+    def _stream_deltas(self, stream: DescriptionStream) -> Iterator[str]:
+        cache_key = self._cache_key(stream.prompt)
+        cached = self.cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self._finish_stream(stream, [cached], time.time(), time.perf_counter(), cached=True)
+            yield cached
+            return
+
+        start, started = time.time(), time.perf_counter()
+        parts: List[str] = []
+        try:
+            chunks = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=self._messages(stream.prompt),
+                temperature=self.temperature,
+                stream=True
+            )
+            for chunk in chunks:
+                stream.usage.update(response_usage(chunk))
+                delta = chunk_text(chunk)
+                if delta:
+                    if stream.time_to_first_token is None:
+                        stream.time_to_first_token = time.perf_counter() - started
+                    parts.append(delta)
+                    yield delta
+        except BaseException as exc:
+            self._finish_stream(stream, parts, start, started, error=type(exc).__name__)
+            raise
+        self._finish_stream(stream, parts, start, started)
+        if cache_key:
+            self.cache.put(cache_key, stream.description)
+
+    async def _astream_deltas(self, stream: DescriptionStream) -> AsyncIterator[str]:
+        cache_key = self._cache_key(stream.prompt)
+        cached = self.cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self._finish_stream(stream, [cached], time.time(), time.perf_counter(), cached=True)
+            yield cached
+            return
+
+        start, started = time.time(), time.perf_counter()
+        parts: List[str] = []
+        try:
+            chunks = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._messages(stream.prompt),
+                temperature=self.temperature,
+                stream=True
+            )
+            async for chunk in chunks:
+                stream.usage.update(response_usage(chunk))
+                delta = chunk_text(chunk)
+                if delta:
+                    if stream.time_to_first_token is None:
+                        stream.time_to_first_token = time.perf_counter() - started
+                    parts.append(delta)
+                    yield delta
+        except BaseException as exc:
+            self._finish_stream(stream, parts, start, started, error=type(exc).__name__)
+            raise
+        self._finish_stream(stream, parts, start, started)
+        if cache_key:
+            self.cache.put(cache_key, stream.description)
+
+    def _finish_stream(self, stream: DescriptionStream, parts: List[str], start: float, started: float,
+        cached: bool = False, error: Optional[str] = None) -> None:
+        # The span is emitted after the fact: one held open across yields would become
+        # the parent of whatever the consumer does between deltas
+        stream.total_time = time.perf_counter() - started
+        if stream.time_to_first_token is None and parts:
+            stream.time_to_first_token = stream.total_time
+        stream.cached = cached
+        if error is None:
+            stream.description = "".join(parts).strip()
+        if not cached:
+            record_span("llm.completion", start, stream.total_time, error=error,
+                        model=self.model_name, prompt_chars=len(stream.prompt), stream=True,
+                        completion_chars=len("".join(parts).strip()),
+                        time_to_first_token=stream.time_to_first_token, **stream.usage)
+
+    def expand_geo_description_for_search(self, description: str, topic: str | None, geo_profile: GeoProfile) -> str:
+        """
+        Search-oriented expansion of a description (see build_geo_search_prompt).
+        """
+        prompt = GeoAwarePromptBuilder().build_geo_search_prompt(description, topic or "", geo_profile)
+        cache_key = self._cache_key(prompt)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        expanded = self._complete(prompt)
+        if cache_key:
+            self.cache.put(cache_key, expanded)
+        return expanded
+
+    def generate_geoaware_descriptions_batched(self,
+        items: Iterable[Tuple[Hashable, Dict[str, Any]]],
+        batch_size: int = 8,
+        json_mode: bool = True) -> List[BatchDescriptionResult]:
+        """
+        Generates descriptions and search expansions for many datasets with one request
+        per `batch_size` datasets instead of two per dataset.
+
+        `items` are (key, kwargs) pairs where kwargs are the arguments of
+        generate_geoaware_description; keys must be distinct as strings, since they
+        become the dataset ids of the JSON answer. With `json_mode`, the provider is asked
+        for a JSON object response. Datasets missing or malformed in the answer (or all of
+        a batch whose request failed) fall back to generate_geoaware_description plus
+        expand_geo_description_for_search. Results are returned in input order.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        items = list(items)
+        ids = [str(key) for key, _ in items]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Dataset keys must be distinct as strings")
+
+        results: List[BatchDescriptionResult] = []
+        for start in range(0, len(items), batch_size):
+            results.extend(self._generate_batch(ids[start:start + batch_size], items[start:start + batch_size], json_mode))
+        return results
+
+    def _generate_batch(self, ids: List[str],
+        items: List[Tuple[Hashable, Dict[str, Any]]],
+        json_mode: bool) -> List[BatchDescriptionResult]:
+        builder = GeoAwarePromptBuilder()
+        batch_items = []
+        for dataset_id, (_, kwargs) in zip(ids, items):
+            if self.prompt_token_budget is not None:
+                kwargs = {**kwargs, "dataset_sample": compact_sample(kwargs["dataset_sample"])[0]}
+            batch_items.append((dataset_id, kwargs))
+        prompt = builder.build_batch_prompt(batch_items)
+        system_message = builder.batch_system_message
+
+        # Only fully valid answers are cached, so a malformed one is retried next time
+        cache_key = None
+        if self.cache is not None:
+            cache_key = CompletionCache.make_key(self.model_name, self.temperature, system_message, prompt)
+        answer = self.cache.get(cache_key) if cache_key else None
+        try:
+            if answer is None:
+                extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+                answer = self._complete(prompt, system_message, datasets=len(ids), **extra)
+            valid, problems = parse_batch_output(answer, ids)
+        except Exception as exc:
+            valid, problems = {}, {dataset_id: f"request failed: {exc!r}" for dataset_id in ids}
+        if cache_key and not problems:
+            self.cache.put(cache_key, answer)
+
+        results = []
+        for dataset_id, (key, kwargs) in zip(ids, items):
+            if dataset_id in valid:
+                results.append(BatchDescriptionResult(
+                    key=key,
+                    description=valid[dataset_id]["description"],
+                    search_description=valid[dataset_id]["search_description"],
+                    prompt=prompt,
+                ))
+                continue
+            result = BatchDescriptionResult(key=key, batched=False, problem=problems[dataset_id])
+            try:
+                result.description, result.prompt = self.generate_geoaware_description(**kwargs)
+                if kwargs.get("geo_profile") is not None:
+                    result.search_description = self.expand_geo_description_for_search(
+                        result.description, kwargs.get("data_topic"), kwargs["geo_profile"]
+                    )
+            except Exception as exc:
+                result.error = exc
+            results.append(result)
+        return results
+
+    def _complete(self, prompt: str, system_message: Optional[str] = None, datasets: int = 1, **create_kwargs) -> str:
+        with span("llm.completion", model=self.model_name, prompt_chars=len(prompt), datasets=datasets) as stage:
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=self._messages(prompt, system_message),
+                temperature=self.temperature,
+                **create_kwargs
+            )
+            content = response.choices[0].message.content.strip()
+            stage.set(completion_chars=len(content), **response_usage(response))
+        return content
+
+    def build_geoaware_prompt(self, **prompt_kwargs) -> Tuple[str, Optional[PromptBudgetReport]]:
+        """
+        Builds the user prompt for generate_geoaware_description (same keyword arguments).
+        With `prompt_token_budget` set, the prompt is compacted to fit and the report of
+        what was compacted or dropped is returned alongside it.
+        """
+        with span("llm.prompt_build", token_budget=self.prompt_token_budget) as stage:
+            builder = GeoAwarePromptBuilder(prompt_type="dataset_description")
+            if self.prompt_token_budget is None:
+                prompt, report = builder.build_geo_aware_prompt(**prompt_kwargs), None
+            else:
+                prompt, report = builder.build_geo_aware_prompt_within_budget(self.prompt_token_budget, **prompt_kwargs)
+            stage.set(prompt_chars=len(prompt))
+        return prompt, report
+
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return CompletionCache.make_key(self.model_name, self.temperature, self.system_message, prompt)
+
+    def _messages(self, prompt: str, system_message: Optional[str] = None) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_message if system_message is None else system_message},
+            {"role": "user", "content": prompt},
+        ]
+
+    async def agenerate_geoaware_descriptions(self,
+        items: Iterable[Tuple[Hashable, Dict[str, Any]]],
+        max_concurrency: int = 16,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+        timeout: Optional[float] = 60.0) -> AsyncIterator[DescriptionResult]:
+        """
+        Generates many geo-aware descriptions concurrently with `self.async_client`
+        (e.g. openai.AsyncOpenAI) and yields a DescriptionResult as each one finishes.
+
+        `items` are (key, kwargs) pairs where kwargs are the arguments of
+        generate_geoaware_description. At most `max_concurrency` requests are in flight,
+        requests and estimated tokens are paced by per-minute token buckets, 429/5xx and
+        timeouts are retried with jittered exponential backoff, and `timeout` bounds each
+        attempt. Failed items are yielded with `error` set instead of raising.
+        """
+        if self.async_client is None:
+            raise ValueError("agenerate_geoaware_descriptions requires an async_client")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limiter = AsyncRateLimiter(requests_per_minute, tokens_per_minute)
+
+        async def run(key: Hashable, prompt_kwargs: Dict[str, Any]) -> DescriptionResult:
+            result = DescriptionResult(key=key)
+            start = time.perf_counter()
+            try:
+                result.prompt, result.prompt_report = self.build_geoaware_prompt(**prompt_kwargs)
+                cache_key = self._cache_key(result.prompt)
+                if cache_key:
+                    result.description = self.cache.get(cache_key)
+                    if result.description is not None:
+                        result.latency = time.perf_counter() - start
+                        return result
 
-        description = response.choices[0].message.content.strip()
+                tokens = estimate_tokens(self.system_message or "") + estimate_tokens(result.prompt) + ESTIMATED_COMPLETION_TOKENS
+                while True:
+                    result.attempts += 1
+                    async with semaphore:
+                        await limiter.acquire(tokens)
+                        try:
+                            with async_span("llm.completion", model=self.model_name, prompt_chars=len(result.prompt),
+                                            attempt=result.attempts) as stage:
+                                response = await asyncio.wait_for(
+                                    self.async_client.chat.completions.create(
+                                        model=self.model_name,
+                                        messages=self._messages(result.prompt),
+                                        temperature=self.temperature
+                                    ),
+                                    timeout=timeout
+                                )
+                                content = response.choices[0].message.content or ""
+                                stage.set(completion_chars=len(content.strip()), **response_usage(response))
+                            break
+                        except Exception as exc:
+                            if result.attempts > max_retries or not is_retryable_error(exc):
+                                raise
+                            delay = retry_delay(exc, result.attempts - 1)
+                    # Back off outside the semaphore so other items keep the slots busy
+                    await asyncio.sleep(delay)
+                result.description = response.choices[0].message.content.strip()
+                if cache_key:
+                    self.cache.put(cache_key, result.description)
+            except Exception as exc:
+                result.error = exc
+            result.latency = time.perf_counter() - start
+            return result
 
-        return (description, prompt)
\ No newline at end of file
+        tasks = [asyncio.ensure_future(run(key, prompt_kwargs)) for key, prompt_kwargs in items]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,172 @@
+"""
+Catalog benchmark: memory and load time of many EnrichedDatasetProfiles held as
+objects and persisted as one JSON document per profile (the layout of
+IncrementalGeoProfiler.save), against a ProfileCatalog saved as Parquet.
+
+    python -m benchmarks.catalog --datasets 100000 --columns 12 --output catalog.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from geo_profiler.catalog import ProfileCatalog
+from geo_profiler.models import ColumnSemantic, DatasetSemanticProfile, EnrichedDatasetProfile, GeoProfile
+from geo_profiler.profilers.spatial_use_cases_profiler import USECASES
+from .run import environment
+
+ROLES = ["event", "observation", "infrastructure", "boundary", "unknown"]
+GEOMETRIES = ["point", "polygon", "polyline", "multi", "unknown"]
+RESOLUTIONS = ["street", "zip", "borough", "multi-level", None]
+COLUMN_KINDS = [
+    # name, is_spatial, resolution, is_temporal, domain, function, raw type, samples
+    ("Latitude", True, "street", False, "location", "coordinate", "float", ["40.71", "40.65"]),
+    ("Longitude", True, "street", False, "location", "coordinate", "float", ["-73.99", "-73.91"]),
+    ("Borough", True, "borough", False, "administrative", "region", "string", ["QUEENS", "BRONX"]),
+    ("Incident Zip", True, "zip", False, "administrative", "postal code", "integer", ["11201", "10027"]),
+    ("Created Date", False, None, True, "time", "timestamp", "datetime", ["2024-01-03"]),
+    ("Complaint Type", False, None, False, "service", "category", "string", ["Noise", "Parking"]),
+    ("Status", False, None, False, "service", "status", "string", ["Open", "Closed"]),
+    ("Unique Key", False, None, False, "identifier", "key", "integer", ["58321", "58322"]),
+]
+
+
+def synthetic_records(datasets: int, columns: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    JSON-ready profile dicts, shaped like asdict(EnrichedDatasetProfile).
+    """
+    rng = np.random.default_rng(seed)
+    use_cases = list(USECASES.values())
+    records = []
+    for i in range(datasets):
+        kinds = rng.integers(0, len(COLUMN_KINDS), size=columns)
+        cols = []
+        for j, kind in enumerate(kinds):
+            name, spatial, resolution, temporal, domain, function, raw_type, samples = COLUMN_KINDS[kind]
+            cols.append({
+                "name": f"{name} {j}", "is_spatial": spatial, "spatial_resolution": resolution,
+                "is_temporal": temporal, "domain_type": domain, "function": function, "raw_type": raw_type,
+                "sample_values": samples, "geometry_histogram": None,
+            })
+        records.append({
+            "dataset_id": f"D{i}",
+            "dataset_semantics": {
+                "columns": cols, "has_spatial": True, "has_temporal": bool(rng.integers(2)),
+                "detected_spatial_columns": [c["name"] for c in cols if c["is_spatial"]],
+                "resolution_evidence": None,
+            },
+            "geo_profile": {
+                "spatial_role": ROLES[rng.integers(len(ROLES))],
+                "geometry_type": GEOMETRIES[rng.integers(len(GEOMETRIES))],
+                "spatial_resolution": RESOLUTIONS[rng.integers(len(RESOLUTIONS))],
+                "spatial_use_cases": use_cases[rng.integers(len(use_cases))],
+            },
+            "raw_metadata": None,
+        })
+    return records
+
+
+def from_record(record: Dict[str, Any]) -> EnrichedDatasetProfile:
+    semantics = dict(record["dataset_semantics"])
+    semantics["columns"] = [ColumnSemantic(**c) for c in semantics["columns"]]
+    return EnrichedDatasetProfile(
+        dataset_semantics=DatasetSemanticProfile(**semantics),
+        geo_profile=GeoProfile(**record["geo_profile"]),
+        raw_metadata=record["raw_metadata"],
+    )
+
+
+def load_json_lines(path: str) -> Dict[str, EnrichedDatasetProfile]:
+    profiles = {}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            record = json.loads(line)
+            profiles[record["dataset_id"]] = from_record(record)
+    return profiles
+
+
+def _timed_memory(function):
+    # Result, seconds, and Python heap bytes held by the result; memory is traced in a
+    # second run, since tracing slows allocation-heavy code several times over
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    result = function()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, held
+
+
+def catalog_benchmark(datasets: int = 100_000, columns: int = 12) -> Dict[str, object]:
+    records = synthetic_records(datasets, columns)
+    summary: Dict[str, object] = {"datasets": datasets, "columns_per_dataset": columns}
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "profiles.jsonl")
+        with open(json_path, "w", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record) + "\n")
+        del records
+
+        profiles, seconds, held = _timed_memory(lambda: load_json_lines(json_path))
+        summary["json"] = {"bytes": os.path.getsize(json_path), "load_seconds": seconds, "memory_bytes": held}
+
+        start = time.perf_counter()
+        catalog = ProfileCatalog.from_profiles(profiles)
+        build = time.perf_counter() - start
+        del profiles
+        catalog_path = os.path.join(directory, "catalog")
+        start = time.perf_counter()
+        catalog.save(catalog_path)
+        save = time.perf_counter() - start
+        del catalog
+
+        catalog, seconds, _ = _timed_memory(lambda: ProfileCatalog.load(catalog_path))
+        size = sum(os.path.getsize(os.path.join(catalog_path, name)) for name in os.listdir(catalog_path))
+        summary["catalog"] = {
+            "bytes": size,
+            "build_seconds": build,
+            "save_seconds": save,
+            "load_seconds": seconds,
+            "memory_bytes": catalog.nbytes,  # Arrow buffers; dataset ids are also kept as a list
+        }
+
+        _, seconds, held = _timed_memory(catalog.geo_profiles)
+        summary["catalog"]["geo_profiles_seconds"] = seconds
+        summary["catalog"]["geo_profiles_memory_bytes"] = held
+        _, seconds, held = _timed_memory(catalog.profiles)
+        summary["catalog"]["profiles_seconds"] = seconds
+        summary["catalog"]["profiles_memory_bytes"] = held
+
+    json_stats, catalog_stats = summary["json"], summary["catalog"]
+    summary["bytes_ratio"] = json_stats["bytes"] / catalog_stats["bytes"]
+    summary["load_speedup"] = json_stats["load_seconds"] / catalog_stats["load_seconds"]
+    summary["memory_ratio"] = json_stats["memory_bytes"] / catalog_stats["memory_bytes"]
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.catalog", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=12, help="columns per dataset")
+    parser.add_argument("--output", default=None, help="JSON results file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = json.dumps({"environment": environment(), "catalog": catalog_benchmark(args.datasets, args.columns)}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Cold-start benchmark: import-to-first-prompt time of a fresh interpreter.
+
+    python -m benchmarks.cold_start --runs 10 --output cold.json
+
+Each run starts a new Python process that imports `autoddg_geo`, builds one geo-aware
+prompt and reports both durations and which heavy modules ended up imported.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from .run import REPO_ROOT, environment
+
+HEAVY_MODULES = ["pandas", "numpy", "scipy", "pyarrow"]
+
+# Runs inside the fresh interpreter; prints one JSON line
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import autoddg_geo
+from geo_profiler.models import GeoProfile
+from llm.prompt_builder import GeoAwarePromptBuilder
+imported = time.perf_counter()
+GeoAwarePromptBuilder().build_geo_aware_prompt(
+    dataset_sample="Borough,Latitude,Longitude\\nQUEENS,40.7,-73.8\\n",
+    geo_profile=GeoProfile("event", "point", "coordinates", ["hotspot mapping"]),
+    use_geo_profile=True,
+)
+prompted = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "first_prompt_seconds": prompted - imported,
+    "total_seconds": prompted - start,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def cold_start_run() -> Dict[str, object]:
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def cold_start(runs: int = 10) -> Dict[str, object]:
+    """
+    Median and min of each duration over `runs` fresh processes.
+    """
+    samples = [cold_start_run() for _ in range(max(1, runs))]
+    summary: Dict[str, object] = {"runs": len(samples), "heavy_modules": samples[-1]["heavy_modules"]}
+    for key in ("import_seconds", "first_prompt_seconds", "total_seconds"):
+        values = [s[key] for s in samples]
+        summary[key] = {"median": statistics.median(values), "min": min(values)}
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters to start")
+    parser.add_argument("--output", default=None, help="JSON results file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = json.dumps({"environment": environment(), "cold_start": cold_start(args.runs)}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Dense search benchmark: builds a DenseIndex of synthetic dataset descriptions with the
+offline HashingEmbedder into a memory-mapped file, then times loading it and exact
+top-k search (one query at a time, in query batches and, optionally, hybrid with BM25).
+
+    python -m benchmarks.dense_search --documents 1000000 --output dense.json
+    python -m benchmarks.dense_search --documents 200000 --dtype float16 --hybrid
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from evaluation.dense_retrieval import DEFAULT_BLOCK_ROWS, VECTOR_DTYPES, DenseIndex, HashingEmbedder
+from evaluation.retrieval import BM25Index
+from .run import environment
+
+TOPICS = ["parking", "noise", "trees", "flood", "subway", "bike", "school", "crime", "permits", "restaurants"]
+PLACES = ["queens", "brooklyn", "manhattan", "bronx", "staten island", "census tracts", "zip codes", "street centerlines"]
+GEOMETRIES = ["point", "polygon", "polyline", "multipolygon"]
+
+
+def synthetic_corpus(documents: int, seed: int = 0) -> Dict[str, str]:
+    rng = np.random.default_rng(seed)
+    topics = rng.choice(TOPICS, size=(documents, 2))
+    places = rng.choice(PLACES, size=documents)
+    geometries = rng.choice(GEOMETRIES, size=documents)
+    years = rng.integers(2000, 2025, size=documents)
+    return {
+        f"D{i}": f"{topics[i, 0]} and {topics[i, 1]} records in {places[i]} as {geometries[i]} features from {years[i]}"
+        for i in range(documents)
+    }
+
+
+def synthetic_queries(queries: int, seed: int = 1) -> List[str]:
+    rng = np.random.default_rng(seed)
+    return [f"{rng.choice(TOPICS)} in {rng.choice(PLACES)}" for _ in range(queries)]
+
+
+def _percentiles(seconds: List[float]) -> Dict[str, float]:
+    return {f"p{p}": float(np.percentile(seconds, p)) for p in (50, 95, 99)}
+
+
+def dense_search(documents: int = 100_000,
+    queries: int = 50,
+    k: int = 10,
+    dimension: int = 256,
+    dtype: str = "float32",
+    batch_size: int = 64,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    hybrid: bool = False) -> Dict[str, object]:
+    """
+    Build, load and search timings for `documents` synthetic descriptions.
+    """
+    corpus = synthetic_corpus(documents)
+    texts = synthetic_queries(queries)
+    embedder = HashingEmbedder(dimension)
+    summary: Dict[str, object] = {"documents": documents, "dimension": dimension, "dtype": dtype, "k": k}
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        DenseIndex.build(corpus, embedder, path=directory, dtype=dtype)
+        build = time.perf_counter() - start
+        summary["build_seconds"] = build
+        summary["documents_per_second"] = documents / build if build else None
+
+        start = time.perf_counter()
+        index = DenseIndex.load(directory, embedder)
+        summary["load_seconds"] = time.perf_counter() - start
+        summary["index_bytes"] = int(index.vectors.nbytes)
+
+        index.search(texts[:1], k=k, block_rows=block_rows)  # pages the vectors in
+        single = []
+        for query in texts:
+            start = time.perf_counter()
+            index.search([query], k=k, block_rows=block_rows)
+            single.append(time.perf_counter() - start)
+        summary["query_seconds"] = _percentiles(single)
+
+        start = time.perf_counter()
+        index.search(texts, k=k, batch_size=batch_size, block_rows=block_rows)
+        summary["batched_seconds_per_query"] = (time.perf_counter() - start) / queries
+
+        if hybrid:
+            start = time.perf_counter()
+            bm25 = BM25Index.build(corpus)
+            summary["bm25_build_seconds"] = time.perf_counter() - start
+            index.search(texts[:1], k=k, bm25=bm25, block_rows=block_rows)
+            fused = []
+            for query in texts:
+                start = time.perf_counter()
+                index.search([query], k=k, bm25=bm25, block_rows=block_rows)
+                fused.append(time.perf_counter() - start)
+            summary["hybrid_query_seconds"] = _percentiles(fused)
+        del index
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.dense_search", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--dtype", choices=VECTOR_DTYPES, default="float32")
+    parser.add_argument("--batch-size", type=int, default=64, help="queries per batched search")
+    parser.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS)
+    parser.add_argument("--hybrid", action="store_true", help="also time hybrid search with a BM25 index")
+    parser.add_argument("--output", default=None, help="JSON results file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    summary = dense_search(args.documents, args.queries, args.k, args.dimension, args.dtype,
+                           args.batch_size, args.block_rows, args.hybrid)
+    report = json.dumps({"environment": environment(), "dense_search": summary}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+LLM load benchmark: AutoDDGGeo's concurrent description generation against the local
+stand-in client, so the pipeline's own overhead and retry behaviour can be measured
+without a provider.
+
+    python -m benchmarks.llm_load --requests 5000 --concurrency 256 --output load.json
+    python -m benchmarks.llm_load --latency lognormal --mean 0.5 --spread 0.6 --rate-limit-rate 0.05
+
+With zero latency (the default), throughput is bounded by prompt assembly, rate
+limiting, retries and result handling alone.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from autoddg_geo import AutoDDGGeo
+from geo_profiler.models import GeoProfile
+from llm.local_client import LATENCY_KINDS, AsyncLocalLLMClient, LatencyModel, LocalLLMBackend
+from .run import environment
+
+SAMPLE_TEMPLATE = "Borough,Latitude,Longitude,Complaint\nQUEENS,40.7{i:03d},-73.8{i:03d},Noise\nBROOKLYN,40.6,-73.9,Parking\n"
+
+
+def load_items(requests: int):
+    profile = GeoProfile("event", "point", "coordinates", ["hotspot mapping", "spatial clustering"])
+    return [
+        (i, dict(dataset_sample=SAMPLE_TEMPLATE.format(i=i % 1000), geo_profile=profile, use_geo_profile=True))
+        for i in range(requests)
+    ]
+
+
+async def _drive(autoddg: AutoDDGGeo, items, concurrency: int, max_retries: int):
+    results = []
+    async for result in autoddg.agenerate_geoaware_descriptions(items, max_concurrency=concurrency, max_retries=max_retries):
+        results.append(result)
+    return results
+
+
+def llm_load(backend: LocalLLMBackend, requests: int = 2000, concurrency: int = 64, max_retries: int = 5) -> Dict[str, object]:
+    """
+    Generates `requests` descriptions through agenerate_geoaware_descriptions and
+    reports throughput, per-item latency percentiles, attempts and the backend's counters.
+    """
+    autoddg = AutoDDGGeo(client=None, model_name="local", async_client=AsyncLocalLLMClient(backend))
+    items = load_items(requests)
+    start = time.perf_counter()
+    results = asyncio.run(_drive(autoddg, items, concurrency, max_retries))
+    seconds = time.perf_counter() - start
+
+    latencies = np.array([r.latency for r in results])
+    attempts = np.array([r.attempts for r in results])
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": seconds,
+        "items_per_second": requests / seconds if seconds else None,
+        "failed": sum(not r.ok for r in results),
+        "latency_seconds": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99)),
+        },
+        "mean_attempts": float(attempts.mean()),
+        "backend": vars(backend.stats),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.llm_load", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--latency", choices=LATENCY_KINDS, default="fixed")
+    parser.add_argument("--mean", type=float, default=0.0, help="mean time to first token, seconds")
+    parser.add_argument("--spread", type=float, default=0.0)
+    parser.add_argument("--per-token", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON results file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    backend = LocalLLMBackend(
+        latency=LatencyModel(args.latency, args.mean, args.spread, args.per_token),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    summary = llm_load(backend, args.requests, args.concurrency, args.max_retries)
+    report = json.dumps({"environment": environment(), "llm_load": summary}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
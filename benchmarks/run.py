@@ -0,0 +1,278 @@
+"""
+Offline benchmark suite for the profiling and prompt pipeline.
+
+    python -m benchmarks.run --suite quick --output bench.json
+    python -m benchmarks.run --rows 10000000 --cols 8 --geometry point --output tall.json
+    python -m benchmarks.run compare before.json after.json
+
+Every result is one (dataset, stage) record with wall time, throughput and peak
+traced memory; the JSON also records the git commit and library versions.
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+from geo_profiler.geo_profiler import GeoProfiler
+from geo_profiler.semantic_parser import SemanticParser
+from geo_profiler.local_semantics import LocalSemanticProfiler
+from geo_profiler.profilers.spatial_role_profiler import SpatialRoleProfiler
+from geo_profiler.profilers.geometry_type_profiler import GeometryTypeProfiler
+from geo_profiler.profilers.spatial_resolution_profiler import SpatialResolutionProfiler
+from geo_profiler.profilers.spatial_use_cases_profiler import SpatialUseCaseProfiler
+from llm.prompt_builder import GeoAwarePromptBuilder
+from .synthetic import GEOMETRY_KINDS, semantic_profile_for, semantic_profile_text, write_csv
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EXAMPLES_GLOB = str(REPO_ROOT / "examples" / "*.csv")
+
+# Larger tables are only benchmarked through the chunked (streaming) stages
+DEFAULT_MAX_IN_MEMORY_ROWS = 2_000_000
+PROMPT_SAMPLE_ROWS = 5
+PROMPT_TOKEN_BUDGET = 4000
+
+# (rows, cols, geometry) per suite; "examples" cases are added separately
+SUITES = {
+    "quick": [(10_000, 20, g) for g in GEOMETRY_KINDS] + [(200, 1_000, "point")],
+    "tall": [(1_000_000, 12, g) for g in GEOMETRY_KINDS] + [(10_000_000, 8, "point")],
+    "wide": [(1_000, 10_000, g) for g in GEOMETRY_KINDS],
+    "examples": [],
+}
+SUITES["full"] = SUITES["quick"] + SUITES["tall"] + SUITES["wide"]
+
+
+@dataclass
+class StageResult:
+    dataset: str
+    stage: str
+    rows: int
+    cols: int
+    seconds: float
+    rows_per_second: Optional[float]
+    cells_per_second: Optional[float]
+    peak_memory_mb: Optional[float]
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    rows: int
+    cols: int
+    semantic_profile: str
+    df: Optional[pd.DataFrame] = None       # loaded table, when small enough
+    csv_path: Optional[str] = None          # CSV file, for load and streaming stages
+
+
+def measure(fn: Callable[[], object], repeat: int = 1, trace_memory: bool = True):
+    """
+    Best-of-`repeat` wall time of `fn`, then (optionally) one more run under tracemalloc
+    for its peak traced allocation in MB. Timing runs are never traced.
+    """
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def case_stages(case: BenchmarkCase) -> Dict[str, Callable[[], object]]:
+    """
+    The stages benchmarked for one case, in pipeline order.
+    """
+    stages: Dict[str, Callable[[], object]] = {}
+    text = case.semantic_profile
+
+    if case.csv_path and case.df is not None:
+        stages["csv_load"] = lambda: pd.read_csv(case.csv_path)
+
+    if case.df is not None:
+        df = case.df
+        semantics = SemanticParser.parse_semantic_profile_text(text, df)
+        geo_profile = GeoProfiler.infer_from_semantics(semantics)
+        sample = df.head(PROMPT_SAMPLE_ROWS).to_csv(index=False)
+        builder = GeoAwarePromptBuilder()
+
+        stages["semantic_parse"] = lambda: SemanticParser.parse_semantic_profile_text(text, df)
+        stages["spatial_role"] = lambda: SpatialRoleProfiler.infer_spatial_role(semantics)
+        stages["geometry_type"] = lambda: GeometryTypeProfiler.infer_geometry_type(semantics)
+        stages["spatial_resolution"] = lambda: SpatialResolutionProfiler.infer_spatial_resolution(semantics)
+        stages["spatial_use_cases"] = lambda: SpatialUseCaseProfiler.infer_spatial_use_cases(
+            semantics, geo_profile.spatial_role, geo_profile.geometry_type
+        )
+        stages["geo_profile"] = lambda: GeoProfiler.infer_geo_profile(text, df)
+        stages["geo_profile_scan_values"] = lambda: GeoProfiler.infer_geo_profile(text, df, scan_values=True)
+        stages["local_semantics"] = lambda: LocalSemanticProfiler.profile(df)
+        stages["geo_profile_local"] = lambda: GeoProfiler.infer_geo_profile_local(df)
+        stages["prompt_build"] = lambda: builder.build_geo_aware_prompt(
+            dataset_sample=sample,
+            semantic_profile=text,
+            use_semantic_profile=True,
+            geo_profile=geo_profile,
+            use_geo_profile=True,
+        )
+        stages["prompt_build_budgeted"] = lambda: builder.build_geo_aware_prompt_within_budget(
+            PROMPT_TOKEN_BUDGET,
+            dataset_sample=sample,
+            semantic_profile=text,
+            use_semantic_profile=True,
+            geo_profile=geo_profile,
+            use_geo_profile=True,
+        )
+
+    if case.csv_path:
+        stages["geo_profile_streaming"] = lambda: GeoProfiler.infer_geo_profile_streaming(text, case.csv_path)
+        stages["geo_profile_streaming_scan_values"] = lambda: GeoProfiler.infer_geo_profile_streaming(
+            text, case.csv_path, scan_values=True
+        )
+    return stages
+
+
+def run_case(case: BenchmarkCase, repeat: int = 1, trace_memory: bool = True, log=None) -> List[StageResult]:
+    results = []
+    for stage, fn in case_stages(case).items():
+        seconds, peak = measure(fn, repeat=repeat, trace_memory=trace_memory)
+        result = StageResult(
+            dataset=case.name,
+            stage=stage,
+            rows=case.rows,
+            cols=case.cols,
+            seconds=seconds,
+            rows_per_second=case.rows / seconds if seconds > 0 else None,
+            cells_per_second=case.rows * case.cols / seconds if seconds > 0 else None,
+            peak_memory_mb=peak,
+        )
+        results.append(result)
+        if log is not None:
+            peak_text = f"{peak:9.1f} MB" if peak is not None else ""
+            log(f"{case.name:<40} {stage:<36} {seconds:10.4f} s {peak_text}")
+    return results
+
+
+def synthetic_cases(specs: Iterable, workdir: str, max_in_memory_rows: int, seed: int = 0):
+    """
+    Yields one case per (rows, cols, geometry), writing its CSV to `workdir` first.
+    Cases are generated lazily so only one synthetic table is alive at a time.
+    """
+    for rows, cols, geometry in specs:
+        name = f"synthetic_{geometry}_{rows}x{cols}"
+        path = os.path.join(workdir, name + ".csv")
+        write_csv(path, rows, cols, geometry, seed=seed)
+        df = pd.read_csv(path) if rows <= max_in_memory_rows else None
+        yield BenchmarkCase(name, rows, cols, semantic_profile_text(cols, geometry), df=df, csv_path=path)
+        os.remove(path)
+
+
+def example_cases(pattern: str = EXAMPLES_GLOB):
+    for path in sorted(glob.glob(pattern)):
+        df = pd.read_csv(path)
+        yield BenchmarkCase(
+            f"example_{Path(path).stem}", len(df), len(df.columns), semantic_profile_for(df), df=df, csv_path=path
+        )
+
+
+def environment() -> Dict[str, Optional[str]]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": str(os.cpu_count()),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def compare(before_path: str, after_path: str) -> pd.DataFrame:
+    """
+    Per (dataset, stage) timings of two result files and the speedup of the second.
+    """
+    frames = []
+    for label, path in (("before", before_path), ("after", after_path)):
+        with open(path, "r", encoding="utf-8") as handle:
+            results = pd.DataFrame(json.load(handle)["results"])
+        frames.append(results.set_index(["dataset", "stage"])[["seconds", "peak_memory_mb"]].add_suffix("_" + label))
+    table = frames[0].join(frames[1], how="inner")
+    table["speedup"] = table["seconds_before"] / table["seconds_after"]
+    return table.reset_index()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "compare":
+        parser = argparse.ArgumentParser(prog="python -m benchmarks.run compare")
+        parser.add_argument("before")
+        parser.add_argument("after")
+        args = parser.parse_args(argv[1:])
+        print(compare(args.before, args.after).to_string(index=False))
+        return 0
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=sorted(SUITES), default=None)
+    parser.add_argument("--rows", type=int, help="custom synthetic case: number of rows")
+    parser.add_argument("--cols", type=int, default=12, help="custom synthetic case: number of columns")
+    parser.add_argument("--geometry", choices=GEOMETRY_KINDS, default="point")
+    parser.add_argument("--examples", action="store_true", help="also benchmark examples/*.csv")
+    parser.add_argument("--repeat", type=int, default=1, help="timing runs per stage (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--max-in-memory-rows", type=int, default=DEFAULT_MAX_IN_MEMORY_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="where synthetic CSVs are written (default: temp dir)")
+    parser.add_argument("--output", default=None, help="JSON results file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    specs = list(SUITES[args.suite]) if args.suite else []
+    if args.rows is not None:
+        specs.append((args.rows, args.cols, args.geometry))
+    with_examples = args.examples or args.suite in ("examples", "full") or (not specs and args.suite is None)
+
+    log = (lambda line: print(line, file=sys.stderr))
+    results: List[StageResult] = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        cases = list(example_cases()) if with_examples else []
+        for case in cases:
+            results.extend(run_case(case, args.repeat, not args.no_memory, log))
+        for case in synthetic_cases(specs, workdir, args.max_in_memory_rows, seed=args.seed):
+            results.extend(run_case(case, args.repeat, not args.no_memory, log))
+
+    report = json.dumps({"environment": environment(), "results": [asdict(r) for r in results]}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
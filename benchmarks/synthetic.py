@@ -0,0 +1,198 @@
+import re
+from os import PathLike
+from typing import Dict, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+GEOMETRY_KINDS = ("point", "polygon", "polyline")
+
+# Attribute columns cycle through these kinds; the first of each kind gets a real-world name
+ATTRIBUTE_KINDS = ["borough", "zip", "date", "measure", "category", "text", "street"]
+ATTRIBUTE_NAMES = {
+    "borough": "Borough",
+    "zip": "ZIP Code",
+    "date": "Created Date",
+    "measure": "Measure",
+    "category": "Status",
+    "text": "Description",
+    "street": "Street Name",
+}
+BOROUGHS = np.array(["Manhattan", "Brooklyn", "Queens", "Bronx", "Staten Island"], dtype=object)
+CATEGORIES = np.array(["Open", "Closed", "Pending", "Assigned"], dtype=object)
+
+# New York City bounding box
+LAT_RANGE = (40.49, 40.92)
+LON_RANGE = (-74.26, -73.70)
+VERTICES_PER_GEOMETRY = {"polygon": 6, "polyline": 4}  # polygon rings repeat their first vertex
+
+# Semantic profile heuristics (by column name) used for tables without a known layout
+SEMANTIC_NAME_RULES = [
+    (re.compile(r"(?:^|[^a-z])(?:lat|latitude|lon|lng|longitude)(?:[^a-z]|$)"), "coordinates"),
+    (re.compile(r"geom|location|wkt|shape"), None),
+    (re.compile(r"borough|boro"), "borough"),
+    (re.compile(r"zip|postcode|postal"), "zip"),
+    (re.compile(r"street|address"), "street"),
+]
+TEMPORAL_NAME_REGEX = re.compile(r"date|time|year")
+
+
+def column_layout(cols: int, geometry: str = "point") -> Dict[str, str]:
+    """
+    Column name -> kind for a synthetic table of `cols` columns (at least the id and
+    geometry columns).
+    """
+    if geometry not in GEOMETRY_KINDS:
+        raise ValueError(f"Unknown geometry kind: {geometry}")
+    layout = {"id": "id"}
+    if geometry == "point":
+        layout["Latitude"] = "latitude"
+        layout["Longitude"] = "longitude"
+    else:
+        layout["the_geom"] = geometry
+
+    for i in range(max(0, cols - len(layout))):
+        kind = ATTRIBUTE_KINDS[i % len(ATTRIBUTE_KINDS)]
+        name = ATTRIBUTE_NAMES[kind] if i < len(ATTRIBUTE_KINDS) else f"{ATTRIBUTE_NAMES[kind]} {i // len(ATTRIBUTE_KINDS)}"
+        layout[name] = kind
+    return layout
+
+
+def generate_table(rows: int, cols: int, geometry: str = "point", seed: int = 0, start: int = 0) -> pd.DataFrame:
+    """
+    A synthetic geospatial table with `rows` rows and `cols` columns. All values are
+    generated column-wise with NumPy; `start` offsets the id column (for chunked output).
+    """
+    rng = np.random.default_rng([seed, start])
+    data = {}
+    for name, kind in column_layout(cols, geometry).items():
+        data[name] = _column(rng, kind, rows, start)
+    return pd.DataFrame(data)
+
+
+def iter_table_chunks(rows: int,
+    cols: int,
+    geometry: str = "point",
+    seed: int = 0,
+    chunk_rows: int = 500_000) -> Iterator[pd.DataFrame]:
+    for start in range(0, rows, chunk_rows):
+        yield generate_table(min(chunk_rows, rows - start), cols, geometry, seed=seed, start=start)
+
+
+def write_csv(path: Union[str, PathLike],
+    rows: int,
+    cols: int,
+    geometry: str = "point",
+    seed: int = 0,
+    chunk_rows: int = 500_000) -> None:
+    """
+    Writes a synthetic table chunk by chunk, so 10M-row files never sit in memory.
+    """
+    for i, chunk in enumerate(iter_table_chunks(rows, cols, geometry, seed, chunk_rows)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def semantic_profile_text(cols: int, geometry: str = "point") -> str:
+    """
+    Semantic profile text (in the format the semantic profiler produces) matching
+    `generate_table(..., cols, geometry)`.
+    """
+    resolutions = {
+        "latitude": "coordinates",
+        "longitude": "coordinates",
+        "polygon": "neighborhood",
+        "polyline": "street",
+        "borough": "borough",
+        "zip": "zip",
+        "street": "street",
+    }
+    return "".join(
+        _semantic_block(name, resolutions.get(kind), kind in resolutions, kind == "date")
+        for name, kind in column_layout(cols, geometry).items()
+    )
+
+
+def semantic_profile_for(df: pd.DataFrame) -> str:
+    """
+    Heuristic semantic profile text for an arbitrary table (e.g. the bundled examples),
+    from column names and the first value of geometry columns.
+    """
+    blocks = []
+    for name in df.columns:
+        lowered = str(name).lower()
+        spatial, resolution = False, None
+        for regex, level in SEMANTIC_NAME_RULES:
+            if regex.search(lowered):
+                spatial, resolution = True, level
+                break
+        if spatial and resolution is None:
+            first = df[name].dropna().astype(str).head(1).tolist()
+            resolution = "coordinates" if first and first[0].lstrip().upper().startswith("POINT") else "neighborhood"
+        blocks.append(_semantic_block(str(name), resolution, spatial, bool(TEMPORAL_NAME_REGEX.search(lowered))))
+    return "".join(blocks)
+
+
+def _semantic_block(name: str, resolution: Optional[str], spatial: bool, temporal: bool) -> str:
+    parts: List[str] = [f"**{name}**: Represents {name.lower()} values. "]
+    if spatial:
+        parts.append(f"Contains spatial data (resolution: {resolution or 'unknown'}). ")
+    if temporal:
+        parts.append("Contains temporal data. ")
+    parts.append(f"Domain-specific type: attribute. Function/Usage context: describing {name}.\n")
+    return "".join(parts)
+
+
+def _column(rng: np.random.Generator, kind: str, rows: int, start: int):
+    if kind == "id":
+        return np.arange(start, start + rows, dtype=np.int64)
+    if kind == "latitude":
+        return np.round(rng.uniform(*LAT_RANGE, rows), 8)
+    if kind == "longitude":
+        return np.round(rng.uniform(*LON_RANGE, rows), 8)
+    if kind in ("polygon", "polyline"):
+        return _wkt_column(rng, kind, rows)
+    if kind == "borough":
+        return BOROUGHS[rng.integers(0, len(BOROUGHS), rows)]
+    if kind == "zip":
+        return rng.integers(10001, 11698, rows)
+    if kind == "date":
+        days = rng.integers(0, 3650, rows).astype("timedelta64[D]")
+        return np.datetime64("2015-01-01") + days
+    if kind == "measure":
+        return np.round(rng.gamma(2.0, 50.0, rows), 2)
+    if kind == "category":
+        return CATEGORIES[rng.integers(0, len(CATEGORIES), rows)]
+    if kind == "street":
+        return pd.Series(rng.integers(1, 250, rows)).astype(str).to_numpy(dtype=object) + " STREET"
+    return pd.Series(rng.integers(0, 1000, rows)).astype(str).radd("note ").to_numpy(dtype=object)
+
+
+def _wkt_column(rng: np.random.Generator, kind: str, rows: int) -> pd.Series:
+    # Random small shapes around random centres, formatted column-wise with pandas string ops
+    vertices = VERTICES_PER_GEOMETRY[kind]
+    cx = rng.uniform(*LON_RANGE, (rows, 1))
+    cy = rng.uniform(*LAT_RANGE, (rows, 1))
+    angles = np.sort(rng.uniform(0, 2 * np.pi, (rows, vertices)), axis=1)
+    radius = rng.uniform(0.001, 0.01, (rows, vertices))
+    xs = cx + radius * np.cos(angles)
+    ys = cy + radius * np.sin(angles)
+    if kind == "polygon":
+        xs[:, -1], ys[:, -1] = xs[:, 0], ys[:, 0]
+
+    def text(values: np.ndarray, j: int) -> pd.Series:
+        return _float_text(np.round(values[:, j], 6))
+
+    points = [text(xs, j) + " " + text(ys, j) for j in range(vertices)]
+    body = points[0]
+    for point in points[1:]:
+        body = body + ", " + point
+    return "POLYGON ((" + body + "))" if kind == "polygon" else "LINESTRING (" + body + ")"
+
+
+def _float_text(values: np.ndarray) -> pd.Series:
+    # pyarrow's C++ cast is ~10x faster than pandas' per-value float formatting
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return pd.Series(values).astype(str)
+    return pd.Series(pc.cast(pa.array(values), pa.string()).to_pandas(types_mapper=pd.ArrowDtype))
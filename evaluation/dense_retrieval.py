@@ -0,0 +1,350 @@
+import json
+import os
+import zlib
+from os import PathLike
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .retrieval import BM25Index, top_k_columns
+
+# HashingEmbedder defaults: buckets per vector and the word pattern
+DEFAULT_HASH_DIMENSION = 256
+HASH_TOKEN_REGEX = r"\w+"
+
+# sentence-transformers model used when none is given
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Texts embedded per embedder call while building an index
+DEFAULT_EMBEDDING_BATCH = 1024
+
+# Document vectors scored per matrix product, and queries per search batch; together
+# they bound the (queries x documents) score block
+DEFAULT_BLOCK_ROWS = 65536
+DEFAULT_QUERY_BATCH = 64
+
+# A block's scores above the running k-th best are gathered into a padded candidate
+# matrix when the widest row has fewer than 1/CANDIDATE_FRACTION of the block
+CANDIDATE_FRACTION = 8
+
+# Share of the per-query max-normalized BM25 score in hybrid search
+DEFAULT_LEXICAL_WEIGHT = 0.3
+
+# Files of an index directory
+VECTORS_FILE = "vectors.npy"
+DOC_IDS_FILE = "doc_ids.npy"
+META_FILE = "index.json"
+
+VECTOR_DTYPES = ("float32", "float16")
+
+
+class Embedder:
+    """
+    Maps texts to L2-normalized float32 vectors of `dimension` components, so a dot
+    product is the cosine similarity. `config` is stored with a saved index and
+    rebuilds the embedder on load.
+    """
+
+    dimension: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def config(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic, offline embedder: lower-cased words (and word bigrams) are hashed
+    with CRC32 into `dimension` signed buckets. Only distinct features of a batch are
+    hashed, and the counts are assembled as one sparse matrix.
+    """
+
+    def __init__(self, dimension: int = DEFAULT_HASH_DIMENSION, bigrams: bool = True):
+        self.dimension = dimension
+        self.bigrams = bigrams
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        words = pd.Series(texts, dtype=object).fillna("").str.lower().str.findall(HASH_TOKEN_REGEX).explode().dropna()
+        docs = words.index.to_numpy(dtype=np.int64)
+        features = words.to_numpy(dtype=object)
+        if self.bigrams and len(features) > 1:
+            same_doc = docs[1:] == docs[:-1]
+            features = np.concatenate([features, features[:-1][same_doc] + " " + features[1:][same_doc]])
+            docs = np.concatenate([docs, docs[:-1][same_doc]])
+
+        codes, uniques = pd.factorize(features)
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in uniques), dtype=np.uint32, count=len(uniques))
+        buckets = (hashes % self.dimension).astype(np.int64)
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+        vectors = sparse.csr_matrix(
+            (signs[codes], (docs, buckets[codes])), shape=(len(texts), self.dimension), dtype=np.float32
+        ).toarray()
+        return _normalize(vectors)
+
+    def config(self) -> Dict[str, Any]:
+        return {"kind": "hashing", "dimension": self.dimension, "bigrams": self.bigrams}
+
+
+def _sentence_transformers():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise ImportError("SentenceTransformerEmbedder requires sentence-transformers (pip install sentence-transformers)") from None
+    return SentenceTransformer
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """
+    A sentence-transformers model (loaded once); embeddings are normalized by the model.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, device: Optional[str] = None, batch_size: int = 64):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = _sentence_transformers()(model_name, device=device)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+            normalize_embeddings=True, show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def config(self) -> Dict[str, Any]:
+        return {"kind": "sentence-transformers", "model_name": self.model_name}
+
+
+def embedder_from_config(config: Mapping[str, Any]) -> Embedder:
+    options = {key: value for key, value in config.items() if key != "kind"}
+    if config["kind"] == "hashing":
+        return HashingEmbedder(**options)
+    if config["kind"] == "sentence-transformers":
+        return SentenceTransformerEmbedder(**options)
+    raise ValueError(f"Unknown embedder kind {config['kind']!r}")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def document_text(description: str, search_description: Optional[str] = None) -> str:
+    # A dataset's indexed text: its geo-aware description plus the search expansion
+    return f"{description}\n{search_description}" if search_description else description
+
+
+class DenseIndex:
+    """
+    Exact dense retrieval over a (documents x dimension) matrix of normalized embeddings.
+
+    The matrix is usually a read-only memory map of a saved index, so it is paged in by
+    the OS rather than loaded. Search multiplies each block of `block_rows` document
+    vectors with the batch of query vectors and keeps a running top-k per query, so no
+    full (queries x documents) score matrix is ever materialized.
+    """
+
+    def __init__(self, doc_ids: Sequence[str], vectors: np.ndarray, embedder: Embedder):
+        if vectors.shape != (len(doc_ids), embedder.dimension):
+            raise ValueError(
+                f"vectors of shape {vectors.shape} do not match {len(doc_ids)} documents "
+                f"of dimension {embedder.dimension}"
+            )
+        self.doc_ids = list(doc_ids)
+        self.vectors = vectors
+        self.embedder = embedder
+        self._aligned_bm25: Optional[BM25Index] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @staticmethod
+    def build(corpus: Mapping[str, str],
+        embedder: Optional[Embedder] = None,
+        path: Union[str, PathLike, None] = None,
+        search_descriptions: Optional[Mapping[str, str]] = None,
+        dtype: str = "float32",
+        batch_size: int = DEFAULT_EMBEDDING_BATCH) -> "DenseIndex":
+        """
+        Embeds a {dataset id: description} corpus `batch_size` texts at a time, each
+        description joined with its search expansion when `search_descriptions` has one.
+        With `path`, vectors are written straight into a memory-mapped file in that
+        directory and the saved index is returned; otherwise they are kept in memory.
+        float16 halves the file and page cache; blocks are scored in float32.
+        """
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"dtype must be one of {VECTOR_DTYPES}")
+        embedder = embedder or HashingEmbedder()
+        search_descriptions = search_descriptions or {}
+        doc_ids = list(corpus.keys())
+        shape = (len(doc_ids), embedder.dimension)
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            vectors = np.lib.format.open_memmap(os.path.join(path, VECTORS_FILE), mode="w+", dtype=dtype, shape=shape)
+        else:
+            vectors = np.empty(shape, dtype=dtype)
+
+        for start in range(0, len(doc_ids), batch_size):
+            batch = doc_ids[start:start + batch_size]
+            vectors[start:start + len(batch)] = embedder.embed(
+                [document_text(corpus[d], search_descriptions.get(d)) for d in batch]
+            )
+        if path is None:
+            return DenseIndex(doc_ids, vectors, embedder)
+        vectors.flush()
+        del vectors
+        _write_metadata(path, doc_ids, embedder, dtype)
+        return DenseIndex.load(path, embedder)
+
+    def save(self, path: Union[str, PathLike]) -> None:
+        """
+        Writes the index directory (vectors.npy, doc_ids.npy, index.json; no pickled objects).
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, VECTORS_FILE), self.vectors)
+        _write_metadata(path, self.doc_ids, self.embedder, self.vectors.dtype.name)
+
+    @staticmethod
+    def load(path: Union[str, PathLike], embedder: Optional[Embedder] = None, mmap: bool = True) -> "DenseIndex":
+        """
+        Opens a saved index, memory-mapping its vectors unless `mmap` is False. The
+        embedder is rebuilt from the stored config when none is given.
+        """
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r" if mmap else None, allow_pickle=False)
+        doc_ids = np.load(os.path.join(path, DOC_IDS_FILE), allow_pickle=False).tolist()
+        return DenseIndex(doc_ids, vectors, embedder or embedder_from_config(meta["embedder"]))
+
+    def _blocks(self, block_rows: int) -> Iterable[Tuple[int, np.ndarray]]:
+        for start in range(0, len(self), block_rows):
+            yield start, np.asarray(self.vectors[start:start + block_rows], dtype=np.float32)
+
+    def score_batches(self, queries: Sequence[str], batch_size: int = DEFAULT_QUERY_BATCH,
+        block_rows: int = DEFAULT_BLOCK_ROWS) -> Iterable[np.ndarray]:
+        """
+        Dense (batch x documents) cosine score blocks, `batch_size` queries at a time
+        (the interface `retrieval_metrics` uses).
+        """
+        for start in range(0, len(queries), batch_size):
+            embedded = self.embedder.embed(queries[start:start + batch_size])
+            scores = np.empty((len(embedded), len(self)), dtype=np.float32)
+            for offset, block in self._blocks(block_rows):
+                scores[:, offset:offset + len(block)] = embedded @ block.T
+            yield scores
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        if not len(queries):
+            return np.zeros((0, len(self)), dtype=np.float32)
+        return np.vstack(list(self.score_batches(queries)))
+
+    def search(self, queries: Sequence[str],
+        k: int = 10,
+        bm25: Optional[BM25Index] = None,
+        lexical_weight: float = DEFAULT_LEXICAL_WEIGHT,
+        batch_size: int = DEFAULT_QUERY_BATCH,
+        block_rows: int = DEFAULT_BLOCK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k document indices and scores per query, best first (ties rank the
+        later document first, as in BM25Index.search).
+
+        With `bm25` (an index of the same documents in the same order) the score is
+        hybrid: (1 - lexical_weight) * cosine + lexical_weight * BM25 / the query's
+        best BM25 score. BM25 scores stay sparse and are densified one block at a time.
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0), dtype=np.float32)
+        if bm25 is not None:
+            self._check_aligned(bm25)
+
+        indices, scores = [], []
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            embedded = self.embedder.embed(batch)
+            lexical = _normalized_bm25(bm25, batch) if bm25 is not None else None
+            top = np.zeros((len(batch), 0), dtype=np.int64)
+            top_scores = np.zeros((len(batch), 0), dtype=np.float32)
+            for offset, block in self._blocks(block_rows):
+                block_scores = embedded @ block.T
+                if lexical is not None:
+                    block_scores *= 1 - lexical_weight
+                    block_scores += lexical_weight * lexical[:, offset:offset + len(block)].toarray()
+                top, top_scores = _merge_block(top, top_scores, block_scores, offset, k)
+
+            order = np.lexsort((-top, -top_scores), axis=1)
+            indices.append(np.take_along_axis(top, order, axis=1))
+            scores.append(np.take_along_axis(top_scores, order, axis=1))
+        if not indices:
+            return np.zeros((0, k), dtype=np.int64), np.zeros((0, k), dtype=np.float32)
+        return np.vstack(indices), np.vstack(scores)
+
+    def _check_aligned(self, bm25: BM25Index) -> None:
+        # Checked once per BM25 index; comparing a million ids on every search would not be free
+        if bm25 is self._aligned_bm25:
+            return
+        if bm25.doc_ids != self.doc_ids:
+            raise ValueError("bm25 must index the same documents in the same order as the dense index")
+        self._aligned_bm25 = bm25
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # Selected columns in ascending order, so that candidates concatenated block after
+    # block stay in document order and top_k_columns' tie rule keeps the later documents
+    if scores.shape[1] <= k:
+        return np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    return np.sort(top_k_columns(scores, k), axis=1)
+
+
+def _merge_block(top: np.ndarray, top_scores: np.ndarray, block_scores: np.ndarray,
+    offset: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Running top-k (document order) updated with one (queries x block) score block.
+    Once k documents are held, only block scores at least each query's current k-th
+    score can enter, and when few do they are gathered into a narrow padded candidate
+    matrix instead of partitioning the whole block.
+    """
+    candidates = None
+    if top.shape[1] == k:
+        rows, columns = np.nonzero(block_scores >= top_scores.min(axis=1, keepdims=True))
+        if not len(rows):
+            return top, top_scores
+        counts = np.bincount(rows, minlength=len(top))
+        width = int(counts.max())
+        if width * CANDIDATE_FRACTION < block_scores.shape[1]:
+            # np.nonzero is row-major, so each row's candidates stay in document order
+            slots = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+            candidates = np.zeros((len(top), width), dtype=np.int64)
+            candidate_scores = np.full((len(top), width), -np.inf, dtype=np.float32)
+            candidates[rows, slots] = columns + offset
+            candidate_scores[rows, slots] = block_scores[rows, columns]
+    if candidates is None:
+        block_top = _top_k(block_scores, k)
+        candidates = block_top + offset
+        candidate_scores = np.take_along_axis(block_scores, block_top, axis=1)
+
+    top = np.concatenate([top, candidates], axis=1)
+    top_scores = np.concatenate([top_scores, candidate_scores], axis=1)
+    keep = _top_k(top_scores, k)
+    return np.take_along_axis(top, keep, axis=1), np.take_along_axis(top_scores, keep, axis=1)
+
+
+def _normalized_bm25(bm25: BM25Index, queries: Sequence[str]) -> sparse.csc_matrix:
+    # Sparse (queries x documents) BM25 scores divided by each query's best score;
+    # CSC so per-block column slices are cheap
+    lexical = (bm25.query_matrix(queries) @ bm25.weights).tocsr()
+    best = lexical.max(axis=1).toarray().ravel()
+    scale = np.divide(1.0, best, out=np.zeros_like(best), where=best > 0)
+    return sparse.csc_matrix(sparse.diags(scale) @ lexical, dtype=np.float32)
+
+
+def _write_metadata(path: Union[str, PathLike], doc_ids: Sequence[str], embedder: Embedder, dtype: str) -> None:
+    with open(os.path.join(path, DOC_IDS_FILE), "wb") as handle:
+        np.save(handle, np.array(doc_ids, dtype=str))
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as handle:
+        json.dump({"documents": len(doc_ids), "dtype": dtype, "embedder": embedder.config()}, handle, indent=2)
@@ -0,0 +1,174 @@
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set
+import numpy as np
+import pandas as pd
+
+# Term lists of the notebook's Geospatial Faithfulness Score (GFS)
+POINT_TERMS = ["point", "point-based", "latitude", "longitude"]
+POLYGON_TERMS = ["polygon", "polygon-based", "boundary"]
+POLYLINE_TERMS = ["polyline", "line", "centerline"]
+MULTI_TERMS = ["multi", "multi polygon", "multipolygon"]
+
+EVENT_TERMS = ["event", "incident"]
+INFRA_TERMS = ["infrastructure", "fixed infrastructure"]
+BOUNDARY_TERMS = ["boundary", "administrative boundary"]
+OBSERVATION_TERMS = ["observation", "observational data", "sensor-based observation"]
+
+# Feature -> terms; a description has a feature when it contains any of its terms
+GEOMETRY_FEATURE_TERMS = {
+    "point": POINT_TERMS,
+    "polygon": POLYGON_TERMS,
+    "polyline": POLYLINE_TERMS,
+    "multi": MULTI_TERMS,
+}
+ROLE_FEATURE_TERMS = {
+    "event": EVENT_TERMS,
+    "infrastructure": INFRA_TERMS,
+    "boundary": BOUNDARY_TERMS,
+    "observation": OBSERVATION_TERMS,
+}
+FEATURE_TERMS = {**GEOMETRY_FEATURE_TERMS, **ROLE_FEATURE_TERMS}
+FEATURE_NAMES = list(FEATURE_TERMS)
+
+SCORE_COLUMNS = ["spatial_role", "geometry_type", "geometry_match", "role_match", "gfs"]
+
+
+def compile_feature_patterns(feature_terms: Mapping[str, Sequence[str]]) -> Dict[str, str]:
+    """
+    One regex alternation per feature. Terms containing a shorter term of the same
+    feature are dropped, since they can never decide a match ("centerline" is covered
+    by "line", "administrative boundary" by "boundary").
+    """
+    patterns = {}
+    for feature, terms in feature_terms.items():
+        kept: List[str] = []
+        for term in sorted({t.lower() for t in terms if t}, key=len):
+            if not any(shorter in term for shorter in kept):
+                kept.append(term)
+        patterns[feature] = "|".join(re.escape(term) for term in kept)
+    return patterns
+
+
+class FaithfulnessEvaluator:
+    """
+    Batch Geospatial Faithfulness Score: whether each description mentions the geometry
+    type and the spatial role of its GeoProfile (0, 0.5 or 1).
+
+    The term lists are compiled once into one pattern per feature. Descriptions are
+    lower-cased as one string column, and each feature is a single vectorized regex
+    search over that column (Arrow compute kernels with pandas' Arrow-backed strings).
+    Results are exactly the notebook's `any(term in text.lower() ...)`.
+    """
+
+    def __init__(self, feature_terms: Mapping[str, Sequence[str]] = FEATURE_TERMS):
+        self.feature_names = list(feature_terms)
+        self.patterns = compile_feature_patterns(feature_terms)
+
+    def features(self, descriptions: Sequence[str]) -> pd.DataFrame:
+        """
+        One boolean column per feature, one row per description. A multi-geometry
+        mention also counts as a polygon mention, as in the notebook.
+        """
+        lowered = pd.Series(list(descriptions), dtype="str").fillna("").str.lower()
+        masks = {
+            name: lowered.str.contains(pattern).to_numpy(dtype=bool, na_value=False) if pattern
+            else np.zeros(len(lowered), dtype=bool)
+            for name, pattern in self.patterns.items()
+        }
+        if "multi" in masks and "polygon" in masks:
+            masks["polygon"] = masks["polygon"] | masks["multi"]
+        return pd.DataFrame(masks)
+
+    def score(self, geo_profiles: Sequence[Any], descriptions: Sequence[str]) -> pd.DataFrame:
+        """
+        Per-pair GFS dimensions: the profile's role and geometry type, whether each one
+        is mentioned (geometry_match, role_match) and their mean (gfs).
+        """
+        if len(geo_profiles) != len(descriptions):
+            raise ValueError("geo_profiles and descriptions must have the same length")
+        features = self.features(descriptions)
+        roles = np.array([p.spatial_role for p in geo_profiles], dtype=object)
+        geometries = np.array([p.geometry_type for p in geo_profiles], dtype=object)
+        geometry_match = _mentioned(features, geometries)
+        role_match = _mentioned(features, roles)
+        return pd.DataFrame({
+            "spatial_role": roles,
+            "geometry_type": geometries,
+            "geometry_match": geometry_match,
+            "role_match": role_match,
+            "gfs": (geometry_match.astype(np.float64) + role_match) / 2,
+        }, columns=SCORE_COLUMNS)
+
+    def compare(self, geo_profiles: Sequence[Any],
+        systems: Mapping[str, Sequence[str]],
+        dataset_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        The notebook's faithfulness table for any number of description systems:
+        Dataset, Spatial Role, Geometry Type and one "<system> GFS" column per system.
+        """
+        dataset_ids = list(dataset_ids) if dataset_ids is not None else [f"D{i + 1}" for i in range(len(geo_profiles))]
+        table = pd.DataFrame({
+            "Dataset": dataset_ids,
+            "Spatial Role": [p.spatial_role for p in geo_profiles],
+            "Geometry Type": [p.geometry_type for p in geo_profiles],
+        })
+        for name, descriptions in systems.items():
+            table[f"{name} GFS"] = self.score(geo_profiles, descriptions)["gfs"].to_numpy()
+        return table
+
+
+def _mentioned(features: pd.DataFrame, labels: np.ndarray) -> np.ndarray:
+    # features[labels[i]][i] for every row; labels that are not features never match
+    matched = np.zeros(len(labels), dtype=bool)
+    for name in features.columns:
+        rows = labels == name
+        if rows.any():
+            matched[rows] = features[name].to_numpy()[rows]
+    return matched
+
+
+def summarize_scores(scores: pd.DataFrame, by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Mean geometry/role match and GFS, overall or per `by` column (e.g. "spatial_role").
+    """
+    metrics = ["geometry_match", "role_match", "gfs"]
+    if by is None:
+        return scores[metrics].mean().to_frame().T.assign(count=len(scores))
+    grouped = scores.groupby(by, dropna=False)[metrics]
+    return grouped.mean().assign(count=grouped.size()).reset_index()
+
+
+_default_evaluator: Optional[FaithfulnessEvaluator] = None
+
+
+def default_evaluator() -> FaithfulnessEvaluator:
+    global _default_evaluator
+    if _default_evaluator is None:
+        _default_evaluator = FaithfulnessEvaluator()
+    return _default_evaluator
+
+
+def extract_geo_features(text: str) -> Set[str]:
+    """
+    The notebook's single-description feature extraction (set of feature names).
+    """
+    row = default_evaluator().features([text]).iloc[0]
+    return {name for name in FEATURE_NAMES if row[name]}
+
+
+def geospatial_faithfulness(geo_profile: Any, description_features: Iterable[str]) -> float:
+    features = set(description_features)
+    return ((geo_profile.geometry_type in features) + (geo_profile.spatial_role in features)) / 2
+
+
+def compute_faithfulness_scores(evaluation_records: Sequence[Mapping[str, Any]]) -> pd.DataFrame:
+    """
+    The notebook's table (Dataset, Spatial Role, Geometry Type, Baseline GFS, Geo GFS)
+    from records with "geo_profile", "baseline_description" and "geo_description",
+    scored in one batch per description system.
+    """
+    profiles: List[Any] = [record["geo_profile"] for record in evaluation_records]
+    return default_evaluator().compare(profiles, {
+        "Baseline": [record["baseline_description"] for record in evaluation_records],
+        "Geo": [record["geo_description"] for record in evaluation_records],
+    })
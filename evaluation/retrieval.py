@@ -0,0 +1,253 @@
+import os
+from os import PathLike
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# BM25Okapi defaults (same as rank_bm25, used by the notebook)
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+DEFAULT_EPSILON = 0.25
+
+# Queries scored per sparse product; bounds the dense (queries x documents) score block
+DEFAULT_QUERY_BATCH = 256
+
+METRIC_NAMES = ["Precision@K", "Recall@K", "Hit@K", "MRR", "nDCG@K", "MAP"]
+
+
+def tokenize(text: str) -> List[str]:
+    return text.lower().split()
+
+
+class BM25Index:
+    """
+    BM25Okapi over a CSR term-document matrix.
+
+    Each stored entry is the full BM25 term weight of a (term, document) pair, so
+    scoring a batch of queries is one sparse product of the query term-count matrix
+    with the index, and scores match `rank_bm25.BM25Okapi.get_scores` exactly.
+    """
+
+    def __init__(self,
+        doc_ids: Sequence[str],
+        terms: Sequence[str],
+        weights: sparse.csr_matrix,
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        epsilon: float = DEFAULT_EPSILON):
+        self.doc_ids = list(doc_ids)
+        self.terms = list(terms)
+        self.vocabulary = {term: i for i, term in enumerate(self.terms)}
+        self.weights = weights  # terms x documents
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @staticmethod
+    def build(corpus: Mapping[str, str],
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        epsilon: float = DEFAULT_EPSILON) -> "BM25Index":
+        """
+        Indexes a {dataset id: description} corpus.
+        """
+        doc_ids = list(corpus.keys())
+        tokenized = [tokenize(corpus[d]) for d in doc_ids]
+        lengths = np.fromiter((len(tokens) for tokens in tokenized), dtype=np.int64, count=len(tokenized))
+
+        # Term ids for every token of every document, then (term, doc) counts
+        codes, terms = pd.factorize(pd.Series([t for tokens in tokenized for t in tokens], dtype=object))
+        docs = np.repeat(np.arange(len(doc_ids)), lengths)
+        counts = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.float64), (codes, docs)), shape=(len(terms), len(doc_ids))
+        )
+        counts.sum_duplicates()
+
+        n_docs = len(doc_ids)
+        doc_freq = np.diff(counts.indptr)
+        idf = np.log(n_docs - doc_freq + 0.5) - np.log(doc_freq + 0.5)
+        if len(idf):
+            idf[idf < 0] = epsilon * idf.mean()
+
+        avgdl = lengths.sum() / n_docs if n_docs else 0.0
+        tf = counts.data
+        doc_of_entry = counts.indices
+        norm = k1 * (1 - b + b * lengths[doc_of_entry] / avgdl) if avgdl else np.full(len(tf), k1)
+        term_of_entry = np.repeat(np.arange(len(terms)), doc_freq)
+        counts.data = idf[term_of_entry] * tf * (k1 + 1) / (tf + norm)
+        return BM25Index(doc_ids, list(terms), counts, k1=k1, b=b, epsilon=epsilon)
+
+    def query_matrix(self, queries: Sequence[str]) -> sparse.csr_matrix:
+        # Query term counts; repeated query terms count repeatedly, unknown terms are dropped
+        rows, cols = [], []
+        for i, query in enumerate(queries):
+            for token in tokenize(query):
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    rows.append(i)
+                    cols.append(column)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=(len(queries), len(self.terms))
+        )
+
+    def score_batches(self, queries: Sequence[str], batch_size: int = DEFAULT_QUERY_BATCH) -> Iterable[np.ndarray]:
+        """
+        Dense (batch x documents) BM25 score blocks, `batch_size` queries at a time.
+        """
+        for start in range(0, len(queries), batch_size):
+            block = self.query_matrix(queries[start:start + batch_size]) @ self.weights
+            yield block.toarray()
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        if not len(queries):
+            return np.zeros((0, len(self)))
+        return np.vstack(list(self.score_batches(queries)))
+
+    def search(self, queries: Sequence[str],
+        k: int = 10,
+        batch_size: int = DEFAULT_QUERY_BATCH) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k document indices and scores per query, best first. Rows are only
+        partitioned (argpartition) and the k selected documents sorted. Ties rank the
+        later document first, as in the notebook's `np.argsort(scores)[::-1]`.
+        """
+        k = min(k, len(self))
+        indices, scores = [], []
+        if k <= 0:
+            return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0))
+        for block in self.score_batches(queries, batch_size):
+            top = top_k_columns(block, k)
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.lexsort((-top, -top_scores), axis=1)
+            indices.append(np.take_along_axis(top, order, axis=1))
+            scores.append(np.take_along_axis(top_scores, order, axis=1))
+        if not indices:
+            return np.zeros((0, k), dtype=np.int64), np.zeros((0, k))
+        return np.vstack(indices), np.vstack(scores)
+
+    def save(self, path: Union[str, PathLike]) -> None:
+        """
+        Stores the index as one uncompressed .npz file (no pickled objects).
+        """
+        with open(path, "wb") as handle:
+            np.savez(
+                handle,
+                indptr=self.weights.indptr,
+                indices=self.weights.indices,
+                data=self.weights.data,
+                shape=np.array(self.weights.shape, dtype=np.int64),
+                doc_ids=np.array(self.doc_ids, dtype=str),
+                terms=np.array(self.terms, dtype=str),
+                params=np.array([self.k1, self.b, self.epsilon]),
+            )
+
+    @staticmethod
+    def load(path: Union[str, PathLike]) -> "BM25Index":
+        with np.load(os.fspath(path), allow_pickle=False) as data:
+            weights = sparse.csr_matrix(
+                (data["data"], data["indices"], data["indptr"]), shape=tuple(data["shape"])
+            )
+            k1, b, epsilon = data["params"].tolist()
+            return BM25Index(data["doc_ids"].tolist(), data["terms"].tolist(), weights, k1=k1, b=b, epsilon=epsilon)
+
+
+def top_k_columns(block: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column indices of the k highest scores of every row, unordered (1 <= k <= columns).
+    Among columns tied at the k-th score the later ones are kept, so sorting the
+    selection by (score, column) descending gives the top of a full ranking.
+    """
+    top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    kth = np.take_along_axis(block, top, axis=1).min(axis=1)[:, None]
+
+    # argpartition picks arbitrarily among documents tied at the k-th score;
+    # only rows where such ties straddle the cut-off are re-selected
+    ambiguous = np.flatnonzero(np.count_nonzero(block >= kth, axis=1) > k)
+    if len(ambiguous):
+        rows, row_kth = block[ambiguous], kth[ambiguous]
+        ties = rows == row_kth
+        ties_from_end = np.cumsum(ties[:, ::-1], axis=1)[:, ::-1]
+        missing = k - np.count_nonzero(rows > row_kth, axis=1)[:, None]
+        selected = (rows > row_kth) | (ties & (ties_from_end <= missing))
+        top[ambiguous] = np.nonzero(selected)[1].reshape(len(ambiguous), k)
+    return top
+
+
+def relevant_ranks(scores: np.ndarray, relevant: Sequence[int]) -> np.ndarray:
+    """
+    0-based ranks of the `relevant` documents in the full ranking of one score row
+    (ties rank the later document first), without sorting the row.
+    """
+    relevant = np.asarray(relevant, dtype=np.int64)
+    if not len(relevant):
+        return relevant
+    own = scores[relevant][:, None]
+    later = np.arange(len(scores))[None, :] > relevant[:, None]
+    return np.sort(np.count_nonzero((scores[None, :] > own) | ((scores[None, :] == own) & later), axis=1))
+
+
+def retrieval_metrics(index: Any,
+    gold: Mapping[str, Iterable[str]],
+    k: int = 2,
+    batch_size: int = DEFAULT_QUERY_BATCH) -> pd.DataFrame:
+    """
+    Per-query Precision@K, Recall@K, Hit@K, MRR, nDCG@K and AP of `index` (a BM25Index
+    or anything with `doc_ids` and `score_batches`, e.g. a DenseIndex) for a gold set
+    of {query: relevant dataset ids}, with the notebook's definitions. Metrics are
+    computed from the ranks of the relevant documents only, so no query's full
+    ranking is ever sorted.
+    """
+    queries = list(gold.keys())
+    positions = {doc_id: i for i, doc_id in enumerate(index.doc_ids)}
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+
+    rows = []
+    scored = (row for block in index.score_batches(queries, batch_size) for row in block)
+    for query, row in zip(queries, scored):
+        relevant = set(gold[query])
+        ranks = relevant_ranks(row, [positions[d] for d in relevant if d in positions])
+
+        hits = int(np.count_nonzero(ranks < k))
+        top_ranks = ranks[ranks < k]
+        ideal = discounts[:min(len(ranks), k)].sum()
+        rows.append({
+            "Query": query,
+            "Precision@K": hits / k,
+            "Recall@K": hits / (len(relevant) or 1),
+            "Hit@K": 1 if hits > 0 else 0,
+            "MRR": 1 / (ranks[0] + 1) if len(ranks) else 0,
+            "nDCG@K": float(discounts[top_ranks].sum() / (ideal or 1.0)),
+            "MAP": float(np.sum(np.arange(1, len(ranks) + 1) / (ranks + 1)) / len(relevant)) if relevant else 0,
+        })
+    return pd.DataFrame(rows, columns=["Query"] + METRIC_NAMES)
+
+
+def eval_corpus(corpus: Union[Mapping[str, str], Any],
+    gold: Mapping[str, Iterable[str]],
+    k: int = 2) -> pd.DataFrame:
+    """
+    Macro-averaged retrieval metrics of a corpus (or a prebuilt BM25Index or DenseIndex)
+    as a one-row table.
+    """
+    index = corpus if hasattr(corpus, "score_batches") else BM25Index.build(corpus)
+    per_query = retrieval_metrics(index, gold, k=k)
+    return pd.DataFrame({metric: [per_query[metric].mean()] for metric in METRIC_NAMES})
+
+
+def compare_corpora(corpora: Mapping[str, Union[Mapping[str, str], BM25Index]],
+    gold: Mapping[str, Iterable[str]],
+    k: int = 2,
+    names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    One row of macro-averaged metrics per corpus, e.g.
+    `compare_corpora({"Baseline": corpus_baseline, "AutoDDG-Geo": corpus_geo}, gold_data)`.
+    """
+    names = list(names) if names is not None else list(corpora.keys())
+    tables = [eval_corpus(corpora[name], gold, k=k) for name in names]
+    comparison = pd.concat(tables, ignore_index=True)
+    comparison.insert(0, "Model", names)
+    return comparison
@@ -0,0 +1,113 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+import pandas as pd
+from .geo_profiler import GeoProfiler
+from .models import GeoProfile
+from .streaming import DEFAULT_CHUNKSIZE, DatasetSource
+
+# (semantic profile text, dataset source) pair accepted by profile_catalog
+CatalogItem = Tuple[str, DatasetSource]
+
+
+# Outcome of profiling one catalog entry
+@dataclass
+class BatchProfileResult:
+    index: int
+    source: str
+    geo_profile: Optional[GeoProfile] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _describe_source(source: DatasetSource) -> str:
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    if isinstance(source, pd.DataFrame):
+        return f"<DataFrame {source.shape[0]}x{source.shape[1]}>"
+    return repr(source)
+
+
+def _profile_one(task) -> BatchProfileResult:
+    index, semantic_profile, source, loader, chunksize, scan_values = task
+    result = BatchProfileResult(index=index, source=_describe_source(source))
+    try:
+        # Datasets are loaded here, inside the worker, so only paths cross process boundaries
+        if loader is not None:
+            source = loader(source)
+        if isinstance(source, pd.DataFrame):
+            result.geo_profile = GeoProfiler.infer_geo_profile(semantic_profile, source, scan_values=scan_values)
+        else:
+            result.geo_profile = GeoProfiler.infer_geo_profile_streaming(
+                semantic_profile, source, chunksize=chunksize, scan_values=scan_values
+            )
+    except Exception:
+        result.error = traceback.format_exc()
+    return result
+
+
+def _profile_many(tasks) -> List[BatchProfileResult]:
+    return [_profile_one(task) for task in tasks]
+
+
+def _failed(task, exc: BaseException) -> BatchProfileResult:
+    # An entry whose task never ran, e.g. because its source could not be pickled
+    index, _, source = task[:3]
+    return BatchProfileResult(index=index, source=_describe_source(source), error="".join(traceback.format_exception(exc)))
+
+
+def profile_catalog(items: Sequence[CatalogItem],
+    max_workers: Optional[int] = None,
+    loader: Optional[Callable[[DatasetSource], DatasetSource]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    scan_values: bool = False) -> List[BatchProfileResult]:
+    """
+    Profiles many (semantic profile, dataset source) pairs across a process pool.
+
+    Sources are normally CSV paths; each worker reads its dataset with the streaming
+    reader (or with `loader`, which must be a picklable module-level function), so
+    DataFrames are never pickled between processes. Failures are captured per dataset
+    in `BatchProfileResult.error`, including entries that could not be sent to a
+    worker (an unpicklable source such as a generator), and results are returned in
+    input order. `max_workers=1` runs everything in the calling process.
+    """
+    tasks = [
+        (index, semantic_profile, source, loader, chunksize, scan_values)
+        for index, (semantic_profile, source) in enumerate(items)
+    ]
+    if not tasks:
+        return []
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_profile_one(task) for task in tasks]
+
+    # Hand out several datasets per task message to amortize IPC on large catalogs
+    batch_size = max(1, len(tasks) // (workers * 4))
+    results: List[BatchProfileResult] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        batches = [tasks[start:start + batch_size] for start in range(0, len(tasks), batch_size)]
+        futures = [executor.submit(_profile_many, batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            try:
+                results.extend(future.result())
+            except Exception:
+                # The batch failed as a whole; resend its entries one by one so that only
+                # the entries that cannot be sent fail
+                results.extend(_profile_each(executor, batch))
+    return results
+
+
+def _profile_each(executor: ProcessPoolExecutor, tasks) -> List[BatchProfileResult]:
+    results = []
+    for task in tasks:
+        try:
+            results.append(executor.submit(_profile_one, task).result())
+        except Exception as exc:
+            results.append(_failed(task, exc))
+    return results
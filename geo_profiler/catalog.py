@@ -0,0 +1,264 @@
+import json
+import os
+from dataclasses import asdict
+from os import PathLike
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+import numpy as np
+from .column_stats import DatasetStats
+from .columnar import _pyarrow
+from .models import (
+    ColumnSemantic,
+    DatasetSemanticProfile,
+    EnrichedDatasetProfile,
+    GeoProfile,
+    ResolutionEvidence,
+    _intern,
+)
+
+# Version of the catalog's Parquet layout
+CATALOG_FORMAT_VERSION = 1
+
+# Files of a catalog directory
+DATASETS_FILE = "datasets.parquet"
+COLUMNS_FILE = "columns.parquet"
+
+# Enum-like string fields, stored dictionary-encoded and decoded to interned strings
+DATASET_LABEL_FIELDS = ["spatial_role", "geometry_type", "spatial_resolution"]
+COLUMN_LABEL_FIELDS = ["spatial_resolution", "domain_type", "function", "raw_type"]
+
+
+class ProfileCatalog:
+    """
+    Array-backed store of many dataset profiles: one Arrow table with a row per dataset
+    (GeoProfile fields, dataset flags) and one with a row per column (ColumnSemantic
+    fields, in dataset order). Enum-like fields and column names are dictionary-encoded
+    with the narrowest index type, lists are Arrow list columns, and the rarely read
+    nested objects (resolution evidence, raw metadata, column sketches, geometry
+    histograms) are JSON strings.
+
+    Profiles are materialized only when asked for, one at a time or in bulk, with one
+    string object per distinct label. `save`/`load` write the two tables as Parquet.
+    """
+
+    def __init__(self, datasets: Any, columns: Any):
+        self.datasets = datasets.unify_dictionaries().combine_chunks()
+        self.columns = columns.unify_dictionaries().combine_chunks()
+        self.dataset_ids: List[str] = self.datasets.column("dataset_id").to_pylist()
+        counts = self.datasets.column("column_count").to_numpy()
+        self.column_offsets = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+        self._positions: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.dataset_ids)
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self.positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.dataset_ids)
+
+    @property
+    def positions(self) -> Dict[str, int]:
+        if self._positions is None:
+            self._positions = {dataset_id: i for i, dataset_id in enumerate(self.dataset_ids)}
+        return self._positions
+
+    @property
+    def nbytes(self) -> int:
+        return self.datasets.nbytes + self.columns.nbytes
+
+    @staticmethod
+    def from_profiles(profiles: Mapping[str, Union[EnrichedDatasetProfile, GeoProfile]]) -> "ProfileCatalog":
+        """
+        Builds a catalog from {dataset id: EnrichedDatasetProfile or GeoProfile}; a bare
+        GeoProfile is stored with empty dataset semantics.
+        """
+        pa, _, _ = _pyarrow()
+        datasets: Dict[str, List[Any]] = {name: [] for name in [
+            "dataset_id", *DATASET_LABEL_FIELDS, "spatial_use_cases", "has_spatial", "has_temporal",
+            "detected_spatial_columns", "column_count", "resolution_evidence", "raw_metadata", "column_sketches",
+        ]}
+        columns: Dict[str, List[Any]] = {name: [] for name in [
+            "name", "is_spatial", "is_temporal", *COLUMN_LABEL_FIELDS, "sample_values", "geometry_histogram",
+        ]}
+        for dataset_id, profile in profiles.items():
+            if isinstance(profile, GeoProfile):
+                profile = EnrichedDatasetProfile(DatasetSemanticProfile(), profile)
+            geo, semantics = profile.geo_profile, profile.dataset_semantics
+            datasets["dataset_id"].append(str(dataset_id))
+            for name in DATASET_LABEL_FIELDS:
+                datasets[name].append(getattr(geo, name))
+            datasets["spatial_use_cases"].append(geo.spatial_use_cases)
+            datasets["has_spatial"].append(semantics.has_spatial)
+            datasets["has_temporal"].append(semantics.has_temporal)
+            datasets["detected_spatial_columns"].append(list(semantics.detected_spatial_columns))
+            datasets["column_count"].append(len(semantics.columns))
+            evidence = semantics.resolution_evidence
+            datasets["resolution_evidence"].append(_json(asdict(evidence) if evidence is not None else None))
+            datasets["raw_metadata"].append(_json(profile.raw_metadata))
+            sketches = profile.column_sketches
+            datasets["column_sketches"].append(_json(sketches.to_dict() if sketches is not None else None))
+
+            for col in semantics.columns:
+                columns["name"].append(col.name)
+                columns["is_spatial"].append(col.is_spatial)
+                columns["is_temporal"].append(col.is_temporal)
+                for name in COLUMN_LABEL_FIELDS:
+                    columns[name].append(getattr(col, name))
+                columns["sample_values"].append([str(v) for v in col.sample_values])
+                columns["geometry_histogram"].append(_json(col.geometry_histogram))
+
+        encoded = set(DATASET_LABEL_FIELDS) | set(COLUMN_LABEL_FIELDS) | {"name"}
+        types = {
+            "has_spatial": pa.bool_(), "has_temporal": pa.bool_(), "is_spatial": pa.bool_(),
+            "is_temporal": pa.bool_(), "column_count": pa.int32(),
+            "spatial_use_cases": pa.list_(pa.string()), "detected_spatial_columns": pa.list_(pa.string()),
+            "sample_values": pa.list_(pa.string()),
+        }
+
+        def table(values: Dict[str, List[Any]]):
+            arrays = {}
+            for name, column in values.items():
+                array = pa.array(column, type=types.get(name, pa.string()))
+                arrays[name] = _dictionary(array) if name in encoded else array
+            return pa.table(arrays)
+
+        return ProfileCatalog(table(datasets), table(columns))
+
+    def geo_profile(self, dataset_id: str) -> GeoProfile:
+        row = self.positions[dataset_id]
+        return _geo_profiles(self.datasets.slice(row, 1))[0]
+
+    def profile(self, dataset_id: str) -> EnrichedDatasetProfile:
+        row = self.positions[dataset_id]
+        start, stop = self.column_offsets[row], self.column_offsets[row + 1]
+        return _profiles(self.datasets.slice(row, 1), self.columns.slice(start, stop - start))[0]
+
+    def geo_profiles(self) -> Dict[str, GeoProfile]:
+        """
+        Every GeoProfile, decoded column by column (no per-row Arrow access).
+        """
+        return dict(zip(self.dataset_ids, _geo_profiles(self.datasets)))
+
+    def profiles(self) -> Dict[str, EnrichedDatasetProfile]:
+        return dict(zip(self.dataset_ids, _profiles(self.datasets, self.columns)))
+
+    def geo_frame(self):
+        """
+        A DataFrame of dataset id, role, geometry type and resolution (categoricals),
+        for catalog-wide counts and filters without materializing profiles.
+        """
+        return self.datasets.select(["dataset_id", *DATASET_LABEL_FIELDS]).to_pandas()
+
+    def save(self, path: Union[str, PathLike]) -> None:
+        """
+        Writes the catalog directory (datasets.parquet, columns.parquet; zstd-compressed).
+        """
+        _, _, pq = _pyarrow()
+        os.makedirs(path, exist_ok=True)
+        metadata = {"format_version": str(CATALOG_FORMAT_VERSION)}
+        for table, name in ((self.datasets, DATASETS_FILE), (self.columns, COLUMNS_FILE)):
+            pq.write_table(table.replace_schema_metadata(metadata), os.path.join(path, name), compression="zstd")
+
+    @staticmethod
+    def load(path: Union[str, PathLike], memory_map: bool = True) -> "ProfileCatalog":
+        _, _, pq = _pyarrow()
+        tables = []
+        for name in (DATASETS_FILE, COLUMNS_FILE):
+            table = pq.read_table(os.path.join(path, name), memory_map=memory_map)
+            version = (table.schema.metadata or {}).get(b"format_version", b"").decode()
+            if version != str(CATALOG_FORMAT_VERSION):
+                raise ValueError(f"Unsupported catalog format version: {version or None}")
+            tables.append(table.replace_schema_metadata(None))
+        return ProfileCatalog(*tables)
+
+
+def _dictionary(array: Any) -> Any:
+    # Dictionary-encodes with the narrowest index type for the number of distinct values
+    pa, _, _ = _pyarrow()
+    encoded = array.dictionary_encode()
+    distinct = len(encoded.dictionary)
+    index_type = pa.int8() if distinct <= 127 else pa.int16() if distinct <= 32767 else pa.int32()
+    return encoded.cast(pa.dictionary(index_type, pa.string()))
+
+
+def _json(value: Any) -> Optional[str]:
+    return json.dumps(value) if value is not None else None
+
+
+def _array(table: Any, name: str) -> Any:
+    pa, _, _ = _pyarrow()
+    column = table.column(name)
+    return column.chunk(0) if column.num_chunks == 1 else pa.concat_arrays(column.chunks) if column.num_chunks else pa.array([], type=column.type)
+
+
+def _strings(array: Any, intern: bool = False) -> List[Optional[str]]:
+    # One Python string per distinct value (interned for enum-like labels) instead of
+    # one per row
+    pa, _, _ = _pyarrow()
+    if not pa.types.is_dictionary(array.type):
+        array = array.dictionary_encode()
+    labels = array.dictionary.to_pylist()
+    if intern:
+        labels = [_intern(label) for label in labels]
+    lookup = np.array(labels + [None], dtype=object)
+    codes = array.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+    return lookup[codes].tolist()
+
+
+def _string_lists(array: Any) -> List[List[str]]:
+    offsets = array.offsets.to_numpy()
+    offsets = offsets - offsets[0]
+    values = _strings(array.flatten())
+    return [values[start:stop] for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _loads(array: Any) -> List[Any]:
+    return [json.loads(value) if value is not None else None for value in array.to_pylist()]
+
+
+def _geo_profiles(datasets: Any) -> List[GeoProfile]:
+    roles, geometries, resolutions = (_strings(_array(datasets, name), intern=True) for name in DATASET_LABEL_FIELDS)
+    use_cases = _string_lists(_array(datasets, "spatial_use_cases"))
+    return [GeoProfile(*fields) for fields in zip(roles, geometries, resolutions, use_cases)]
+
+
+def _profiles(datasets: Any, columns: Any) -> List[EnrichedDatasetProfile]:
+    names = _strings(_array(columns, "name"))
+    is_spatial = _array(columns, "is_spatial").to_pylist()
+    is_temporal = _array(columns, "is_temporal").to_pylist()
+    resolutions, domains, functions, raw_types = (
+        _strings(_array(columns, name), intern=True) for name in COLUMN_LABEL_FIELDS
+    )
+    samples = _string_lists(_array(columns, "sample_values"))
+    histograms = _loads(_array(columns, "geometry_histogram"))
+    column_semantics = [
+        ColumnSemantic(*fields) for fields in
+        zip(names, is_spatial, resolutions, is_temporal, domains, functions, raw_types, samples, histograms)
+    ]
+
+    counts = _array(datasets, "column_count").to_numpy()
+    offsets = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]).tolist()
+    has_spatial = _array(datasets, "has_spatial").to_pylist()
+    has_temporal = _array(datasets, "has_temporal").to_pylist()
+    detected = _string_lists(_array(datasets, "detected_spatial_columns"))
+    evidence = _loads(_array(datasets, "resolution_evidence"))
+    metadata = _loads(_array(datasets, "raw_metadata"))
+    sketches = _loads(_array(datasets, "column_sketches"))
+
+    profiles = []
+    for i, geo in enumerate(_geo_profiles(datasets)):
+        semantics = DatasetSemanticProfile(
+            columns=column_semantics[offsets[i]:offsets[i + 1]],
+            has_spatial=has_spatial[i],
+            has_temporal=has_temporal[i],
+            detected_spatial_columns=detected[i],
+            resolution_evidence=ResolutionEvidence(**evidence[i]) if evidence[i] is not None else None,
+        )
+        profiles.append(EnrichedDatasetProfile(
+            dataset_semantics=semantics,
+            geo_profile=geo,
+            raw_metadata=metadata[i],
+            column_sketches=DatasetStats.from_dict(sketches[i]) if sketches[i] is not None else None,
+        ))
+    return profiles
@@ -0,0 +1,276 @@
+import base64
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .models import ResolutionEvidence
+from .profilers.geometry_type_profiler import GeometryTypeProfiler
+from .profilers.spatial_resolution_profiler import (
+    LATITUDE_NAME_REGEX,
+    LONGITUDE_NAME_REGEX,
+    ColumnResolutionStats,
+    PointStats,
+    SpatialResolutionProfiler,
+    to_float,
+)
+from .semantic_parser import SAMPLE_SIZE, SemanticParser
+from .sketches import HLL_PRECISION, hash_values, hll_estimate, hll_merge, hll_registers
+
+# Number of non-null sample values kept per column (matches SemanticParser)
+DEFAULT_SAMPLE_SIZE = SAMPLE_SIZE
+
+
+def _min_of(left, right):
+    return right if left is None else left if right is None else min(left, right)
+
+
+def _max_of(left, right):
+    return right if left is None else left if right is None else max(left, right)
+
+
+# Per-column evidence that can be built chunk by chunk and merged
+@dataclass
+class ColumnStats:
+    name: str
+    row_count: int = 0
+    null_count: int = 0
+    sample_values: List[str] = field(default_factory=list)
+    sample_size: int = DEFAULT_SAMPLE_SIZE
+    geometry_histogram: Optional[Dict[str, int]] = None
+    resolution_stats: Optional[ColumnResolutionStats] = None   # value evidence, filled with scan_values
+
+    # Sketch fields, filled when updated with sketch=True
+    distinct_registers: Optional[np.ndarray] = None   # HyperLogLog registers
+    min_value: Optional[float] = None                 # numeric columns (e.g. lat/lon ranges)
+    max_value: Optional[float] = None
+    temporal_min: Optional[str] = None                # ISO timestamps, temporal columns only
+    temporal_max: Optional[str] = None
+
+    def update(self, series: pd.Series,
+        scan_values: bool = False,
+        sketch: bool = False,
+        temporal: bool = False) -> "ColumnStats":
+        """
+        Folds one chunk of the column into the running statistics.
+        With `scan_values`, the chunk's WKT/GeoJSON geometry types are counted and its
+        spatial resolution evidence (coordinate ranges, ZIP/borough codes, WKT points) is
+        collected as well.
+        With `sketch`, distinct-count registers and value ranges are maintained too
+        (temporal min/max only when `temporal`).
+        """
+        self.row_count += len(series)
+        self.null_count += int(series.isna().sum())
+
+        if scan_values or sketch:
+            chunk_histogram = GeometryTypeProfiler.scan_geometry_values(series.to_frame()).get(series.name)
+            if chunk_histogram is not None:
+                self.geometry_histogram = GeometryTypeProfiler.merge_histograms(self.geometry_histogram, chunk_histogram)
+        if scan_values:
+            self.resolution_stats = (self.resolution_stats or ColumnResolutionStats()).update(self.name, series)
+
+        if sketch:
+            self.update_sketch(series, temporal)
+
+        missing = self.sample_size - len(self.sample_values)
+        if missing > 0:
+            self.sample_values.extend(SemanticParser.first_non_null_values(series, missing))
+        return self
+
+    def update_sketch(self, series: pd.Series, temporal: bool = False) -> None:
+        registers = hll_registers(hash_values(series))
+        self.distinct_registers = registers if self.distinct_registers is None else hll_merge(self.distinct_registers, registers)
+
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            if series.notna().any():
+                self.min_value = _min_of(self.min_value, float(series.min()))
+                self.max_value = _max_of(self.max_value, float(series.max()))
+
+        if temporal:
+            stamps = series if pd.api.types.is_datetime64_any_dtype(series.dtype) else pd.to_datetime(series, errors="coerce")
+            stamps = stamps.dropna()
+            if len(stamps):
+                self.temporal_min = _min_of(self.temporal_min, stamps.min().isoformat())
+                self.temporal_max = _max_of(self.temporal_max, stamps.max().isoformat())
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        """
+        Combines statistics of two consecutive row ranges (self first, then other).
+        """
+        if self.distinct_registers is None or other.distinct_registers is None:
+            registers = self.distinct_registers if other.distinct_registers is None else other.distinct_registers
+        else:
+            registers = hll_merge(self.distinct_registers, other.distinct_registers)
+
+        merged = ColumnStats(
+            name=self.name,
+            row_count=self.row_count + other.row_count,
+            null_count=self.null_count + other.null_count,
+            sample_values=list(self.sample_values),
+            sample_size=self.sample_size,
+            geometry_histogram=GeometryTypeProfiler.merge_histograms(self.geometry_histogram, other.geometry_histogram),
+            resolution_stats=_merge_resolution_stats(self.resolution_stats, other.resolution_stats),
+            distinct_registers=None if registers is None else registers.copy(),
+            min_value=_min_of(self.min_value, other.min_value),
+            max_value=_max_of(self.max_value, other.max_value),
+            temporal_min=_min_of(self.temporal_min, other.temporal_min),
+            temporal_max=_max_of(self.temporal_max, other.temporal_max),
+        )
+        missing = merged.sample_size - len(merged.sample_values)
+        if missing > 0:
+            merged.sample_values.extend(other.sample_values[:missing])
+        return merged
+
+    @property
+    def is_sampled(self) -> bool:
+        return len(self.sample_values) >= self.sample_size
+
+    @property
+    def distinct_estimate(self) -> Optional[int]:
+        return None if self.distinct_registers is None else hll_estimate(self.distinct_registers)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "sample_values": list(self.sample_values),
+            "sample_size": self.sample_size,
+            "geometry_histogram": self.geometry_histogram,
+            "resolution_stats": self.resolution_stats.to_dict() if self.resolution_stats is not None else None,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "temporal_min": self.temporal_min,
+            "temporal_max": self.temporal_max,
+            "distinct_registers": None,
+        }
+        if self.distinct_registers is not None:
+            data["distinct_registers"] = base64.b64encode(self.distinct_registers.tobytes()).decode("ascii")
+        return data
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "ColumnStats":
+        data = dict(data)
+        registers = data.pop("distinct_registers", None)
+        resolution_stats = data.pop("resolution_stats", None)
+        stats = ColumnStats(**data)
+        if resolution_stats is not None:
+            stats.resolution_stats = ColumnResolutionStats.from_dict(resolution_stats)
+        if registers is not None:
+            stats.distinct_registers = np.frombuffer(base64.b64decode(registers), dtype=np.uint8).copy()
+        return stats
+
+
+def _merge_resolution_stats(left: Optional[ColumnResolutionStats],
+    right: Optional[ColumnResolutionStats]) -> Optional[ColumnResolutionStats]:
+    if left is None and right is None:
+        return None
+    return (left or ColumnResolutionStats()).merge(right or ColumnResolutionStats())
+
+
+# Dataset-level collection of ColumnStats
+@dataclass
+class DatasetStats:
+    columns: Dict[str, ColumnStats] = field(default_factory=dict)
+    row_count: int = 0
+    sample_size: int = DEFAULT_SAMPLE_SIZE
+    # Valid points of every (latitude, longitude)-named column pair, filled with scan_values;
+    # pairs are row-aligned, so they cannot be kept per column
+    point_stats: Dict[Tuple[str, str], PointStats] = field(default_factory=dict)
+
+    def update(self, chunk: pd.DataFrame,
+        columns: Optional[Iterable[str]] = None,
+        scan_values: bool = False,
+        sketch: bool = False,
+        temporal_columns: Iterable[str] = ()) -> "DatasetStats":
+        """
+        Folds one DataFrame chunk into the per-column statistics.
+        Only `columns` are tracked when given.
+        """
+        names = list(chunk.columns) if columns is None else [c for c in columns if c in chunk.columns]
+        temporal_columns = set(temporal_columns)
+        for name in names:
+            if name not in self.columns:
+                self.columns[name] = ColumnStats(name=name, sample_size=self.sample_size)
+            self.columns[name].update(
+                chunk[name], scan_values=scan_values, sketch=sketch, temporal=name in temporal_columns
+            )
+        if scan_values:
+            for pair in _coordinate_pairs(names):
+                points = self.point_stats.setdefault(pair, PointStats())
+                points.update(to_float(chunk[pair[0]]), to_float(chunk[pair[1]]))
+        self.row_count += len(chunk)
+        return self
+
+    def merge(self, other: "DatasetStats") -> "DatasetStats":
+        merged = DatasetStats(row_count=self.row_count + other.row_count, sample_size=self.sample_size)
+        for name in list(self.columns) + [n for n in other.columns if n not in self.columns]:
+            left = self.columns.get(name)
+            right = other.columns.get(name)
+            if left and right:
+                merged.columns[name] = left.merge(right)
+            else:
+                merged.columns[name] = (left or right).merge(ColumnStats(name=name))
+        for pair in list(self.point_stats) + [p for p in other.point_stats if p not in self.point_stats]:
+            left = self.point_stats.get(pair)
+            right = other.point_stats.get(pair)
+            merged.point_stats[pair] = left.merge(right) if left and right else (left or right).merge(PointStats())
+        return merged
+
+    @property
+    def is_sampled(self) -> bool:
+        return all(c.is_sampled for c in self.columns.values())
+
+    def samples(self) -> Dict[str, List[str]]:
+        return {name: list(stats.sample_values) for name, stats in self.columns.items()}
+
+    def geometry_histograms(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: dict(stats.geometry_histogram)
+            for name, stats in self.columns.items()
+            if stats.geometry_histogram is not None
+        }
+
+    def resolution_evidence(self, columns: Optional[List[str]] = None) -> ResolutionEvidence:
+        """
+        The ResolutionEvidence that `SpatialResolutionProfiler.scan_resolution_evidence`
+        gives for all rows at once, from statistics collected with scan_values.
+        `columns` sets the column order (the first qualifying columns are used).
+        """
+        names = list(self.columns) if columns is None else [c for c in columns if c in self.columns]
+        resolution_stats = {
+            name: self.columns[name].resolution_stats or ColumnResolutionStats() for name in names
+        }
+        return SpatialResolutionProfiler.merged_resolution_evidence(resolution_stats, self.point_stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "sample_size": self.sample_size,
+            "hll_precision": HLL_PRECISION,
+            "columns": [stats.to_dict() for stats in self.columns.values()],
+            "point_stats": [
+                {"columns": list(pair), **points.to_dict()} for pair, points in self.point_stats.items()
+            ],
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "DatasetStats":
+        columns = [ColumnStats.from_dict(c) for c in data.get("columns", [])]
+        point_stats = {}
+        for points in data.get("point_stats", []):
+            points = dict(points)
+            point_stats[tuple(points.pop("columns"))] = PointStats.from_dict(points)
+        return DatasetStats(
+            columns={c.name: c for c in columns},
+            row_count=data.get("row_count", 0),
+            sample_size=data.get("sample_size", DEFAULT_SAMPLE_SIZE),
+            point_stats=point_stats,
+        )
+
+
+def _coordinate_pairs(names: List[str]) -> List[Tuple[str, str]]:
+    # Every (latitude-named, longitude-named) pair of distinct columns
+    lowered = {name: str(name).lower() for name in names}
+    latitudes = [name for name in names if LATITUDE_NAME_REGEX.search(lowered[name])]
+    longitudes = [name for name in names if LONGITUDE_NAME_REGEX.search(lowered[name])]
+    return [(lat, lon) for lat in latitudes for lon in longitudes if lat != lon]
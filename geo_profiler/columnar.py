@@ -0,0 +1,252 @@
+import os
+from os import PathLike
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from .column_stats import DEFAULT_SAMPLE_SIZE, ColumnStats, DatasetStats
+from .models import ResolutionEvidence
+from .profilers.spatial_resolution_profiler import (
+    BOROUGH_NAME_REGEX,
+    LATITUDE_NAME_REGEX,
+    LONGITUDE_NAME_REGEX,
+    ZIP_NAME_REGEX,
+    extent,
+)
+from .semantic_parser import SemanticParser
+
+PARQUET_SUFFIXES = (".parquet", ".pq", ".parq")
+
+# Rows per Arrow record batch when reading samples
+SAMPLE_BATCH_ROWS = 4096
+
+# A Parquet path, or an in-memory pyarrow Table / RecordBatch / ParquetFile
+ColumnarSource = Union[str, PathLike, Any]
+
+
+def is_columnar_source(source: Any) -> bool:
+    """
+    True for Parquet paths and pyarrow objects (checked without importing pyarrow).
+    """
+    if isinstance(source, (str, PathLike)):
+        return os.fspath(source).lower().endswith(PARQUET_SUFFIXES)
+    return type(source).__module__.split(".")[0] == "pyarrow"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet/Arrow input requires pyarrow (pip install pyarrow)") from None
+    return pa, pc, pq
+
+
+class ColumnarDataset:
+    """
+    Parquet file or Arrow table read column by column.
+
+    Only the columns asked for are ever decoded. Samples stop at the first record
+    batches that hold enough non-null values, and row counts, null counts and min/max
+    ranges come from Parquet row-group statistics (or Arrow compute kernels for
+    in-memory tables) without reading any values.
+    """
+
+    def __init__(self, source: ColumnarSource):
+        pa, _, pq = _pyarrow()
+        self.parquet = None
+        self.table = None
+        if isinstance(source, (str, PathLike)):
+            self.parquet = pq.ParquetFile(os.fspath(source))
+        elif isinstance(source, pq.ParquetFile):
+            self.parquet = source
+        elif isinstance(source, pa.RecordBatch):
+            self.table = pa.Table.from_batches([source])
+        elif isinstance(source, pa.Table):
+            self.table = source
+        else:
+            raise TypeError(f"Unsupported columnar source: {type(source).__name__}")
+        self.schema = self.parquet.schema_arrow if self.parquet is not None else self.table.schema
+
+    @property
+    def num_rows(self) -> int:
+        return self.parquet.metadata.num_rows if self.parquet is not None else self.table.num_rows
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.schema.names)
+
+    @property
+    def column_types(self) -> Dict[str, str]:
+        return {field.name: str(field.type) for field in self.schema}
+
+    def resolve(self, names: Sequence[str]) -> Dict[str, str]:
+        """
+        Profile column name -> dataset column, for the names that exist.
+        """
+        resolved = {}
+        for name in names:
+            column = SemanticParser.resolve_name(self.column_names, name)
+            if column is not None:
+                resolved[name] = column
+        return resolved
+
+    def iter_batches(self, columns: Sequence[str], batch_rows: int = SAMPLE_BATCH_ROWS) -> Iterator[Any]:
+        if self.parquet is not None:
+            yield from self.parquet.iter_batches(batch_size=batch_rows, columns=list(columns))
+        else:
+            yield from self.table.select(list(columns)).to_batches(max_chunksize=batch_rows)
+
+    def read(self, columns: Sequence[str], max_rows: Optional[int] = None) -> pd.DataFrame:
+        """
+        The given columns as a DataFrame. With `max_rows`, only evenly spaced row groups
+        (Parquet) or an evenly strided slice (tables) holding about that many rows are read.
+        """
+        columns = list(dict.fromkeys(columns))
+        if self.parquet is not None:
+            groups = range(self.parquet.num_row_groups)
+            if max_rows is not None and self.num_rows > max_rows and len(groups) > 1:
+                per_group = self.num_rows / len(groups)
+                wanted = max(1, min(len(groups), int(np.ceil(max_rows / per_group))))
+                groups = np.unique(np.linspace(0, len(groups) - 1, wanted).round().astype(int)).tolist()
+            table = self.parquet.read_row_groups(list(groups), columns=columns)
+        else:
+            table = self.table.select(columns)
+            if max_rows is not None and table.num_rows > max_rows:
+                table = table.take(np.arange(0, table.num_rows, -(-table.num_rows // max_rows)))
+        return table.to_pandas()
+
+    def column_stats(self, names: Sequence[str], sample_size: int = DEFAULT_SAMPLE_SIZE) -> DatasetStats:
+        """
+        Statistics of the profile columns `names` (keyed by those names): the first
+        `sample_size` non-null values as text, plus row counts, null counts, numeric
+        min/max and temporal ranges from metadata.
+        """
+        resolved = self.resolve(names)
+        stats = DatasetStats(row_count=self.num_rows, sample_size=sample_size)
+        ranges = self._ranges(list(resolved.values()))
+        for name, column in resolved.items():
+            column_stats = ColumnStats(name=name, row_count=self.num_rows, sample_size=sample_size)
+            null_count, low, high = ranges.get(column, (None, None, None))
+            column_stats.null_count = null_count or 0
+            if low is not None and high is not None:
+                if hasattr(low, "isoformat"):
+                    column_stats.temporal_min, column_stats.temporal_max = low.isoformat(), high.isoformat()
+                elif isinstance(low, (int, float)) and not isinstance(low, bool):
+                    column_stats.min_value, column_stats.max_value = float(low), float(high)
+            stats.columns[name] = column_stats
+
+        self._fill_samples(stats, resolved)
+        return stats
+
+    def _fill_samples(self, stats: DatasetStats, resolved: Dict[str, str]) -> None:
+        # Reads record batches until every column has its sample (usually the first one)
+        _, pc, _ = _pyarrow()
+        pending = dict(resolved)
+        if not pending:
+            return
+        for batch in self.iter_batches(list(dict.fromkeys(pending.values()))):
+            for name, column in list(pending.items()):
+                column_stats = stats.columns[name]
+                missing = column_stats.sample_size - len(column_stats.sample_values)
+                values = pc.drop_null(batch.column(batch.schema.get_field_index(column)))[:missing]
+                column_stats.sample_values.extend(str(v) for v in values.to_pylist())
+                if column_stats.is_sampled:
+                    del pending[name]
+            if not pending:
+                break
+
+    def _ranges(self, columns: List[str]) -> Dict[str, tuple]:
+        # column -> (null count, min, max); None where the metadata does not say
+        if self.parquet is not None:
+            return self._parquet_ranges(columns)
+        _, pc, _ = _pyarrow()
+        ranges = {}
+        for column in columns:
+            array = self.table.column(column)
+            low = high = None
+            if _is_orderable(array.type):
+                extremes = pc.min_max(array).as_py()
+                low, high = extremes["min"], extremes["max"]
+            ranges[column] = (array.null_count, low, high)
+        return ranges
+
+    def _parquet_ranges(self, columns: List[str]) -> Dict[str, tuple]:
+        metadata = self.parquet.metadata
+        if metadata.num_row_groups == 0:
+            return {}
+        leaf_index = {metadata.row_group(0).column(j).path_in_schema: j for j in range(metadata.num_columns)}
+
+        ranges = {}
+        for column in columns:
+            if column not in leaf_index:
+                continue
+            orderable = _is_orderable(self.schema.field(column).type)
+            null_count, low, high = 0, None, None
+            for g in range(metadata.num_row_groups):
+                row_group = metadata.row_group(g)
+                statistics = row_group.column(leaf_index[column]).statistics
+                if statistics is None or not statistics.has_null_count:
+                    null_count = None
+                elif null_count is not None:
+                    null_count += statistics.null_count
+                if not orderable:
+                    continue
+                if statistics is not None and statistics.has_min_max:
+                    low = statistics.min if low is None else min(low, statistics.min)
+                    high = statistics.max if high is None else max(high, statistics.max)
+                elif statistics is None or row_group.num_rows > statistics.null_count:
+                    # A row group with values but no min/max makes the whole range unknown
+                    orderable, low, high = False, None, None
+            ranges[column] = (null_count, low, high)
+        return ranges
+
+    def scan_columns(self, names: Sequence[str]) -> List[str]:
+        """
+        Dataset columns a value scan of the profile columns `names` needs: text columns
+        (geometry histograms, WKT extent) and latitude/longitude/ZIP/borough columns.
+        """
+        pa, _, _ = _pyarrow()
+        columns = []
+        for column in self.resolve(names).values():
+            kind = self.schema.field(column).type
+            lowered = column.lower()
+            text = pa.types.is_string(kind) or pa.types.is_large_string(kind) or pa.types.is_string_view(kind)
+            named = any(regex.search(lowered) for regex in (
+                LATITUDE_NAME_REGEX, LONGITUDE_NAME_REGEX, ZIP_NAME_REGEX, BOROUGH_NAME_REGEX
+            ))
+            if text or named:
+                columns.append(column)
+        return list(dict.fromkeys(columns))
+
+
+def _is_orderable(kind) -> bool:
+    pa, _, _ = _pyarrow()
+    return (pa.types.is_integer(kind) or pa.types.is_floating(kind)
+            or pa.types.is_timestamp(kind) or pa.types.is_date(kind))
+
+
+def range_evidence(stats: DatasetStats) -> Optional[ResolutionEvidence]:
+    """
+    Extent of the first latitude/longitude column pair whose metadata ranges are valid
+    degrees; None without such a pair. Precision and density need a value scan.
+    """
+    latitude = longitude = None
+    for name, column_stats in stats.columns.items():
+        if column_stats.min_value is None or column_stats.max_value is None:
+            continue
+        lowered = name.lower()
+        limit = max(abs(column_stats.min_value), abs(column_stats.max_value))
+        if latitude is None and LATITUDE_NAME_REGEX.search(lowered) and limit <= 90.0:
+            latitude = column_stats
+        elif longitude is None and LONGITUDE_NAME_REGEX.search(lowered) and limit <= 180.0:
+            longitude = column_stats
+    if latitude is None or longitude is None:
+        return None
+
+    width, height = extent(longitude.min_value, latitude.min_value, longitude.max_value, latitude.max_value)
+    return ResolutionEvidence(
+        coordinate_columns=[latitude.name, longitude.name],
+        point_count=min(latitude.row_count - latitude.null_count, longitude.row_count - longitude.null_count),
+        extent_km=float(np.hypot(width, height)),
+    )
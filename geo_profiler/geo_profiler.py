@@ -1,13 +1,22 @@
 from .models import (
-    GeoProfile
+    GeoProfile,
+    DatasetSemanticProfile
 )
 
-from .models import GeoProfile
 from .profilers.spatial_role_profiler import SpatialRoleProfiler
 from .profilers.geometry_type_profiler import GeometryTypeProfiler
 from .profilers.spatial_resolution_profiler import SpatialResolutionProfiler
 from .profilers.spatial_use_cases_profiler import SpatialUseCaseProfiler
 from .semantic_parser import SemanticParser
+from .keyword_matcher import match_column_names
+from .profile_cache import GeoProfileCache, schema_fingerprint, value_digest
+from .streaming import DEFAULT_CHUNKSIZE, DatasetSource, collect_dataset_stats
+from .instrumentation import span
+from .sampling import DEFAULT_SAMPLE_ROWS, sample_csv
+from .columnar import ColumnarDataset, ColumnarSource, is_columnar_source, range_evidence
+from .local_semantics import DEFAULT_LOCAL_SAMPLE_ROWS, LocalSemanticProfiler
+from os import PathLike
+from typing import Dict, Optional, Union
 import pandas as pd
 
 
@@ -23,24 +32,258 @@ class GeoProfiler:
     """
 
     @staticmethod
-    def infer_geo_profile(semantic_profile: str, df: pd.DataFrame) -> GeoProfile:
-        
-        profile = SemanticParser.parse_semantic_profile_text(semantic_profile, df)
+    def infer_geo_profile(semantic_profile: str,
+        df: Union[pd.DataFrame, ColumnarSource],
+        scan_values: bool = False,
+        scan_budget: Optional[int] = None,
+        cache: Optional[GeoProfileCache] = None) -> GeoProfile:
+        """
+        `df` may also be a Parquet path or a pyarrow Table (see `infer_geo_profile_columnar`).
+        With `scan_values`, geometry types are decided from a histogram over every value
+        (or `scan_budget` values) of each text column instead of three sample values, and
+        the spatial resolution also weighs coordinate precision, extent, point density and
+        ZIP/borough code statistics computed over the same values.
+        With `cache`, datasets whose schema fingerprint (column names, dtypes, semantic
+        profile text, options and ruleset version, plus the sample values the parser
+        reads, or a digest of all values with `scan_values`) was seen before skip profiling.
+        """
+        if not isinstance(df, pd.DataFrame) and is_columnar_source(df):
+            return GeoProfiler.infer_geo_profile_columnar(
+                semantic_profile, df, scan_values=scan_values, scan_budget=scan_budget, cache=cache
+            )
+
+        with span("geo_profile", rows=len(df), columns=len(df.columns), scan_values=scan_values) as root:
+            samples = SemanticParser.column_samples(semantic_profile, df)
+            cache_key = None
+            if cache is not None:
+                with span("geo_profile.cache_lookup") as stage:
+                    # The rules read the parsed columns' sample values, and with
+                    # scan_values histograms and coordinate statistics of all values
+                    options = {"scan_values": scan_values, "scan_budget": scan_budget, "samples": samples}
+                    if scan_values:
+                        options["values"] = value_digest(df)
+                    cache_key = schema_fingerprint(semantic_profile, df, options)
+                    cached = cache.get(cache_key)
+                    stage.set(hit=cached is not None)
+                if cached is not None:
+                    root.set(cached=True)
+                    return cached
+
+            with span("geo_profile.semantic_parse", profile_chars=len(semantic_profile)) as stage:
+                profile = SemanticParser.parse_with_samples(semantic_profile, samples)
+                stage.set(semantic_columns=len(profile.columns))
+            if scan_values:
+                columns = [c.name for c in profile.columns]
+                with span("geo_profile.scan_geometry", columns=len(columns)):
+                    histograms = GeometryTypeProfiler.scan_geometry_values(df, columns=columns, budget=scan_budget)
+                    GeoProfiler.attach_geometry_histograms(profile, histograms)
+                with span("geo_profile.scan_resolution", columns=len(columns)):
+                    profile.resolution_evidence = SpatialResolutionProfiler.scan_resolution_evidence(
+                        df, columns=columns, budget=scan_budget
+                    )
+            geo_profile = GeoProfiler.infer_from_semantics(profile)
+
+            if cache_key is not None:
+                cache.put(cache_key, geo_profile)
+            return geo_profile
+
+    @staticmethod
+    def infer_geo_profile_columnar(semantic_profile: str,
+        source: ColumnarSource,
+        scan_values: bool = False,
+        scan_budget: Optional[int] = None,
+        cache: Optional[GeoProfileCache] = None) -> GeoProfile:
+        """
+        `infer_geo_profile` for a Parquet file or an Arrow table. Only the columns named
+        in the semantic profile are read, and only the first record batches of them for
+        samples. Latitude/longitude ranges come from row-group statistics; with
+        `scan_values`, the text and coordinate/ZIP/borough columns among them are read
+        (evenly spaced row groups holding about `scan_budget` rows, when given). They and
+        the samples are read before the cache lookup, since the cache key includes them.
+        """
+        dataset = source if isinstance(source, ColumnarDataset) else ColumnarDataset(source)
+        with span("geo_profile", rows=dataset.num_rows, columns=len(dataset.column_names),
+                  scan_values=scan_values, columnar=True) as root:
+            names = SemanticParser.column_names(semantic_profile)
+            df = None
+            if scan_values:
+                columns = dataset.scan_columns(names)
+                with span("geo_profile.columnar_read", columns=len(columns)) as stage:
+                    df = dataset.read(columns, max_rows=scan_budget)
+                    stage.set(rows=len(df))
+
+            with span("geo_profile.columnar_stats", columns=len(names)):
+                stats = dataset.column_stats(names)
+            samples = stats.samples()
+
+            cache_key = None
+            if cache is not None:
+                with span("geo_profile.cache_lookup") as stage:
+                    options = {"scan_values": scan_values, "scan_budget": scan_budget, "samples": samples}
+                    if df is not None:
+                        options["values"] = value_digest(df)
+                    cache_key = schema_fingerprint(semantic_profile, dataset, options)
+                    cached = cache.get(cache_key)
+                    stage.set(hit=cached is not None)
+                if cached is not None:
+                    root.set(cached=True)
+                    return cached
+
+            with span("geo_profile.semantic_parse", profile_chars=len(semantic_profile)):
+                profile = SemanticParser.parse_with_samples(semantic_profile, samples)
+            profile.resolution_evidence = range_evidence(stats)
+
+            if df is not None:
+                # Scanned frames use dataset column names; results are keyed by profile names
+                renamed = df.rename(columns={column: name for name, column in dataset.resolve(names).items()})
+                with span("geo_profile.scan_geometry", columns=len(columns)):
+                    histograms = GeometryTypeProfiler.scan_geometry_values(renamed, columns=names, budget=scan_budget)
+                    GeoProfiler.attach_geometry_histograms(profile, histograms)
+                with span("geo_profile.scan_resolution", columns=len(columns)):
+                    profile.resolution_evidence = SpatialResolutionProfiler.scan_resolution_evidence(
+                        renamed, columns=names, budget=scan_budget
+                    )
+            geo_profile = GeoProfiler.infer_from_semantics(profile)
+
+            if cache_key is not None:
+                cache.put(cache_key, geo_profile)
+            return geo_profile
+
+    @staticmethod
+    def infer_geo_profile_streaming(semantic_profile: str,
+        source: DatasetSource,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        scan_values: bool = False,
+        **read_csv_kwargs) -> GeoProfile:
+        """
+        Same result as `infer_geo_profile`, but reads `source` (a CSV path or any
+        iterable of DataFrame chunks) chunk by chunk, so peak memory is bounded by
+        `chunksize` instead of the file size. With `scan_values`, geometry histograms and
+        the spatial resolution evidence are collected chunk by chunk and match those of
+        the whole frame.
+        """
+        with span("geo_profile_streaming", scan_values=scan_values):
+            columns = SemanticParser.column_names(semantic_profile)
+            stats = collect_dataset_stats(
+                source, columns=columns, chunksize=chunksize, scan_values=scan_values, **read_csv_kwargs
+            )
+
+            with span("geo_profile.semantic_parse", profile_chars=len(semantic_profile)):
+                profile = SemanticParser.parse_with_samples(semantic_profile, stats.samples())
+            if scan_values:
+                GeoProfiler.attach_geometry_histograms(profile, stats.geometry_histograms())
+                profile.resolution_evidence = stats.resolution_evidence([c.name for c in profile.columns])
+            return GeoProfiler.infer_from_semantics(profile)
+
+    @staticmethod
+    def infer_geo_profile_sampled(semantic_profile: str,
+        path: Union[str, PathLike],
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+        seed: Optional[int] = None,
+        scan_values: bool = True,
+        **read_csv_kwargs) -> GeoProfile:
+        """
+        Approximate `infer_geo_profile` over `sample_rows` rows drawn uniformly from the
+        whole CSV (see `sample_csv`) instead of its first rows, without parsing the rest
+        of the file. Value evidence counts (points, distinct points, density) then
+        describe the sample, not the file.
+        """
+        sample = sample_csv(path, n=sample_rows, seed=seed, **read_csv_kwargs)
+        return GeoProfiler.infer_geo_profile(semantic_profile, sample.df, scan_values=scan_values)
+
+    @staticmethod
+    def infer_geo_profile_local(df: Union[pd.DataFrame, ColumnarSource],
+        semantic_profile: Optional[str] = None,
+        scan_values: bool = False,
+        scan_budget: Optional[int] = None,
+        sample_rows: int = DEFAULT_LOCAL_SAMPLE_ROWS,
+        cache: Optional[GeoProfileCache] = None) -> GeoProfile:
+        """
+        `infer_geo_profile` without an LLM semantic profile: column semantics come from
+        LocalSemanticProfiler over `sample_rows` evenly spaced rows. An LLM
+        `semantic_profile` text, when given, is parsed and overlaid on the local one.
+        Parquet paths and Arrow tables are profiled from about `sample_rows` of their rows.
+        Cache keys include a digest of the values the profile was derived from.
+        """
+        if not isinstance(df, pd.DataFrame) and is_columnar_source(df):
+            dataset = df if isinstance(df, ColumnarDataset) else ColumnarDataset(df)
+            df = dataset.read(dataset.column_names, max_rows=sample_rows)
+
+        with span("geo_profile", rows=len(df), columns=len(df.columns), scan_values=scan_values, local=True) as root:
+            options = {"local": True, "sample_rows": sample_rows, "scan_values": scan_values, "scan_budget": scan_budget}
+            cache_key = None
+            if cache is not None:
+                with span("geo_profile.cache_lookup") as stage:
+                    # The local profile is derived from the values: the sampled rows and
+                    # every column's first non-null values (or all values with scan_values)
+                    if scan_values:
+                        options["values"] = value_digest(df)
+                    else:
+                        options["values"] = value_digest(LocalSemanticProfiler.sample(df, sample_rows))
+                        options["samples"] = LocalSemanticProfiler.sample_values(df)
+                    cache_key = schema_fingerprint(semantic_profile or "", df, options)
+                    cached = cache.get(cache_key)
+                    stage.set(hit=cached is not None)
+                if cached is not None:
+                    root.set(cached=True)
+                    return cached
+
+            with span("geo_profile.local_semantics", sample_rows=min(len(df), sample_rows)) as stage:
+                profile = LocalSemanticProfiler.profile(df, sample_rows=sample_rows)
+                stage.set(spatial_columns=len(profile.detected_spatial_columns))
+            if semantic_profile:
+                with span("geo_profile.semantic_parse", profile_chars=len(semantic_profile)):
+                    parsed = SemanticParser.parse_semantic_profile_text(semantic_profile, df)
+                    profile = LocalSemanticProfiler.overlay(profile, parsed)
+            if scan_values:
+                columns = [c.name for c in profile.columns]
+                with span("geo_profile.scan_geometry", columns=len(columns)):
+                    histograms = GeometryTypeProfiler.scan_geometry_values(df, columns=columns, budget=scan_budget)
+                    GeoProfiler.attach_geometry_histograms(profile, histograms)
+                with span("geo_profile.scan_resolution", columns=len(columns)):
+                    profile.resolution_evidence = SpatialResolutionProfiler.scan_resolution_evidence(
+                        df, columns=columns, budget=scan_budget
+                    )
+            geo_profile = GeoProfiler.infer_from_semantics(profile)
+
+            if cache_key is not None:
+                cache.put(cache_key, geo_profile)
+            return geo_profile
+
+    @staticmethod
+    def attach_geometry_histograms(profile: DatasetSemanticProfile, histograms: Dict[str, Dict[str, int]]) -> None:
+        for col in profile.columns:
+            if col.name in histograms:
+                col.geometry_histogram = histograms[col.name]
+
+    @staticmethod
+    def infer_from_semantics(profile: DatasetSemanticProfile) -> GeoProfile:
+        """
+        Runs the rule-based profilers on an already parsed semantic profile.
+        """
+        # 0. Match every keyword table against the column names once
+        with span("geo_profile.keyword_match", columns=len(profile.columns)):
+            hits = match_column_names([c.name for c in profile.columns])
+
         # 1. Spatial Role
-        spatial_role = SpatialRoleProfiler.infer_spatial_role(profile)
+        with span("geo_profile.spatial_role"):
+            spatial_role = SpatialRoleProfiler.infer_spatial_role(profile, hits)
 
         # 2. Geometry Type
-        geometry_type = GeometryTypeProfiler.infer_geometry_type(profile)
+        with span("geo_profile.geometry_type"):
+            geometry_type = GeometryTypeProfiler.infer_geometry_type(profile, hits)
 
         # 3. Spatial Resolution
-        spatial_resolution = SpatialResolutionProfiler.infer_spatial_resolution(profile)
+        with span("geo_profile.spatial_resolution"):
+            spatial_resolution = SpatialResolutionProfiler.infer_spatial_resolution(profile, hits)
 
         # 4. Spatial Use Cases
-        spatial_use_cases = SpatialUseCaseProfiler.infer_spatial_use_cases(
-            profile=profile,
-            spatial_role=spatial_role,
-            geometry_type=geometry_type
-        )
+        with span("geo_profile.spatial_use_cases"):
+            spatial_use_cases = SpatialUseCaseProfiler.infer_spatial_use_cases(
+                profile=profile,
+                spatial_role=spatial_role,
+                geometry_type=geometry_type
+            )
 
         # 5. Bundle everything into a GeoProfile object
         geo_profile = GeoProfile(
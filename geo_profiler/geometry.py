@@ -0,0 +1,453 @@
+import re
+import warnings
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .profilers.geometry_type_profiler import WKT_TAGS
+
+# Type codes: 1 + index into WKT_TAGS (same codes as GeometryTypeProfiler), 0 = not WKT
+WKT_TYPE_CODES = {tag: i + 1 for i, tag in enumerate(WKT_TAGS)}
+
+WKT_HEADER_REGEX = re.compile(
+    r"\s*(?:SRID=\d+;\s*)?(" + "|".join(WKT_TAGS) + r")\s*(?:ZM|Z|M)?\s*(\(|EMPTY)",
+    re.IGNORECASE,
+)
+
+# Nesting depth of the innermost coordinate lists ("rings") and of parts, per type.
+# Parts at ring depth mean every ring is its own part.
+RING_DEPTH = {"POINT": 1, "LINESTRING": 1, "POLYGON": 2, "MULTIPOINT": 2, "MULTILINESTRING": 2, "MULTIPOLYGON": 3}
+PART_DEPTH = {"POINT": 1, "LINESTRING": 1, "POLYGON": 1, "MULTIPOINT": 2, "MULTILINESTRING": 2, "MULTIPOLYGON": 2}
+
+# Structural bytes become separators for the C number parser
+STRUCTURE_TO_SPACE = bytes.maketrans(b"(),", b"   ")
+OPEN, CLOSE, COMMA = ord("("), ord(")"), ord(",")
+
+# Rows matching this are handled by the vectorized POINT path
+SIMPLE_POINT_REGEX = r"POINT ?\(\s*[-+0-9.eE]+\s+[-+0-9.eE]+\s*\)"
+POINT_TEXT_TO_SPACE = str.maketrans({c: " " for c in "POINT()"})
+
+# Batch tokenizer: bytes allowed in a body, bytes of numbers, and the bytes per batch
+WKT_BODY_BYTES = np.zeros(256, dtype=bool)
+WKT_BODY_BYTES[list(b"0123456789.eE+-(), \t\r\n")] = True
+WKT_NUMBER_BYTES = np.zeros(256, dtype=bool)
+WKT_NUMBER_BYTES[list(b"0123456789.eE+-")] = True
+BATCH_BYTES = 4 << 20
+RING_DEPTH_BY_CODE = np.zeros(len(WKT_TAGS) + 1, dtype=np.int32)
+PART_DEPTH_BY_CODE = np.zeros(len(WKT_TAGS) + 1, dtype=np.int32)
+for _tag, _depth_value in RING_DEPTH.items():
+    RING_DEPTH_BY_CODE[WKT_TYPE_CODES[_tag]] = _depth_value
+    PART_DEPTH_BY_CODE[WKT_TYPE_CODES[_tag]] = PART_DEPTH[_tag]
+
+# One parsed value: (type code, xy coordinates, vertices per ring, rings per part)
+ParsedWKT = Tuple[int, np.ndarray, np.ndarray, np.ndarray]
+EMPTY_COORDS = np.empty((0, 2), dtype=np.float64)
+EMPTY_COUNTS = np.empty(0, dtype=np.int64)
+
+
+@dataclass
+class GeometryArray:
+    """
+    A column of geometries in flat, GeoArrow-like buffers:
+    `coords` holds every x/y pair (Z/M dropped), `ring_offsets` delimit rings in
+    `coords`, `part_offsets` delimit parts in rings and `geom_offsets` delimit
+    rows in parts. `type_codes` is 0 for nulls and values that are not valid WKT.
+    """
+    type_codes: np.ndarray
+    coords: np.ndarray
+    ring_offsets: np.ndarray
+    part_offsets: np.ndarray
+    geom_offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.type_codes)
+
+    @property
+    def geometry_types(self) -> List[Optional[str]]:
+        names = [None] + WKT_TAGS
+        return [names[code] for code in self.type_codes.tolist()]
+
+    @property
+    def part_counts(self) -> np.ndarray:
+        return np.diff(self.geom_offsets)
+
+    @property
+    def ring_counts(self) -> np.ndarray:
+        return np.diff(self.part_offsets[self.geom_offsets])
+
+    @property
+    def vertex_offsets(self) -> np.ndarray:
+        return self.ring_offsets[self.part_offsets[self.geom_offsets]]
+
+    @property
+    def vertex_counts(self) -> np.ndarray:
+        return np.diff(self.vertex_offsets)
+
+    @property
+    def bbox(self) -> np.ndarray:
+        """
+        (n, 4) array of xmin, ymin, xmax, ymax per row; NaN for empty rows.
+        """
+        offsets = self.vertex_offsets
+        bbox = np.full((len(self), 4), np.nan)
+        filled = np.diff(offsets) > 0
+        if filled.any():
+            starts = offsets[:-1][filled]
+            bbox[filled, 0:2] = np.minimum.reduceat(self.coords, starts, axis=0)
+            bbox[filled, 2:4] = np.maximum.reduceat(self.coords, starts, axis=0)
+        return bbox
+
+    def total_bbox(self) -> Optional[Tuple[float, float, float, float]]:
+        if not len(self.coords):
+            return None
+        low, high = self.coords.min(axis=0), self.coords.max(axis=0)
+        return float(low[0]), float(low[1]), float(high[0]), float(high[1])
+
+    def summary(self, i: int) -> Optional[str]:
+        """
+        Short text for prompts: type, part count, vertex count and bbox of row `i`.
+        """
+        code = int(self.type_codes[i])
+        if not code:
+            return None
+        geometry_type = WKT_TAGS[code - 1]
+        vertices = int(self.vertex_counts[i])
+        if not vertices:
+            return f"{geometry_type} EMPTY"
+        xmin, ymin, xmax, ymax = self.bbox[i]
+        return (
+            f"{geometry_type} [parts={int(self.part_counts[i])}, vertices={vertices}, "
+            f"bbox=({xmin:.5f}, {ymin:.5f}, {xmax:.5f}, {ymax:.5f})]"
+        )
+
+
+def parse_wkt(values: Iterable[Optional[str]]) -> GeometryArray:
+    """
+    Parses a column of WKT strings into a GeometryArray.
+
+    Simple 2D POINTs are parsed together in one C-level pass. Other values are
+    tokenized in batches of concatenated bytes: parentheses and commas are located with
+    NumPy, nesting depth is a cumulative sum, and the numbers are read by NumPy's text
+    parser, so no Python object is created per vertex, even for multi-MB MULTIPOLYGONs.
+    Values the batch tokenizer cannot take (GEOMETRYCOLLECTION, EMPTY, bare MULTIPOINT,
+    malformed text) are parsed one by one with `parse_wkt_value`.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    series = series.reset_index(drop=True)
+    n = len(series)
+
+    if pd.api.types.is_string_dtype(series.dtype) and not pd.api.types.is_object_dtype(series.dtype):
+        is_text = series.notna().to_numpy(dtype=bool)
+    else:
+        is_text = series.map(lambda v: isinstance(v, str), na_action="ignore").fillna(False).to_numpy(dtype=bool)
+    is_point = np.zeros(n, dtype=bool)
+    is_point[is_text] = series[is_text].astype(str).str.fullmatch(SIMPLE_POINT_REGEX).to_numpy(dtype=bool)
+
+    pieces = []
+    points = _parse_simple_points(series[is_point])
+    if points is None:
+        is_point[:] = False
+    else:
+        pieces.append(_single_vertex_piece(np.flatnonzero(is_point), points))
+
+    # Batchable rows: a plain header followed by a parenthesized body
+    batch_rows, batch_codes, batch_bodies, single_rows = [], [], [], []
+    for i in np.flatnonzero(is_text & ~is_point).tolist():
+        value = series.iat[i]
+        header = WKT_HEADER_REGEX.match(value)
+        geometry_type = header.group(1).upper() if header else None
+        if header and header.group(2) == "(" and geometry_type in RING_DEPTH:
+            batch_rows.append(i)
+            batch_codes.append(WKT_TYPE_CODES[geometry_type])
+            batch_bodies.append(value[header.end() - 1:].rstrip().encode("ascii", "replace"))
+        else:
+            single_rows.append(i)
+
+    for batch in _byte_batches(batch_bodies):
+        rows = np.array([batch_rows[k] for k in batch], dtype=np.int64)
+        piece, failed = _parse_batch(rows, np.array([batch_codes[k] for k in batch]), [batch_bodies[k] for k in batch])
+        if piece is not None:
+            pieces.append(piece)
+        single_rows.extend(failed.tolist())
+
+    singles = [(i, parse_wkt_value(series.iat[i])) for i in sorted(single_rows)]
+    singles = [(i, result) for i, result in singles if result is not None]
+    if singles:
+        pieces.append(_single_values_piece(singles))
+    return _assemble(n, pieces)
+
+
+def parse_wkt_value(value: str) -> Optional[ParsedWKT]:
+    """
+    Parses one WKT value. Returns None when it is not valid WKT.
+    """
+    header = WKT_HEADER_REGEX.match(value)
+    if not header:
+        return None
+    geometry_type = header.group(1).upper()
+    code = WKT_TYPE_CODES[geometry_type]
+    if header.group(2).upper() == "EMPTY":
+        return code, EMPTY_COORDS, EMPTY_COUNTS, EMPTY_COUNTS
+
+    body = value[header.end() - 1:].encode("ascii", "replace")
+    if geometry_type == "GEOMETRYCOLLECTION":
+        return _parse_collection(code, body)
+
+    buffer = np.frombuffer(body, dtype=np.uint8)
+    depth = _depth(buffer)
+    if depth is None:
+        return None
+
+    ring_depth = RING_DEPTH[geometry_type]
+    max_depth = int(depth.max())
+    bare_multipoint = geometry_type == "MULTIPOINT" and max_depth == 1
+    if bare_multipoint:
+        ring_depth = 1
+    if max_depth != ring_depth:
+        return None
+
+    # Vertices per ring: commas at ring depth between the ring's parentheses, plus one
+    ring_commas = np.cumsum((buffer == COMMA) & (depth == ring_depth))
+    ring_opens = np.flatnonzero((buffer == OPEN) & (depth == ring_depth))
+    ring_closes = np.flatnonzero((buffer == CLOSE) & (depth == ring_depth - 1))
+    if len(ring_opens) != len(ring_closes):
+        return None
+    ring_vertices = (ring_commas[ring_closes] - ring_commas[ring_opens] + 1).astype(np.int64)
+
+    numbers = _read_numbers(body.translate(STRUCTURE_TO_SPACE))
+    total = int(ring_vertices.sum())
+    if numbers is None or not total or len(numbers) % total or not 2 <= len(numbers) // total <= 4:
+        return None
+    xy = numbers.reshape(total, -1)[:, :2]
+
+    if bare_multipoint:
+        ring_vertices = np.ones(total, dtype=np.int64)
+        part_rings = np.ones(total, dtype=np.int64)
+    elif PART_DEPTH[geometry_type] == ring_depth:
+        part_rings = np.ones(len(ring_vertices), dtype=np.int64)
+    elif geometry_type == "POLYGON":
+        part_rings = np.array([len(ring_vertices)], dtype=np.int64)
+    else:
+        # MULTIPOLYGON: rings opened inside each part's parentheses
+        part_opens = np.flatnonzero((buffer == OPEN) & (depth == ring_depth - 1))
+        part_closes = np.flatnonzero((buffer == CLOSE) & (depth == ring_depth - 2))
+        part_rings = (np.searchsorted(ring_opens, part_closes) - np.searchsorted(ring_opens, part_opens)).astype(np.int64)
+    return code, xy, ring_vertices, part_rings
+
+
+def _parse_collection(code: int, body: bytes) -> Optional[ParsedWKT]:
+    # Members are separated by commas at depth 1; each is parsed on its own
+    buffer = np.frombuffer(body, dtype=np.uint8)
+    depth = _depth(buffer)
+    if depth is None:
+        return None
+    end = int(np.flatnonzero(depth == 0)[0])
+    splits = np.flatnonzero((buffer == COMMA) & (depth == 1)).tolist()
+    members = [
+        parse_wkt_value(body[start:stop].decode("ascii"))
+        for start, stop in zip([1] + [s + 1 for s in splits], splits + [end])
+    ]
+    if any(m is None for m in members):
+        return None
+    return (
+        code,
+        np.concatenate([m[1] for m in members]),
+        np.concatenate([m[2] for m in members]),
+        np.concatenate([m[3] for m in members]),
+    )
+
+
+def _depth(buffer: np.ndarray) -> Optional[np.ndarray]:
+    # Parenthesis depth after every byte; None when the parentheses are unbalanced
+    depth = np.cumsum((buffer == OPEN).astype(np.int32) - (buffer == CLOSE))
+    if depth[-1] != 0 or depth.min() < 0:
+        return None
+    return depth
+
+
+def _parse_simple_points(values: pd.Series) -> Optional[np.ndarray]:
+    # All "POINT (x y)" values at once; None if any of them is not a plain 2D point
+    if not len(values):
+        return np.empty((0, 2), dtype=np.float64)
+    joined = " ".join(values.tolist()).translate(POINT_TEXT_TO_SPACE)
+    numbers = _read_numbers(joined)
+    if numbers is None or len(numbers) != 2 * len(values):
+        return None
+    return numbers.reshape(-1, 2)
+
+
+def _read_numbers(text) -> Optional[np.ndarray]:
+    # NumPy only warns (and stops early) on text that is not a number; treat that as invalid
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(text, sep=" ")
+        except (ValueError, DeprecationWarning):
+            return None
+
+
+class _Piece(NamedTuple):
+    # Parsed geometries of some rows: per-row counts plus their flat part/ring/vertex data
+    rows: np.ndarray
+    type_codes: np.ndarray
+    part_counts: np.ndarray
+    ring_counts: np.ndarray
+    vertex_counts: np.ndarray
+    part_rings: np.ndarray
+    ring_vertices: np.ndarray
+    coords: np.ndarray
+
+
+def _single_vertex_piece(rows: np.ndarray, coords: np.ndarray) -> _Piece:
+    ones = np.ones(len(rows), dtype=np.int64)
+    codes = np.full(len(rows), WKT_TYPE_CODES["POINT"], dtype=np.int8)
+    return _Piece(rows, codes, ones, ones, ones, ones, ones, coords)
+
+
+def _single_values_piece(parsed: List[Tuple[int, ParsedWKT]]) -> _Piece:
+    results = [result for _, result in parsed]
+    return _Piece(
+        rows=np.array([i for i, _ in parsed], dtype=np.int64),
+        type_codes=np.array([r[0] for r in results], dtype=np.int8),
+        part_counts=np.array([len(r[3]) for r in results], dtype=np.int64),
+        ring_counts=np.array([len(r[2]) for r in results], dtype=np.int64),
+        vertex_counts=np.array([len(r[1]) for r in results], dtype=np.int64),
+        part_rings=np.concatenate([r[3] for r in results]),
+        ring_vertices=np.concatenate([r[2] for r in results]),
+        coords=np.concatenate([r[1] for r in results]),
+    )
+
+
+def _byte_batches(bodies: List[bytes], batch_bytes: int = BATCH_BYTES) -> Iterator[List[int]]:
+    # Consecutive row groups of about `batch_bytes` bytes (a larger value is its own batch)
+    batch, size = [], 0
+    for k, body in enumerate(bodies):
+        if batch and size + len(body) > batch_bytes:
+            yield batch
+            batch, size = [], 0
+        batch.append(k)
+        size += len(body)
+    if batch:
+        yield batch
+
+
+def _parse_batch(rows: np.ndarray, codes: np.ndarray, bodies: List[bytes]) -> Tuple[Optional[_Piece], np.ndarray]:
+    """
+    Tokenizes the concatenated bodies of many values at once. Returns the piece for the
+    rows that parsed and the rows that must be retried one by one.
+    """
+    joined = b"".join(bodies)
+    buffer = np.frombuffer(joined, dtype=np.uint8)
+    lengths = np.fromiter(map(len, bodies), dtype=np.int64, count=len(bodies))
+    starts = _offsets(lengths)[:-1]
+    row_of_byte = np.repeat(np.arange(len(bodies), dtype=np.int32), lengths)
+
+    is_open = buffer == OPEN
+    is_close = buffer == CLOSE
+    depth = np.cumsum(is_open.astype(np.int32) - is_close, dtype=np.int32)
+    ring_depth = RING_DEPTH_BY_CODE[codes]
+
+    # A body is one balanced group nested exactly to its type's ring depth, with only
+    # number and structure characters
+    ok = depth[starts + lengths - 1] == 0
+    ok &= np.add.reduceat(depth == 0, starts) == 1
+    ok &= np.maximum.reduceat(depth, starts) == ring_depth
+    ok &= np.add.reduceat(~WKT_BODY_BYTES[buffer], starts) == 0
+    if ok.any():
+        byte_ring_depth = ring_depth[row_of_byte]
+        ring_opens = np.flatnonzero(is_open & (depth == byte_ring_depth))
+        ring_closes = np.flatnonzero(is_close & (depth == byte_ring_depth - 1))
+        ok &= np.bincount(row_of_byte[ring_opens], minlength=len(bodies)) == np.bincount(
+            row_of_byte[ring_closes], minlength=len(bodies)
+        )
+    if not ok.all():
+        piece, failed = (None, rows[:0])
+        if ok.any():
+            keep = np.flatnonzero(ok)
+            piece, failed = _parse_batch(rows[keep], codes[keep], [bodies[k] for k in keep])
+        return piece, np.concatenate([rows[~ok], failed])
+
+    ring_commas = np.cumsum((buffer == COMMA) & (depth == byte_ring_depth), dtype=np.int32)
+    ring_vertices = (ring_commas[ring_closes] - ring_commas[ring_opens] + 1).astype(np.int64)
+    ring_rows = row_of_byte[ring_opens]
+    vertex_counts = np.bincount(ring_rows, weights=ring_vertices, minlength=len(bodies)).astype(np.int64)
+
+    # Numbers per row decide its dimension (XY, XYZ/XYM or XYZM)
+    is_number = WKT_NUMBER_BYTES[buffer]
+    token_starts = is_number.copy()
+    token_starts[1:] &= ~is_number[:-1]
+    token_counts = np.add.reduceat(token_starts, starts).astype(np.int64)
+    dims = token_counts // np.maximum(vertex_counts, 1)
+    ok = (vertex_counts > 0) & (dims * vertex_counts == token_counts) & (dims >= 2) & (dims <= 4)
+    numbers = _read_numbers(joined.translate(STRUCTURE_TO_SPACE)) if ok.all() else None
+    if numbers is None or len(numbers) != token_counts.sum():
+        if not ok.any() or ok.all():
+            return None, rows
+        keep = np.flatnonzero(ok)
+        piece, failed = _parse_batch(rows[keep], codes[keep], [bodies[k] for k in keep])
+        return piece, np.concatenate([rows[~ok], failed])
+
+    vertex_rows = np.repeat(np.arange(len(bodies)), vertex_counts)
+    local_vertex = np.arange(len(vertex_rows)) - _offsets(vertex_counts)[:-1][vertex_rows]
+    x_index = _offsets(token_counts)[:-1][vertex_rows] + local_vertex * dims[vertex_rows]
+    coords = np.column_stack((numbers[x_index], numbers[x_index + 1]))
+
+    # Parts open at their type's part depth; each holds the rings opened until the next part
+    part_opens = np.flatnonzero(is_open & (depth == PART_DEPTH_BY_CODE[codes][row_of_byte]))
+    first_rings = np.searchsorted(ring_opens, part_opens)
+    part_rings = np.diff(np.append(first_rings, len(ring_opens))).astype(np.int64)
+
+    return _Piece(
+        rows=rows,
+        type_codes=codes.astype(np.int8),
+        part_counts=np.bincount(row_of_byte[part_opens], minlength=len(bodies)).astype(np.int64),
+        ring_counts=np.bincount(ring_rows, minlength=len(bodies)).astype(np.int64),
+        vertex_counts=vertex_counts,
+        part_rings=part_rings,
+        ring_vertices=ring_vertices,
+        coords=coords,
+    ), rows[:0]
+
+
+def _assemble(n: int, pieces: List[_Piece]) -> GeometryArray:
+    # Scatters every piece's flat data to its rows' slots, in row order
+    type_codes = np.zeros(n, dtype=np.int8)
+    part_counts = np.zeros(n, dtype=np.int64)
+    ring_counts = np.zeros(n, dtype=np.int64)
+    vertex_counts = np.zeros(n, dtype=np.int64)
+    for piece in pieces:
+        type_codes[piece.rows] = piece.type_codes
+        part_counts[piece.rows] = piece.part_counts
+        ring_counts[piece.rows] = piece.ring_counts
+        vertex_counts[piece.rows] = piece.vertex_counts
+
+    geom_offsets = _offsets(part_counts)
+    row_ring_offsets = _offsets(ring_counts)
+    row_vertex_offsets = _offsets(vertex_counts)
+    part_rings = np.zeros(geom_offsets[-1], dtype=np.int64)
+    ring_vertices = np.zeros(row_ring_offsets[-1], dtype=np.int64)
+    coords = np.empty((row_vertex_offsets[-1], 2), dtype=np.float64)
+    for piece in pieces:
+        part_rings[_slots(geom_offsets, piece.rows, piece.part_counts)] = piece.part_rings
+        ring_vertices[_slots(row_ring_offsets, piece.rows, piece.ring_counts)] = piece.ring_vertices
+        coords[_slots(row_vertex_offsets, piece.rows, piece.vertex_counts)] = piece.coords
+
+    return GeometryArray(
+        type_codes=type_codes,
+        coords=coords,
+        ring_offsets=_offsets(ring_vertices),
+        part_offsets=_offsets(part_rings),
+        geom_offsets=geom_offsets,
+    )
+
+
+def _slots(offsets: np.ndarray, rows: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    # Destination index of every item of `rows` (with `counts` items each) under `offsets`
+    local_starts = _offsets(counts)[:-1]
+    return np.arange(int(counts.sum())) + np.repeat(offsets[rows] - local_starts, counts)
+
+
+def _offsets(counts: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
@@ -0,0 +1,183 @@
+import json
+import os
+from dataclasses import asdict
+from os import PathLike
+from typing import Optional, Union
+import pandas as pd
+from .column_stats import DatasetStats
+from .geo_profiler import GeoProfiler
+from .models import ColumnSemantic, DatasetSemanticProfile, EnrichedDatasetProfile, GeoProfile, ResolutionEvidence
+from .semantic_parser import SemanticParser
+from .streaming import DEFAULT_CHUNKSIZE, DatasetSource, collect_dataset_stats
+
+# Version of the persisted profile + sketches JSON layout
+SKETCH_FORMAT_VERSION = 1
+
+# read_csv options of `build` that only apply to the start of the file, not to rows
+# appended to it later
+HEAD_ONLY_READ_CSV_KWARGS = {"header", "names", "skiprows", "nrows"}
+
+
+class IncrementalGeoProfiler:
+    """
+    Keeps mergeable per-column sketches (null counts, distinct-count registers, geometry
+    histograms, numeric and temporal ranges, resolution evidence) next to an
+    EnrichedDatasetProfile, so that appended rows are profiled on their own and merged
+    in instead of re-reading the whole dataset. Geometry types and the spatial
+    resolution are always decided from all values, as with
+    `GeoProfiler.infer_geo_profile(..., scan_values=True)`.
+    """
+
+    @staticmethod
+    def build(semantic_profile: str,
+        source: DatasetSource,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        **read_csv_kwargs) -> EnrichedDatasetProfile:
+        """
+        Profiles `source` (a CSV path or an iterable of DataFrame chunks) in one full
+        pass and returns the profile together with its column sketches. For a CSV path,
+        `read_csv_kwargs` are kept in raw_metadata and reused for appended rows (and
+        must be JSON-serializable for `save`).
+        """
+        semantics = SemanticParser.parse_with_samples(semantic_profile, {})
+        stats = collect_dataset_stats(
+            source,
+            columns=[c.name for c in semantics.columns],
+            chunksize=chunksize,
+            scan_values=True,
+            sketch=True,
+            temporal_columns=[c.name for c in semantics.columns if c.is_temporal],
+            **read_csv_kwargs,
+        )
+
+        raw_metadata = {"semantic_profile": semantic_profile}
+        if isinstance(source, (str, PathLike)):
+            # Remembered so that rows appended to the file later can be read on their own
+            raw_metadata["source_path"] = os.fspath(source)
+            raw_metadata["source_bytes"] = os.path.getsize(source)
+            raw_metadata["source_columns"] = list(pd.read_csv(source, nrows=0, **read_csv_kwargs).columns)
+            raw_metadata["read_csv_kwargs"] = dict(read_csv_kwargs)
+
+        enriched = EnrichedDatasetProfile(
+            dataset_semantics=semantics,
+            geo_profile=GeoProfile(),
+            raw_metadata=raw_metadata,
+            column_sketches=stats,
+        )
+        return IncrementalGeoProfiler.rederive(enriched)
+
+    @staticmethod
+    def update(enriched: EnrichedDatasetProfile,
+        new_rows: DatasetSource,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        **read_csv_kwargs) -> EnrichedDatasetProfile:
+        """
+        Ingests only `new_rows`, merges their sketches into the stored ones and
+        re-derives the GeoProfile. `enriched` is updated in place and returned.
+        """
+        if enriched.column_sketches is None:
+            raise ValueError("Profile has no column sketches; build it with IncrementalGeoProfiler.build")
+
+        semantics = enriched.dataset_semantics
+        delta = collect_dataset_stats(
+            new_rows,
+            columns=[c.name for c in semantics.columns],
+            chunksize=chunksize,
+            sample_size=enriched.column_sketches.sample_size,
+            scan_values=True,
+            sketch=True,
+            temporal_columns=[c.name for c in semantics.columns if c.is_temporal],
+            **read_csv_kwargs,
+        )
+        enriched.column_sketches = enriched.column_sketches.merge(delta)
+        return IncrementalGeoProfiler.rederive(enriched)
+
+    @staticmethod
+    def update_from_appended_csv(enriched: EnrichedDatasetProfile,
+        path: Optional[Union[str, PathLike]] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE) -> EnrichedDatasetProfile:
+        """
+        Reads only the bytes appended to the CSV since it was last profiled and merges
+        those rows in, with the read_csv options the profile was built with. Raises
+        ValueError when the file was rewritten rather than appended to.
+        """
+        metadata = enriched.raw_metadata or {}
+        if "source_bytes" not in metadata:
+            raise ValueError("Profile was not built from a CSV file")
+        path = os.fspath(path) if path is not None else metadata["source_path"]
+        offset = metadata["source_bytes"]
+        size = os.path.getsize(path)
+        if size < offset:
+            raise ValueError(f"{path} is smaller than when it was profiled; rebuild the profile")
+        if size == offset:
+            return enriched
+
+        with open(path, "rb") as handle:
+            if offset:
+                handle.seek(offset - 1)
+                if handle.read(1) not in (b"\n", b"\r"):
+                    raise ValueError(f"{path} did not end with a newline when it was profiled; rebuild the profile")
+            read_csv_kwargs = {
+                key: value for key, value in metadata.get("read_csv_kwargs", {}).items()
+                if key not in HEAD_ONLY_READ_CSV_KWARGS
+            }
+            reader = pd.read_csv(handle, header=None, names=metadata["source_columns"], chunksize=chunksize,
+                                 **read_csv_kwargs)
+            IncrementalGeoProfiler.update(enriched, reader)
+
+        metadata["source_bytes"] = size
+        return enriched
+
+    @staticmethod
+    def rederive(enriched: EnrichedDatasetProfile) -> EnrichedDatasetProfile:
+        """
+        Refreshes column samples, geometry histograms and the resolution evidence from the
+        sketches and re-runs the rule-based profilers. Sketches saved without resolution
+        statistics keep the profile's existing evidence.
+        """
+        stats = enriched.column_sketches
+        semantics = enriched.dataset_semantics
+        for col in semantics.columns:
+            column_stats = stats.columns.get(col.name)
+            col.sample_values = list(column_stats.sample_values) if column_stats else []
+            col.geometry_histogram = dict(column_stats.geometry_histogram) if column_stats and column_stats.geometry_histogram else None
+        if any(c.resolution_stats is not None for c in stats.columns.values()):
+            semantics.resolution_evidence = stats.resolution_evidence([c.name for c in semantics.columns])
+        enriched.geo_profile = GeoProfiler.infer_from_semantics(enriched.dataset_semantics)
+        return enriched
+
+    @staticmethod
+    def save(enriched: EnrichedDatasetProfile, path: Union[str, PathLike]) -> None:
+        data = {
+            "format_version": SKETCH_FORMAT_VERSION,
+            "dataset_semantics": asdict(enriched.dataset_semantics),
+            "geo_profile": asdict(enriched.geo_profile),
+            "raw_metadata": enriched.raw_metadata,
+            "column_sketches": enriched.column_sketches.to_dict() if enriched.column_sketches else None,
+        }
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+
+    @staticmethod
+    def load(path: Union[str, PathLike]) -> EnrichedDatasetProfile:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if data.get("format_version") != SKETCH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported profile format version: {data.get('format_version')}")
+
+        stored = data["dataset_semantics"]
+        evidence = stored.get("resolution_evidence")
+        semantics = DatasetSemanticProfile(
+            columns=[ColumnSemantic(**c) for c in stored["columns"]],
+            has_spatial=stored.get("has_spatial", False),
+            has_temporal=stored.get("has_temporal", False),
+            detected_spatial_columns=stored.get("detected_spatial_columns", []),
+            resolution_evidence=ResolutionEvidence(**evidence) if evidence else None,
+        )
+        sketches = data.get("column_sketches")
+        return EnrichedDatasetProfile(
+            dataset_semantics=semantics,
+            geo_profile=GeoProfile(**data["geo_profile"]),
+            raw_metadata=data.get("raw_metadata"),
+            column_sketches=DatasetStats.from_dict(sketches) if sketches else None,
+        )
@@ -0,0 +1,345 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from os import PathLike
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Prefix of every metric written by PrometheusTextfileSink
+METRIC_PREFIX = "autoddg_geo"
+
+# Numeric attributes whose name ends with one of these are counts, summed per span name
+# by MemorySink.summary and PrometheusTextfileSink; others (attempt numbers, budgets,
+# settings) are only kept on the records
+COUNTED_ATTRIBUTE_SUFFIXES = ("rows", "columns", "chars", "tokens", "bytes", "seconds", "datasets")
+
+# Registered sinks; an empty tuple means instrumentation is disabled
+_sinks: Tuple["SpanSink", ...] = ()
+_sinks_lock = threading.Lock()
+_span_ids = itertools.count(1)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("geo_span", default=None)
+
+
+@dataclass
+class SpanRecord:
+    """
+    One finished span: wall and CPU time of a pipeline stage plus its attributes
+    (row counts, prompt sizes, token usage, ...).
+    """
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float                    # Unix time
+    seconds: float
+    cpu_seconds: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None     # exception type name when the stage raised
+
+
+class SpanSink:
+    """
+    Receives every finished span. Sinks must be thread-safe; `emit` is called from the
+    thread (or asyncio task) that ran the span.
+    """
+
+    def emit(self, record: SpanRecord) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class Span:
+    """
+    A running span, used as a context manager; `set` adds attributes before it ends.
+    """
+
+    __slots__ = ("name", "attributes", "span_id", "parent_id", "measure_cpu", "_start", "_wall", "_cpu", "_token")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], measure_cpu: bool = True):
+        self.name = name
+        self.attributes = attributes
+        self.measure_cpu = measure_cpu
+        self.span_id = next(_span_ids)
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self._start = time.time()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        seconds = time.perf_counter() - self._wall
+        cpu_seconds = time.thread_time() - self._cpu if self.measure_cpu else 0.0
+        _current_span.reset(self._token)
+        record = SpanRecord(
+            name=self.name,
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+            start=self._start,
+            seconds=seconds,
+            cpu_seconds=cpu_seconds,
+            attributes=self.attributes,
+            error=exc_type.__name__ if exc_type is not None else None,
+        )
+        for sink in _sinks:
+            sink.emit(record)
+        return False
+
+
+class _NullSpan:
+    # Shared stand-in returned while no sink is registered
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attributes: Any) -> Union[Span, _NullSpan]:
+    """
+    Times the enclosed block as stage `name`:
+
+        with span("geo_profile.semantic_parse", columns=len(df.columns)) as s:
+            ...
+            s.set(parsed_columns=len(profile.columns))
+
+    Spans opened inside another span record it as their parent (across threads only
+    when the context is copied). Without registered sinks this returns a shared no-op
+    object, so disabled instrumentation costs one function call per stage.
+    """
+    if not _sinks:
+        return NULL_SPAN
+    return Span(name, attributes)
+
+
+def async_span(name: str, **attributes: Any) -> Union[Span, _NullSpan]:
+    """
+    `span` for a block that awaits. The thread's CPU time across an await includes
+    whatever other tasks ran meanwhile, so these spans record wall time only
+    (cpu_seconds is 0, as for `record_span`).
+    """
+    if not _sinks:
+        return NULL_SPAN
+    return Span(name, attributes, measure_cpu=False)
+
+
+def record_span(name: str, start: float, seconds: float, error: Optional[str] = None, **attributes: Any) -> None:
+    """
+    Emits an already timed stage that could not run inside a `with span(...)` block,
+    such as a streamed completion consumed across generator yields (a span entered
+    there would become the parent of the consumer's spans). `start` is Unix time; the
+    current span, if any, is the parent.
+    """
+    if not _sinks:
+        return
+    parent = _current_span.get()
+    record = SpanRecord(
+        name=name,
+        span_id=next(_span_ids),
+        parent_id=parent.span_id if parent is not None else None,
+        start=start,
+        seconds=seconds,
+        cpu_seconds=0.0,
+        attributes=attributes,
+        error=error,
+    )
+    for sink in _sinks:
+        sink.emit(record)
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def add_sink(sink: SpanSink) -> SpanSink:
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + (sink,)
+    return sink
+
+
+def remove_sink(sink: SpanSink) -> None:
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+    sink.close()
+
+
+def clear_sinks() -> None:
+    global _sinks
+    with _sinks_lock:
+        sinks, _sinks = _sinks, ()
+    for sink in sinks:
+        sink.close()
+
+
+def _counted_attributes(record: SpanRecord) -> Dict[str, float]:
+    return {
+        key: float(value) for key, value in record.attributes.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+        and any(key == suffix or key.endswith("_" + suffix) for suffix in COUNTED_ATTRIBUTE_SUFFIXES)
+    }
+
+
+class MemorySink(SpanSink):
+    """
+    Keeps the last `max_records` spans in memory (all of them when None).
+    """
+
+    def __init__(self, max_records: Optional[int] = None):
+        self.max_records = max_records
+        self.records: List[SpanRecord] = []
+        self._lock = threading.Lock()
+
+    def emit(self, record: SpanRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            if self.max_records is not None and len(self.records) > self.max_records:
+                del self.records[:len(self.records) - self.max_records]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per span name: count, errors, total/mean/max seconds, CPU seconds and the sum of
+        every count attribute (see COUNTED_ATTRIBUTE_SUFFIXES; e.g. total completion tokens).
+        """
+        with self._lock:
+            records = list(self.records)
+        summary: Dict[str, Dict[str, float]] = {}
+        for record in records:
+            entry = summary.setdefault(
+                record.name, {"count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0, "cpu_seconds": 0.0}
+            )
+            entry["count"] += 1
+            entry["errors"] += record.error is not None
+            entry["seconds"] += record.seconds
+            entry["max_seconds"] = max(entry["max_seconds"], record.seconds)
+            entry["cpu_seconds"] += record.cpu_seconds
+            for key, value in _counted_attributes(record).items():
+                entry[key] = entry.get(key, 0.0) + value
+        for entry in summary.values():
+            entry["mean_seconds"] = entry["seconds"] / entry["count"]
+        return summary
+
+
+class JsonLinesSink(SpanSink):
+    """
+    Appends one JSON object per span to `path`. Lines are buffered and written every
+    `flush_every` spans (and on close).
+    """
+
+    def __init__(self, path: Union[str, PathLike], flush_every: int = 1):
+        self.path = os.fspath(path)
+        self.flush_every = max(1, flush_every)
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+
+    def emit(self, record: SpanRecord) -> None:
+        line = json.dumps(asdict(record), default=str)
+        with self._lock:
+            self._pending.append(line)
+            if len(self._pending) >= self.flush_every:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(self._pending) + "\n")
+            self._pending.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+
+
+class PrometheusTextfileSink(SpanSink):
+    """
+    Aggregates spans into counters and rewrites `path` in the Prometheus text exposition
+    format (for node_exporter's textfile collector), at most every `interval` seconds.
+    The file is replaced atomically, so scrapes never see a partial write.
+    """
+
+    def __init__(self, path: Union[str, PathLike], interval: float = 10.0, prefix: str = METRIC_PREFIX):
+        self.path = os.fspath(path)
+        self.interval = interval
+        self.prefix = prefix
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._seconds: Dict[str, float] = defaultdict(float)
+        self._cpu_seconds: Dict[str, float] = defaultdict(float)
+        self._attributes: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._written = 0.0
+        self._lock = threading.Lock()
+
+    def emit(self, record: SpanRecord) -> None:
+        with self._lock:
+            self._counts[record.name] += 1
+            self._errors[record.name] += record.error is not None
+            self._seconds[record.name] += record.seconds
+            self._cpu_seconds[record.name] += record.cpu_seconds
+            for key, value in _counted_attributes(record).items():
+                self._attributes[(record.name, key)] += value
+            if time.monotonic() - self._written >= self.interval:
+                self._write()
+
+    def render(self) -> str:
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_span_seconds Wall time spent in each pipeline stage.",
+            f"# TYPE {p}_span_seconds summary",
+        ]
+        for name in sorted(self._counts):
+            label = _label(name)
+            lines.append(f'{p}_span_seconds_count{{span="{label}"}} {self._counts[name]}')
+            lines.append(f'{p}_span_seconds_sum{{span="{label}"}} {self._seconds[name]!r}')
+        lines += [f"# HELP {p}_span_cpu_seconds_total CPU time spent in each pipeline stage.",
+                  f"# TYPE {p}_span_cpu_seconds_total counter"]
+        lines += [f'{p}_span_cpu_seconds_total{{span="{_label(n)}"}} {self._cpu_seconds[n]!r}' for n in sorted(self._counts)]
+        lines += [f"# HELP {p}_span_errors_total Stages that raised an exception.",
+                  f"# TYPE {p}_span_errors_total counter"]
+        lines += [f'{p}_span_errors_total{{span="{_label(n)}"}} {self._errors[n]}' for n in sorted(self._counts)]
+        lines += [f"# HELP {p}_span_attribute_total Sum of each count span attribute (rows, tokens, characters).",
+                  f"# TYPE {p}_span_attribute_total counter"]
+        lines += [
+            f'{p}_span_attribute_total{{span="{_label(n)}",attribute="{_label(a)}"}} {v!r}'
+            for (n, a), v in sorted(self._attributes.items())
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _write(self) -> None:
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.render())
+        os.replace(temporary, self.path)
+        self._written = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            self._write()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,89 @@
+from functools import lru_cache
+from typing import Dict, List, Sequence, Set
+import numpy as np
+
+# Column names are matched inside one buffer, separated by a character no keyword contains
+NAME_SEPARATOR = "\n"
+
+
+# Which column names (by index) contain a keyword of each table
+class KeywordHits:
+
+    def __init__(self, hits: Dict[str, Set[int]]):
+        self.hits = hits
+
+    def any(self, table: str) -> bool:
+        return bool(self.hits.get(table))
+
+    def names(self, table: str) -> Set[int]:
+        return self.hits.get(table, set())
+
+    def first_tables(self, tables: Sequence[str]) -> Dict[int, str]:
+        """
+        For every column name with a hit, the first of `tables` (in order) it matches.
+        """
+        first = {}
+        for table in reversed(tables):
+            for index in self.hits.get(table, ()):
+                first[index] = table
+        return first
+
+
+class KeywordMatcher:
+    """
+    Matches many keyword tables against many column names at once.
+
+    Keyword tables are compiled once: every distinct keyword is mapped to the tables that
+    contain it. Matching lower-cases and joins all column names into a single buffer and
+    runs one C-level substring search per distinct keyword over it; hit offsets are mapped
+    back to column indices with a vectorized binary search. The result is exactly
+    `any(k in name.lower() for k in table)` per name and table, including overlapping
+    keywords, without the columns x keywords Python loop.
+    """
+
+    def __init__(self, tables: Dict[str, Sequence[str]]):
+        self.tables = {name: tuple(keywords) for name, keywords in tables.items()}
+        self.keyword_tables: Dict[str, List[str]] = {}
+        for table, keywords in self.tables.items():
+            for keyword in keywords:
+                self.keyword_tables.setdefault(keyword.lower(), []).append(table)
+
+    def match(self, names: Sequence[str]) -> KeywordHits:
+        hits: Dict[str, Set[int]] = {table: set() for table in self.tables}
+        if not names:
+            return KeywordHits(hits)
+
+        lowered = [name.lower() for name in names]
+        buffer = NAME_SEPARATOR.join(lowered)
+        lengths = np.fromiter((len(name) + 1 for name in lowered), dtype=np.int64, count=len(lowered))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        for keyword, tables in self.keyword_tables.items():
+            positions = []
+            pos = buffer.find(keyword)
+            while pos != -1:
+                positions.append(pos)
+                pos = buffer.find(keyword, pos + 1)
+            if not positions:
+                continue
+            indices = set(np.searchsorted(starts, positions, side="right").tolist())
+            for table in tables:
+                hits[table].update(i - 1 for i in indices)
+        return KeywordHits(hits)
+
+
+@lru_cache(maxsize=1)
+def default_matcher() -> KeywordMatcher:
+    """
+    The matcher over every keyword table of the geo profilers, compiled once per process.
+    """
+    # Imported here: the profiler modules themselves depend on this module
+    from .profilers.spatial_role_profiler import ROLE_KEYWORD_TABLES
+    from .profilers.geometry_type_profiler import GEOMETRY_KEYWORD_TABLES
+    from .profilers.spatial_resolution_profiler import RESOLUTION_KEYWORD_TABLES
+
+    return KeywordMatcher({**ROLE_KEYWORD_TABLES, **GEOMETRY_KEYWORD_TABLES, **RESOLUTION_KEYWORD_TABLES})
+
+
+def match_column_names(names: Sequence[str]) -> KeywordHits:
+    return default_matcher().match(names)
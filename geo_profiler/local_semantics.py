@@ -0,0 +1,325 @@
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .models import ColumnSemantic, DatasetSemanticProfile
+from .semantic_parser import SAMPLE_SIZE, SemanticParser
+from .profilers.geometry_type_profiler import GEOMETRY_FAMILIES, GeometryTypeProfiler
+from .profilers.spatial_resolution_profiler import (
+    BOROUGH_NAME_REGEX,
+    LATITUDE_NAME_REGEX,
+    LONGITUDE_NAME_REGEX,
+    MIN_COORDINATE_FRACTION,
+    MIN_ZIP_FRACTION,
+    ZIP_NAME_REGEX,
+    coordinate_fraction,
+    to_float,
+    zip_code_stats,
+)
+
+# Rows classified per column by default (evenly spaced over the table)
+DEFAULT_LOCAL_SAMPLE_ROWS = 1000
+
+# Share of sampled non-null values a detector needs to claim a column
+MIN_GEOMETRY_FRACTION = 0.5
+MIN_VALUE_FRACTION = 0.8
+
+# "(40.71, -73.95)" / "40.71,-73.95" location pairs (latitude first, as in NYC Open Data)
+LOCATION_PAIR_REGEX = r"\(?\s*-?\d{1,3}\.\d+\s*,\s*-?\d{1,3}\.\d+\s*\)?"
+ZIP_PLUS_FOUR_REGEX = r"\d{5}-\d{4}"
+
+# Borough names and abbreviations (NYC), compared lower-cased
+BOROUGH_VALUES = {"manhattan", "brooklyn", "queens", "bronx", "the bronx", "staten island"}
+BOROUGH_CODES = {"mn", "bk", "bx", "qn", "si", "1", "2", "3", "4", "5"}
+BOROUGH_CODE_NAME_REGEX = re.compile(r"boro")
+
+# Building Identification Numbers: seven digits, the first one the borough code
+BIN_NAME_REGEX = re.compile(r"(?:^|[^a-z])bin(?:[^a-z]|$)")
+BIN_LOW, BIN_HIGH = 1_000_000, 5_999_999
+
+# Text dates: a quick shape check, then the first format that parses most values
+DATE_SHAPE_REGEX = r"\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}"
+DATE_FORMATS = ["ISO8601", "%m/%d/%Y", "%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%d/%m/%Y", "%Y/%m/%d"]
+YEAR_NAME_REGEX = re.compile(r"(?:^|[^a-z])(?:year|yr)(?:[^a-z]|$)")
+YEAR_LOW, YEAR_HIGH = 1800, 2100
+
+# Name-only rules for place columns whose values cannot be recognised (street names,
+# neighborhoods, districts, ...): (regex over the lower-cased name, resolution, meaning)
+NAME_LEVEL_RULES = [
+    (re.compile(r"street|address|avenue|^on_|cross"), "Street", "street or address"),
+    (re.compile(r"neighbo|(?:^|[^a-z])nta|community board"), "Neighborhood", "neighborhood"),
+    (re.compile(r"district|precinct|tract"), "District", "administrative district"),
+    (re.compile(r"(?:^|[^a-z])city(?:[^a-z]|$)"), "City", "city"),
+    (re.compile(r"county"), "County", "county"),
+]
+
+# What a detected kind means: (raw type, spatial resolution, domain type, function)
+KIND_SEMANTICS = {
+    "latitude": ("latitude coordinate", "Coordinates", "geospatial", "coordinate"),
+    "longitude": ("longitude coordinate", "Coordinates", "geospatial", "coordinate"),
+    "location_pair": ("latitude/longitude coordinate pair", "Coordinates", "geospatial", "coordinate"),
+    "point": ("point geometry", "Coordinates", "geospatial", "geometry"),
+    "polyline": ("polyline geometry", "Street", "geospatial", "geometry"),
+    "polygon": ("polygon geometry", None, "geospatial", "geometry"),
+    "multi": ("multipolygon geometry", None, "geospatial", "geometry"),
+    "zip": ("ZIP code", "Zip", "geospatial", "geographic identifier"),
+    "borough": ("borough", "Borough", "geospatial", "aggregation key"),
+    "bin": ("building identification number", "Street", "geospatial", "geographic identifier"),
+    "date": ("date", None, "temporal", "timestamp"),
+    "timestamp": ("timestamp", None, "temporal", "timestamp"),
+    "year": ("year", None, "temporal", "timestamp"),
+}
+TEMPORAL_KINDS = {"date", "timestamp", "year"}
+
+# Raw type and resolution of a "multi" column, by the most common tag of its geometry
+# histogram; only MULTIPOLYGON reads as polygons (boundaries), so MULTILINESTRING
+# centerlines go through the polyline rules
+MULTI_TAG_SEMANTICS = {
+    "multipolygon": ("multipolygon geometry", None),
+    "multilinestring": ("multilinestring geometry", "Street"),
+    "multipoint": ("multipoint geometry", "Coordinates"),
+    "geometrycollection": ("geometry collection", None),
+    "polygon": ("polygon geometry", None),
+    "linestring": ("polyline geometry", "Street"),
+    "point": ("point geometry", "Coordinates"),
+}
+
+
+class LocalSemanticProfiler:
+    """
+    Builds a DatasetSemanticProfile from the table itself, without an LLM.
+
+    Every column of an evenly spaced row sample is classified with vectorized checks:
+    lat/lon value ranges, WKT/GeoJSON and "(lat, lon)" values, ZIP, borough and BIN
+    codes, datetime dtypes and date-shaped text, then column-name rules for places
+    whose values cannot be recognised (streets, neighborhoods, districts). The fields
+    are filled the way the LLM semantic profiler words them, so the geo profilers treat
+    both alike; `overlay` merges an LLM profile in when one is available.
+    """
+
+    @staticmethod
+    def sample(df: pd.DataFrame, sample_rows: int = DEFAULT_LOCAL_SAMPLE_ROWS) -> pd.DataFrame:
+        # The evenly spaced rows whose values are classified
+        if len(df) <= sample_rows:
+            return df
+        return df.iloc[np.unique(np.linspace(0, len(df) - 1, sample_rows).astype(np.int64))]
+
+    @staticmethod
+    def sample_values(df: pd.DataFrame) -> Dict[str, List[str]]:
+        # Every column's first non-null values, as the LLM profiler's samples
+        return {str(name): SemanticParser.first_non_null_values(df[name], SAMPLE_SIZE) for name in df.columns}
+
+    @staticmethod
+    def profile(df: pd.DataFrame, sample_rows: int = DEFAULT_LOCAL_SAMPLE_ROWS) -> DatasetSemanticProfile:
+        sample = LocalSemanticProfiler.sample(df, sample_rows)
+        samples = LocalSemanticProfiler.sample_values(df)
+
+        columns = []
+        for name in df.columns:
+            series = sample[name].dropna()
+            kind, histogram = LocalSemanticProfiler.classify_column(str(name), series)
+            column = LocalSemanticProfiler.column_semantic(str(name), kind, series, histogram)
+            column.sample_values = samples[str(name)]
+            column.geometry_histogram = histogram
+            columns.append(column)
+
+        profile = DatasetSemanticProfile(columns=columns)
+        LocalSemanticProfiler.summarize(profile)
+        return profile
+
+    @staticmethod
+    def classify_column(name: str, values: pd.Series) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
+        """
+        Detected kind of one column (a KIND_SEMANTICS key, a NAME_LEVEL_RULES index as
+        "name:<i>", or None) from its non-null sample values, plus the geometry histogram
+        of WKT/GeoJSON columns.
+        """
+        lowered = name.lower()
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            return "timestamp", None
+        if not len(values):
+            return LocalSemanticProfiler.name_kind(lowered), None
+
+        numeric = pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype)
+        text = pd.api.types.is_object_dtype(values.dtype) or pd.api.types.is_string_dtype(values.dtype)
+
+        if text:
+            histogram = GeometryTypeProfiler.geometry_histogram(values)
+            geometric = len(values) - histogram.get("other", 0)
+            if geometric >= MIN_GEOMETRY_FRACTION * len(values):
+                return geometry_kind(histogram), histogram
+
+        numbers = to_float(values) if numeric or text else None
+        if numbers is not None and LATITUDE_NAME_REGEX.search(lowered) \
+                and coordinate_fraction(numbers, 90.0) >= MIN_COORDINATE_FRACTION:
+            return "latitude", None
+        if numbers is not None and LONGITUDE_NAME_REGEX.search(lowered) \
+                and coordinate_fraction(numbers, 180.0) >= MIN_COORDINATE_FRACTION:
+            return "longitude", None
+
+        strings = values.astype(str).str.strip() if text else None
+        if strings is not None and fraction(strings.str.fullmatch(LOCATION_PAIR_REGEX)) >= MIN_VALUE_FRACTION:
+            return "location_pair", None
+
+        if ZIP_NAME_REGEX.search(lowered) and zip_code_stats(values)[0] >= MIN_ZIP_FRACTION:
+            return "zip", None
+        if strings is not None and fraction(strings.str.fullmatch(ZIP_PLUS_FOUR_REGEX)) >= MIN_VALUE_FRACTION:
+            return "zip", None
+
+        if numbers is not None and BIN_NAME_REGEX.search(lowered):
+            whole = numbers == np.round(numbers)
+            if np.count_nonzero(whole & (numbers >= BIN_LOW) & (numbers <= BIN_HIGH)) >= MIN_VALUE_FRACTION * len(numbers):
+                return "bin", None
+
+        if LocalSemanticProfiler.is_borough(lowered, values):
+            return "borough", None
+
+        if strings is not None and fraction(strings.str.match(DATE_SHAPE_REGEX)) >= MIN_VALUE_FRACTION:
+            parsed = parse_dates(strings)
+            if parsed is not None:
+                has_time = bool((parsed.dt.normalize() != parsed).any())
+                return ("timestamp" if has_time else "date"), None
+        if numbers is not None and YEAR_NAME_REGEX.search(lowered):
+            whole = numbers == np.round(numbers)
+            if np.count_nonzero(whole & (numbers >= YEAR_LOW) & (numbers <= YEAR_HIGH)) >= MIN_VALUE_FRACTION * len(numbers):
+                return "year", None
+
+        return LocalSemanticProfiler.name_kind(lowered), None
+
+    @staticmethod
+    def is_borough(lowered: str, values: pd.Series) -> bool:
+        """
+        Borough names in any column, or borough abbreviations/codes 1-5 in a column
+        whose name mentions a borough.
+        """
+        keys = values.astype(str).str.strip().str.lower()
+        if fraction(keys.isin(BOROUGH_VALUES)) >= MIN_VALUE_FRACTION:
+            return True
+        named = BOROUGH_NAME_REGEX.search(lowered) or BOROUGH_CODE_NAME_REGEX.search(lowered)
+        return bool(named) and fraction(keys.isin(BOROUGH_VALUES | BOROUGH_CODES)) >= MIN_VALUE_FRACTION
+
+    @staticmethod
+    def name_kind(lowered: str) -> Optional[str]:
+        for i, (regex, _, _) in enumerate(NAME_LEVEL_RULES):
+            if regex.search(lowered):
+                return f"name:{i}"
+        return None
+
+    @staticmethod
+    def column_semantic(name: str, kind: Optional[str], values: pd.Series,
+        histogram: Optional[Dict[str, int]] = None) -> ColumnSemantic:
+        if kind is None:
+            return ColumnSemantic(
+                name=name,
+                is_spatial=False,
+                spatial_resolution=None,
+                is_temporal=False,
+                domain_type=None,
+                function=None,
+                raw_type=dtype_label(values.dtype),
+            )
+        if kind.startswith("name:"):
+            _, resolution, meaning = NAME_LEVEL_RULES[int(kind[len("name:"):])]
+            return ColumnSemantic(
+                name=name,
+                is_spatial=True,
+                spatial_resolution=resolution,
+                is_temporal=False,
+                domain_type="geospatial",
+                function="location",
+                raw_type=meaning,
+            )
+        raw_type, resolution, domain_type, function = KIND_SEMANTICS[kind]
+        if kind == "multi" and histogram:
+            counts = {k: v for k, v in histogram.items() if k != "other"}
+            if counts:
+                raw_type, resolution = MULTI_TAG_SEMANTICS[max(counts, key=counts.get)]
+        temporal = kind in TEMPORAL_KINDS
+        return ColumnSemantic(
+            name=name,
+            is_spatial=not temporal,
+            spatial_resolution=resolution,
+            is_temporal=temporal,
+            domain_type=domain_type,
+            function=function,
+            raw_type=raw_type,
+        )
+
+    @staticmethod
+    def summarize(profile: DatasetSemanticProfile) -> None:
+        profile.detected_spatial_columns = [c.name for c in profile.columns if c.is_spatial]
+        profile.has_spatial = bool(profile.detected_spatial_columns)
+        profile.has_temporal = any(c.is_temporal for c in profile.columns)
+
+    @staticmethod
+    def overlay(local: DatasetSemanticProfile, llm: DatasetSemanticProfile) -> DatasetSemanticProfile:
+        """
+        Merges an LLM semantic profile into a local one, column by column (names matched
+        like SemanticParser.resolve_name). Spatial/temporal flags are combined; what the
+        local profiler detected from values (resolution, type) wins, and the LLM's
+        wording fills the rest. LLM columns missing from the table are kept as they are.
+        """
+        llm_columns = {c.name: c for c in llm.columns}
+        columns, used = [], set()
+        for column in local.columns:
+            match = SemanticParser.resolve_name(list(llm_columns), column.name)
+            if match is None:
+                columns.append(column)
+                continue
+            used.add(match)
+            other = llm_columns[match]
+            detected = column.is_spatial or column.is_temporal
+            is_spatial = column.is_spatial or other.is_spatial
+            columns.append(ColumnSemantic(
+                name=column.name,
+                is_spatial=is_spatial,
+                spatial_resolution=(column.spatial_resolution or other.spatial_resolution) if is_spatial else None,
+                is_temporal=column.is_temporal or other.is_temporal,
+                domain_type=other.domain_type or column.domain_type,
+                function=other.function or column.function,
+                raw_type=column.raw_type if detected else (other.raw_type or column.raw_type),
+                sample_values=column.sample_values,
+                geometry_histogram=column.geometry_histogram,
+            ))
+        columns.extend(c for name, c in llm_columns.items() if name not in used)
+
+        merged = DatasetSemanticProfile(columns=columns, resolution_evidence=local.resolution_evidence)
+        LocalSemanticProfiler.summarize(merged)
+        return merged
+
+
+def geometry_kind(histogram: Dict[str, int]) -> str:
+    geometry_type = GeometryTypeProfiler.geometry_type_from_histogram(histogram)
+    if geometry_type is not None:
+        return geometry_type
+    # Geometry values are present but not the majority: use the most common family
+    counts = {k: v for k, v in histogram.items() if k != "other"}
+    return GEOMETRY_FAMILIES.get(max(counts, key=counts.get), "multi")
+
+
+def fraction(mask: pd.Series) -> float:
+    if not len(mask):
+        return 0.0
+    return float(np.count_nonzero(mask.to_numpy(dtype=bool, na_value=False))) / len(mask)
+
+
+def parse_dates(strings: pd.Series) -> Optional[pd.Series]:
+    """
+    `strings` parsed with the first DATE_FORMATS entry that reads at least
+    MIN_VALUE_FRACTION of them (one vectorized pass per format tried); None otherwise.
+    """
+    for date_format in DATE_FORMATS:
+        parsed = pd.to_datetime(strings, format=date_format, errors="coerce")
+        if parsed.notna().sum() >= MIN_VALUE_FRACTION * len(strings):
+            return parsed.dropna()
+    return None
+
+
+def dtype_label(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "integer"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    return "text"
@@ -1,8 +1,31 @@
+import sys
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .column_stats import DatasetStats
+
+
+def _intern(value):
+    # Enum-like labels (roles, geometries, resolutions, types) repeat across millions of
+    # profiles; interning keeps one string object per distinct label
+    return sys.intern(value) if type(value) is str else value
+
+
+# One shared tuple per distinct use-case list
+_label_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern_tuple(values: Iterable[str]) -> Tuple[str, ...]:
+    # Use-case lists are a handful of fixed tuples (USECASES); profiles built from JSON,
+    # a catalog or the cache share them instead of holding a list each
+    if type(values) is not tuple:
+        values = tuple(_intern(value) for value in values)
+    return _label_tuples.setdefault(values, values)
+
 
 # Column-Level Semantics
-@dataclass
+@dataclass(slots=True)
 class ColumnSemantic:
     name: str
     is_spatial: bool
@@ -12,9 +35,29 @@ class ColumnSemantic:
     function: Optional[str]
     raw_type: Optional[str]
     sample_values: List[str] = field(default_factory=list)
+    geometry_histogram: Optional[Dict[str, int]] = None  # value-scan counts per WKT/GeoJSON type
+
+    def __post_init__(self):
+        self.spatial_resolution = _intern(self.spatial_resolution)
+        self.domain_type = _intern(self.domain_type)
+        self.function = _intern(self.function)
+        self.raw_type = _intern(self.raw_type)
+
+# Value-scan statistics behind the spatial resolution decision
+@dataclass(slots=True)
+class ResolutionEvidence:
+    coordinate_columns: List[str] = field(default_factory=list)  # [latitude, longitude] used
+    point_count: int = 0
+    coordinate_decimals: Optional[int] = None     # median decimal places of lat/lon values
+    extent_km: Optional[float] = None             # diagonal of the points' bounding box
+    distinct_points: Optional[int] = None        # HyperLogLog estimate
+    point_density: Optional[float] = None         # distinct points per km² of bounding box
+    zip_fraction: Dict[str, float] = field(default_factory=dict)     # ZIP column -> share of valid ZIP codes
+    zip_cardinality: Dict[str, int] = field(default_factory=dict)    # ZIP column -> distinct values (estimated)
+    borough_cardinality: Dict[str, int] = field(default_factory=dict)  # borough column -> distinct values (estimated)
 
 # Dataset-Level Semantics
-@dataclass
+@dataclass(slots=True)
 class DatasetSemanticProfile:
     columns: List[ColumnSemantic] = field(default_factory=list)
 
@@ -23,18 +66,27 @@ class DatasetSemanticProfile:
 
     detected_spatial_columns: List[str] = field(default_factory=list)
 
+    resolution_evidence: Optional[ResolutionEvidence] = None
+
 # Geo-Level Enriched Profile
-@dataclass
+@dataclass(slots=True)
 class GeoProfile:
     spatial_role: Optional[str] = None        # event | observation | infrastructure | boundary
     geometry_type: Optional[str] = None       # point | polygon | polyline
     spatial_resolution: Optional[str] = None  # street | zip | borough | multi-level
-    spatial_use_cases: List[str] = field(default_factory=list)
+    spatial_use_cases: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        self.spatial_role = _intern(self.spatial_role)
+        self.geometry_type = _intern(self.geometry_type)
+        self.spatial_resolution = _intern(self.spatial_resolution)
+        self.spatial_use_cases = _intern_tuple(self.spatial_use_cases)
 
 # Full Enriched Dataset Object
-@dataclass
+@dataclass(slots=True)
 class EnrichedDatasetProfile:
     dataset_semantics: DatasetSemanticProfile
     geo_profile: GeoProfile
 
     raw_metadata: Optional[Dict] = None
+    column_sketches: Optional["DatasetStats"] = None  # mergeable per-column sketches for incremental refresh
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+import pandas as pd
+from .models import GeoProfile
+
+# Bump to invalidate cached profiles for rule changes outside the hashed modules
+RULESET_REVISION = 1
+
+# Modules whose source defines the profiling rules and keyword tables
+RULESET_MODULES = [
+    "geo_profiler.py",
+    "columnar.py",
+    "geometry.py",
+    "keyword_matcher.py",
+    "local_semantics.py",
+    "models.py",
+    "semantic_parser.py",
+    "profilers/geometry_type_profiler.py",
+    "profilers/spatial_resolution_profiler.py",
+    "profilers/spatial_role_profiler.py",
+    "profilers/spatial_use_cases_profiler.py",
+]
+
+
+@lru_cache(maxsize=1)
+def ruleset_version() -> str:
+    """
+    Hash of the rule modules' source. Editing a keyword table or a rule changes it, which
+    invalidates every cached GeoProfile without manual versioning.
+    """
+    digest = hashlib.sha256(str(RULESET_REVISION).encode("utf-8"))
+    base_dir = Path(__file__).resolve().parent
+    for module in RULESET_MODULES:
+        digest.update(module.encode("utf-8"))
+        digest.update((base_dir / module).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_fingerprint(semantic_profile: str, df: pd.DataFrame, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Stable fingerprint of column names, dtypes, semantic profile text, profiling options
+    and the ruleset version. Row values are not part of it; callers whose result depends
+    on them pass a `value_digest` among the options. `df` may also
+    be a ColumnarDataset, whose Arrow types stand in for the dtypes.
+    """
+    types = df.column_types.items() if hasattr(df, "column_types") else df.dtypes.items()
+    payload = json.dumps(
+        {
+            "ruleset": ruleset_version(),
+            "columns": [[str(name), str(dtype)] for name, dtype in types],
+            "semantic_profile": semantic_profile,
+            "options": options or {},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def value_digest(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> str:
+    """
+    Hash of the values of `columns` (all by default) in row order. Keys of profiles that
+    depend on values rather than on the schema alone (value scans, local semantics)
+    include it, so a dataset whose values changed is profiled again.
+    """
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    digest = hashlib.sha256(str(len(df)).encode("utf-8"))
+    for i, name in enumerate(df.columns):
+        column = df.iloc[:, i]
+        try:
+            hashed = pd.util.hash_pandas_object(column, index=False)
+        except TypeError:
+            # Unhashable cells (lists, dicts) are hashed by their text
+            hashed = pd.util.hash_pandas_object(column.astype(str), index=False)
+        digest.update(str(name).encode("utf-8"))
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _to_profile(value: Dict[str, Any]) -> GeoProfile:
+    # Use cases are immutable shared tuples, so cached values can be handed out as is
+    return GeoProfile(**value)
+
+
+class GeoProfileCache:
+    """
+    Two-tier GeoProfile cache: an in-process LRU of `max_entries` profiles, optionally
+    backed by a SQLite file at `path` shared across runs and processes.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = os.fspath(path) if path is not None else None
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if self.path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS geo_profiles (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[GeoProfile]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _to_profile(value)
+
+        if self.path is not None:
+            row = self._connection().execute("SELECT value FROM geo_profiles WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self._remember(key, value)
+                with self._lock:
+                    self.persistent_hits += 1
+                return _to_profile(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, profile: GeoProfile) -> None:
+        value = asdict(profile)
+        self._remember(key, value)
+        if self.path is not None:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO geo_profiles (key, value) VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.path is not None:
+            self._connection().execute("DELETE FROM geo_profiles")
@@ -1,6 +1,9 @@
 import re
-from typing import Literal
+from typing import Dict, List, Literal, Optional
+import numpy as np
+import pandas as pd
 from ..models import DatasetSemanticProfile
+from ..keyword_matcher import KeywordHits, match_column_names
 
 GeometryType = Literal["point", "polygon", "polyline", "multi", "unknown"]
 POINT_KEYWORDS = ["latitude", "longitude", "lat", "lon", "coordinates"]
@@ -8,21 +11,55 @@ POLYGON_KEYWORDS = ["polygon", "boundary"]
 LINE_KEYWORDS = ["line", "linestring", "route", "segment", "road_segment"]
 MULTI_KEYWORDS = ["multipolygon", "multilinestring", "multipoint"]
 
+# Keyword tables compiled into the shared KeywordMatcher
+GEOMETRY_KEYWORD_TABLES = {
+    "geometry_multi": MULTI_KEYWORDS,
+    "geometry_polygon": POLYGON_KEYWORDS,
+    "geometry_line": LINE_KEYWORDS,
+    "geometry_point": POINT_KEYWORDS,
+}
+
 # Regex patterns for detecting geometry in values (WKT / GeoJSON)
 POINT_REGEX = re.compile(r'\bPOINT\b', re.IGNORECASE)
 POLYGON_REGEX = re.compile(r'\bPOLYGON\b', re.IGNORECASE)
 LINESTRING_REGEX = re.compile(r'\bLINESTRING\b', re.IGNORECASE)
 MULTI_REGEX = re.compile(r'\bMULTI(POLYGON|LINESTRING|POINT)\b', re.IGNORECASE)
 
+# Value-scan: WKT type tags, checked in order (MULTI* before their base types).
+# Index + 1 is the class code used by classify_geometry_values; 0 means "other".
+WKT_TAGS = ["MULTIPOLYGON", "MULTILINESTRING", "MULTIPOINT", "GEOMETRYCOLLECTION", "POLYGON", "LINESTRING", "POINT"]
+HISTOGRAM_KEYS = ["other"] + [tag.lower() for tag in WKT_TAGS]
+GEOMETRY_FAMILIES = {
+    "point": "point",
+    "linestring": "polyline",
+    "polygon": "polygon",
+}
+# Only the first characters of each value are inspected by the vectorized path
+SCAN_PREFIX_WIDTH = 24
+
+# Fallback for values the vectorized path cannot decide (leading whitespace, EWKT, GeoJSON)
+WKT_VALUE_REGEX = re.compile(
+    r'^\s*(?:SRID=\d+;\s*)?(' + "|".join(WKT_TAGS) + r')(?:\s*(?:ZM|Z|M))?\s*(?:\(|EMPTY)',
+    re.IGNORECASE,
+)
+GEOJSON_TYPE_REGEX = re.compile(
+    r'"type"\s*:\s*"(MultiPolygon|MultiLineString|MultiPoint|GeometryCollection|Polygon|LineString|Point)"'
+)
+GEOJSON_PROBE_CHARS = 256
+
 class GeometryTypeProfiler:
 
     @staticmethod
-    def infer_geometry_type(profile: DatasetSemanticProfile) -> GeometryType:    
+    def infer_geometry_type(profile: DatasetSemanticProfile, hits: Optional[KeywordHits] = None) -> GeometryType:    
         cols = profile.columns    
-        col_names = [c.name.lower() for c in cols]    
         
-        # 0. Check sample values    
+        # 0. Check value-scan histograms, then sample values    
         for c in cols:        
+            if c.geometry_histogram is not None:
+                scanned = GeometryTypeProfiler.geometry_type_from_histogram(c.geometry_histogram)
+                if scanned:
+                    return scanned
+                continue
             if c.sample_values:            
                 joined = " ".join(c.sample_values)            
                 if MULTI_REGEX.search(joined):                
@@ -58,14 +95,137 @@ class GeometryTypeProfiler:
             return "point"    
         
         # 3. Column name heuristics    
-        if any(k in name for name in col_names for k in MULTI_KEYWORDS):        
+        if hits is None:
+            hits = match_column_names([c.name for c in cols])
+        if hits.any("geometry_multi"):        
             return "multi"    
-        if any(k in name for name in col_names for k in POLYGON_KEYWORDS):        
+        if hits.any("geometry_polygon"):        
             return "polygon"    
-        if any(k in name for name in col_names for k in LINE_KEYWORDS):        
+        if hits.any("geometry_line"):        
             return "polyline"    
-        if any(k in name for name in col_names for k in POINT_KEYWORDS):        
+        if hits.any("geometry_point"):        
             return "point"    
         
         # 4. Fallback    
-        return "unknown"
\ No newline at end of file
+        return "unknown"
+
+    @staticmethod
+    def geometry_type_from_histogram(histogram: Dict[str, int]) -> Optional[GeometryType]:
+        """
+        Decides a column's geometry type from its value-scan histogram.
+        Returns None when WKT/GeoJSON values are not the majority of scanned values.
+        """
+        counts = {k: v for k, v in histogram.items() if k != "other" and v}
+        total = sum(histogram.values())
+        if not counts or 2 * sum(counts.values()) < total:
+            return None
+
+        # Any MULTI* value, or several base geometry families in one column -> multi
+        if any(k not in GEOMETRY_FAMILIES for k in counts):
+            return "multi"
+        families = {GEOMETRY_FAMILIES[k] for k in counts}
+        if len(families) > 1:
+            return "multi"
+        return families.pop()
+
+    @staticmethod
+    def classify_geometry_values(values: pd.Series) -> np.ndarray:
+        """
+        Classifies every value of a column into a WKT_TAGS code (0 = other) without per-row
+        Python: only the first SCAN_PREFIX_WIDTH characters are compared, as a
+        (rows x bytes) array, against each type tag.
+        """
+        width = SCAN_PREFIX_WIDTH
+        prefixes = values.astype(str).str.slice(0, width).to_numpy(dtype=f"U{width}")
+        codes = np.zeros(len(prefixes), dtype=np.int8)
+        if not len(prefixes):
+            return codes
+
+        # Upper-cased ASCII bytes; non-ASCII characters become 0
+        chars = prefixes.view(np.uint32).reshape(len(prefixes), width)
+        data = np.where(chars < 128, chars, 0).astype(np.uint8)
+        data &= np.where((data >= ord("a")) & (data <= ord("z")), 0xDF, 0xFF).astype(np.uint8)
+
+        words = np.ascontiguousarray(data).view("<u8")
+        letters = (data >= ord("A")) & (data <= ord("Z"))
+        has_paren = (data == ord("(")).any(axis=1)
+
+        for code, tag in enumerate(WKT_TAGS, start=1):
+            tag = tag[:width - 1]
+            raw = np.frombuffer(tag.encode("ascii").ljust(width, b"\0"), dtype="<u8")
+            mask = np.frombuffer((b"\xff" * len(tag)).ljust(width, b"\0"), dtype="<u8")
+            match = (codes == 0) & has_paren
+            for i in range(len(raw)):
+                if mask[i]:
+                    match &= (words[:, i] & mask[i]) == raw[i]
+            # Tag must end the word, except for Z / M / ZM dimension suffixes
+            nxt = data[:, len(tag)]
+            match &= ~letters[:, len(tag)] | (nxt == ord("Z")) | (nxt == ord("M"))
+            codes[match] = code
+
+        # Rare layouts (leading whitespace, SRID=...;, GeoJSON) take the regex path
+        undecided = np.flatnonzero((codes == 0) & np.isin(data[:, 0], list(b" \t\r\n{S")))
+        if len(undecided):
+            raw_values = values.iloc[undecided].astype(str).tolist()
+            codes[undecided] = [GeometryTypeProfiler.classify_geometry_text(v) for v in raw_values]
+        return codes
+
+    @staticmethod
+    def classify_geometry_text(value: str) -> int:
+        """
+        Regex classification of a single WKT/EWKT/GeoJSON value into a WKT_TAGS code.
+        """
+        match = WKT_VALUE_REGEX.match(value[:SCAN_PREFIX_WIDTH * 2])
+        if match:
+            return WKT_TAGS.index(match.group(1).upper()) + 1
+        if value.lstrip().startswith("{"):
+            # The "type" member may sit before or after the (possibly huge) coordinates
+            probe = value[:GEOJSON_PROBE_CHARS] + " " + value[-GEOJSON_PROBE_CHARS:]
+            match = GEOJSON_TYPE_REGEX.search(probe)
+            if match:
+                return WKT_TAGS.index(match.group(1).upper()) + 1
+        return 0
+
+    @staticmethod
+    def geometry_histogram(values: pd.Series, budget: Optional[int] = None) -> Dict[str, int]:
+        """
+        Counts the WKT/GeoJSON geometry types of all non-null values of a column.
+        With `budget`, an evenly strided sample of at most `budget` values is scanned.
+        """
+        values = values.dropna()
+        if budget is not None and len(values) > budget:
+            step = -(-len(values) // budget)
+            values = values.iloc[::step]
+
+        counts = np.bincount(GeometryTypeProfiler.classify_geometry_values(values), minlength=len(HISTOGRAM_KEYS))
+        return {key: int(n) for key, n in zip(HISTOGRAM_KEYS, counts) if n}
+
+    @staticmethod
+    def scan_geometry_values(df: pd.DataFrame,
+        columns: Optional[List[str]] = None,
+        budget: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Value-scan mode: geometry-type histograms for the candidate (text) columns of `df`.
+        """
+        names = list(df.columns) if columns is None else [c for c in columns if c in df.columns]
+        histograms = {}
+        for name in names:
+            series = df[name]
+            if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+                continue
+            histograms[name] = GeometryTypeProfiler.geometry_histogram(series, budget=budget)
+        return histograms
+
+    @staticmethod
+    def merge_histograms(left: Optional[Dict[str, int]], right: Optional[Dict[str, int]]) -> Optional[Dict[str, int]]:
+        """
+        Sums two histograms of consecutive row ranges (None = column not scanned).
+        """
+        if left is None:
+            return None if right is None else dict(right)
+        merged = dict(left)
+        if right is None:
+            return merged
+        for key, n in right.items():
+            merged[key] = merged.get(key, 0) + n
+        return merged
@@ -1,5 +1,13 @@
-from ..models import DatasetSemanticProfile
-from typing import Literal
+import base64
+import re
+from dataclasses import dataclass, field
+from ..models import DatasetSemanticProfile, ResolutionEvidence
+from ..keyword_matcher import KeywordHits, match_column_names
+from ..geometry import WKT_HEADER_REGEX, WKT_TYPE_CODES, parse_wkt
+from ..sketches import hash_integers, hash_values, hll_estimate, hll_merge, hll_registers
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
 
 SpatialResolution = Literal[
     "coordinates-level",
@@ -22,6 +30,40 @@ RESOLUTION_PRIORITY = {"coordinates": 1,
                        "borough": 6, 
                        "city": 7}
 
+# Column-name keywords per resolution level, checked in this order
+# (keyword tables compiled into the shared KeywordMatcher)
+RESOLUTION_NAME_KEYWORDS = {
+    "coordinates": ["lat", "lon", "latitude", "longitude"],
+    "street": ["street"],
+    "zip": ["zip"],
+    "district": ["district", "tract"],
+    "borough": ["borough"],
+    "city": ["city"],
+}
+RESOLUTION_KEYWORD_TABLES = {
+    "resolution_" + level: keywords for level, keywords in RESOLUTION_NAME_KEYWORDS.items()
+}
+
+# Value evidence: which columns are scanned
+LATITUDE_NAME_REGEX = re.compile(r"(?:^|[^a-z])(?:lat|latitude)(?:[^a-z]|$)")
+LONGITUDE_NAME_REGEX = re.compile(r"(?:^|[^a-z])(?:lon|lng|long|longitude)(?:[^a-z]|$)")
+ZIP_NAME_REGEX = re.compile(r"zip|post(?:al)?[ _]?code|postal")
+BOROUGH_NAME_REGEX = re.compile(r"borough")
+ZIP_VALUE_REGEX = r"\d{5}(?:-\d{4})?"
+
+# Value evidence: thresholds
+MAX_COORDINATE_DECIMALS = 8
+MIN_COORDINATE_FRACTION = 0.95     # share of values inside the lat/lon range for a column to count
+MIN_ZIP_FRACTION = 0.8             # share of valid ZIP codes that confirms a ZIP column
+MAX_BOROUGH_CARDINALITY = 12       # more distinct values than this is not a borough code
+CENTROID_MAX_DISTINCT_RATIO = 0.05 # few distinct points, repeated across many rows ...
+CENTROID_MAX_DENSITY = 1.0         # ... spread sparsely (points per km²) are area centroids
+KM_PER_DEGREE = 111.32
+MIN_EXTENT_KM = 0.001
+
+# Decimal places of lat/lon degrees -> finest level they can resolve (1e-3 degrees is ~110 m)
+DECIMALS_RESOLUTION = [(4, "coordinates"), (3, "street"), (2, "neighborhood"), (0, "city")]
+
 class SpatialResolutionProfiler:
 
     #Helper function: map semantic values to our levels
@@ -51,35 +93,38 @@ class SpatialResolutionProfiler:
     @staticmethod
     def infer_resolution_from_name(name):    
         name = name.lower()    
-        if any(k in name for k in ["lat", "lon", "latitude", "longitude"]):        
-            return "coordinates"    
-        if "street" in name:        
-            return "street"    
-        if "zip" in name:        
-            return "zip"    
-        if any(k in name for k in ["district", "tract"]):        
-            return "district"    
-        if "borough" in name:        
-            return "borough"    
-        if "city" in name:        
-            return "city"    
+        for level, keywords in RESOLUTION_NAME_KEYWORDS.items():
+            if any(k in name for k in keywords):
+                return level
         return None
 
     @staticmethod
-    def infer_spatial_resolution(profile: DatasetSemanticProfile) -> str:    
+    def infer_spatial_resolution(profile: DatasetSemanticProfile, hits: Optional[KeywordHits] = None) -> str:    
+        if hits is None:
+            hits = match_column_names([c.name for c in profile.columns])
+        name_tables = hits.first_tables(list(RESOLUTION_KEYWORD_TABLES))
+
+        evidence = profile.resolution_evidence
+
         resolutions = set()        
-        for col in profile.columns:        
+        for i, col in enumerate(profile.columns):        
+            column_levels = set()
             
             # 1. Semantic profiler value        
             if col.spatial_resolution:            
                 res = SpatialResolutionProfiler.normalize_resolution(col.spatial_resolution)            
                 if res:                
-                    resolutions.add(res)        
+                    column_levels.add(res)        
             
             # 2. Column name heuristic        
-            name_res = SpatialResolutionProfiler.infer_resolution_from_name(col.name)        
-            if name_res:            
-                resolutions.add(name_res)    
+            name_table = name_tables.get(i)
+            if name_table:            
+                column_levels.add(name_table[len("resolution_"):])    
+
+            # 3. Value evidence confirms, refines or rejects the levels above
+            if evidence is not None:
+                column_levels = SpatialResolutionProfiler.apply_value_evidence(col.name, column_levels, evidence)
+            resolutions |= column_levels
             
         if not resolutions:        
             return "unknown"    
@@ -90,4 +135,411 @@ class SpatialResolutionProfiler:
         
         # If multiple -> multi-level    
         # BUT we still want: highest *priority* for sorting later if needed
-        return "multi-level"
\ No newline at end of file
+        return "multi-level"
+
+    @staticmethod
+    def apply_value_evidence(name: str, levels: Set[str], evidence: ResolutionEvidence) -> Set[str]:
+        levels = set(levels)
+        if name in evidence.coordinate_columns and "coordinates" in levels:
+            level = SpatialResolutionProfiler.coordinate_level(evidence)
+            if level:
+                levels.discard("coordinates")
+                levels.add(level)
+
+        if name in evidence.zip_fraction:
+            if evidence.zip_fraction[name] >= MIN_ZIP_FRACTION:
+                levels.add("zip")
+            else:
+                levels.discard("zip")
+
+        if name in evidence.borough_cardinality and "borough" in levels:
+            if evidence.borough_cardinality[name] > MAX_BOROUGH_CARDINALITY:
+                levels.discard("borough")
+        return levels
+
+    @staticmethod
+    def coordinate_level(evidence: ResolutionEvidence) -> Optional[str]:
+        """
+        Finest level the lat/lon values support: their decimal precision, coarsened to
+        neighborhood when a few points repeat sparsely over many rows (area centroids).
+        """
+        if evidence.coordinate_decimals is None:
+            return None
+        level = next(lvl for decimals, lvl in DECIMALS_RESOLUTION if evidence.coordinate_decimals >= decimals)
+
+        repeated = evidence.distinct_points <= CENTROID_MAX_DISTINCT_RATIO * evidence.point_count
+        if repeated and evidence.point_density < CENTROID_MAX_DENSITY:
+            level = max(level, "neighborhood", key=RESOLUTION_PRIORITY.get)
+        return level
+
+    @staticmethod
+    def scan_resolution_evidence(df: pd.DataFrame,
+        columns: Optional[List[str]] = None,
+        budget: Optional[int] = None) -> ResolutionEvidence:
+        """
+        Value-scan mode: coordinate precision, extent and point density of the first
+        latitude/longitude column pair (or else of the first WKT geometry column), and
+        ZIP/borough code validity and cardinality.
+        With `budget`, an evenly strided sample of at most `budget` rows is scanned.
+        """
+        names = list(df.columns) if columns is None else [c for c in columns if c in df.columns]
+        if budget is not None and len(df) > budget:
+            df = df.iloc[::-(-len(df) // budget)]
+        evidence = ResolutionEvidence()
+
+        latitude = longitude = None
+        for name in names:
+            lowered = str(name).lower()
+            if latitude is None and LATITUDE_NAME_REGEX.search(lowered):
+                values = to_float(df[name])
+                if coordinate_fraction(values, 90.0) >= MIN_COORDINATE_FRACTION:
+                    latitude = (name, values)
+            elif longitude is None and LONGITUDE_NAME_REGEX.search(lowered):
+                values = to_float(df[name])
+                if coordinate_fraction(values, 180.0) >= MIN_COORDINATE_FRACTION:
+                    longitude = (name, values)
+            if ZIP_NAME_REGEX.search(lowered):
+                values = df[name].dropna()
+                evidence.zip_fraction[name] = zip_code_count(values) / len(values) if len(values) else 0.0
+                evidence.zip_cardinality[name] = hll_estimate(code_registers(values))
+            elif BOROUGH_NAME_REGEX.search(lowered):
+                evidence.borough_cardinality[name] = hll_estimate(code_registers(df[name]))
+
+        if latitude is not None and longitude is not None:
+            scan_coordinates(evidence, [latitude[0], longitude[0]], latitude[1], longitude[1])
+        else:
+            scan_geometry_column(evidence, df, names)
+        return evidence
+
+    @staticmethod
+    def merged_resolution_evidence(columns: Dict[str, "ColumnResolutionStats"],
+        points: Dict[Tuple[str, str], "PointStats"]) -> ResolutionEvidence:
+        """
+        `scan_resolution_evidence` from statistics collected chunk by chunk: per-column
+        value evidence (in column order) and the points of every latitude/longitude
+        column pair. Gives the same evidence as a scan of all the rows at once.
+        """
+        evidence = ResolutionEvidence()
+        latitude = longitude = None
+        for name, stats in columns.items():
+            lowered = str(name).lower()
+            if latitude is None and LATITUDE_NAME_REGEX.search(lowered):
+                if stats.coordinate_fraction(latitude=True) >= MIN_COORDINATE_FRACTION:
+                    latitude = name
+            elif longitude is None and LONGITUDE_NAME_REGEX.search(lowered):
+                if stats.coordinate_fraction(latitude=False) >= MIN_COORDINATE_FRACTION:
+                    longitude = name
+            if ZIP_NAME_REGEX.search(lowered):
+                evidence.zip_fraction[name] = stats.zip_fraction()
+                evidence.zip_cardinality[name] = stats.code_count()
+            elif BOROUGH_NAME_REGEX.search(lowered):
+                evidence.borough_cardinality[name] = stats.code_count()
+
+        if latitude is not None and longitude is not None:
+            points.get((latitude, longitude), PointStats()).apply(evidence, [latitude, longitude])
+        else:
+            wkt = next((name for name, stats in columns.items() if stats.wkt), None)
+            if wkt is not None:
+                columns[wkt].apply_geometry(evidence, wkt)
+        return evidence
+
+
+def to_float(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def coordinate_fraction(values: np.ndarray, limit: float) -> float:
+    present = ~np.isnan(values)
+    if not present.any():
+        return 0.0
+    return float(np.count_nonzero(np.abs(values[present]) <= limit)) / np.count_nonzero(present)
+
+
+def decimal_places(values: np.ndarray, max_decimals: int = MAX_COORDINATE_DECIMALS) -> np.ndarray:
+    """
+    Number of decimal places of each value (up to `max_decimals`), tolerant to
+    float64 representation error.
+    """
+    decimals = np.full(len(values), max_decimals, dtype=np.int8)
+    undecided = np.ones(len(values), dtype=bool)
+    magnitude = np.abs(values)
+    # Preallocated buffers: this loop is the hot path for tall coordinate columns
+    scaled = np.empty_like(magnitude)
+    error = np.empty_like(magnitude)
+    exact = np.empty(len(values), dtype=bool)
+    for d in range(max_decimals):
+        np.multiply(magnitude, 10.0 ** d, out=scaled)
+        np.rint(scaled, out=error)
+        np.subtract(scaled, error, out=error)
+        np.abs(error, out=error)
+        np.multiply(scaled, 1e-11, out=scaled)
+        np.less_equal(error, scaled, out=exact)
+        exact &= undecided
+        decimals[exact] = d
+        undecided &= ~exact
+        if not undecided.any():
+            break
+    return decimals
+
+
+def scan_coordinates(evidence: ResolutionEvidence, columns: List[str], lat: np.ndarray, lon: np.ndarray) -> None:
+    PointStats().update(lat, lon).apply(evidence, columns)
+
+
+def scan_geometry_column(evidence: ResolutionEvidence, df: pd.DataFrame, names: List[str]) -> None:
+    """
+    Uses the first WKT column: POINT columns count as coordinates, other geometries
+    only contribute their extent.
+    """
+    for name in names:
+        series = df[name].dropna()
+        if not len(series) or not is_wkt(series.iat[0]):
+            continue
+        stats = ColumnResolutionStats(wkt=True)
+        stats.update_geometry(series)
+        stats.apply_geometry(evidence, name)
+        return
+
+
+def is_wkt(value: Any) -> bool:
+    return isinstance(value, str) and WKT_HEADER_REGEX.match(value) is not None
+
+
+def extent(xmin: float, ymin: float, xmax: float, ymax: float):
+    """
+    Approximate (width, height) in km of a lon/lat bounding box.
+    """
+    height = (ymax - ymin) * KM_PER_DEGREE
+    width = (xmax - xmin) * KM_PER_DEGREE * np.cos(np.radians((ymin + ymax) / 2.0))
+    return width, height
+
+
+def zip_code_stats(series: pd.Series):
+    """
+    (share of non-null values that are valid 5-digit / ZIP+4 codes, distinct values).
+    """
+    values = series.dropna()
+    if not len(values):
+        return 0.0, 0
+    return zip_code_count(values) / len(values), int(values.nunique())
+
+
+def zip_code_count(values: pd.Series) -> int:
+    # Valid 5-digit / ZIP+4 codes among non-null values
+    numbers = to_float(values)
+    valid = (numbers == np.round(numbers)) & (numbers >= 501) & (numbers <= 99950)
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        valid |= values.astype(str).str.strip().str.fullmatch(ZIP_VALUE_REGEX).to_numpy(dtype=bool, na_value=False)
+    return int(np.count_nonzero(valid))
+
+
+def _histogram_median(counts: np.ndarray) -> int:
+    # int(np.median(values)) of the non-negative integers whose bincount is `counts`
+    total = int(counts.sum())
+    cumulative = np.cumsum(counts)
+    upper = int(np.searchsorted(cumulative, total // 2, side="right"))
+    if total % 2:
+        return upper
+    lower = int(np.searchsorted(cumulative, total // 2 - 1, side="right"))
+    return int((lower + upper) / 2)
+
+
+def code_registers(series: pd.Series) -> np.ndarray:
+    # HyperLogLog registers of the distinct ZIP/borough codes of a column
+    return hll_registers(hash_values(series))
+
+
+def _encode(registers: np.ndarray) -> str:
+    return base64.b64encode(registers.tobytes()).decode("ascii")
+
+
+def _decode(text: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype=np.uint8).copy()
+
+
+def _merge_bbox(left: Optional[List[float]], right: Optional[List[float]]) -> Optional[List[float]]:
+    if left is None or right is None:
+        return right if left is None else left
+    return [min(left[0], right[0]), min(left[1], right[1]), max(left[2], right[2]), max(left[3], right[3])]
+
+
+def _merge_registers(left: Optional[np.ndarray], right: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if left is None or right is None:
+        return None if left is None and right is None else (left if right is None else right).copy()
+    return hll_merge(left, right)
+
+
+@dataclass
+class PointStats:
+    """
+    Mergeable statistics of the valid points of a latitude/longitude column pair (or
+    of a POINT geometry column): count, decimal places, bounding box and the distinct
+    points, estimated from HyperLogLog registers of their ~0.1 m keys (a fixed 2 KB).
+    """
+    count: int = 0
+    decimals: np.ndarray = field(default_factory=lambda: np.zeros(MAX_COORDINATE_DECIMALS + 1, dtype=np.int64))
+    bbox: Optional[List[float]] = None     # lon min, lat min, lon max, lat max
+    registers: np.ndarray = field(default_factory=lambda: hll_registers(np.empty(0, dtype=np.uint64)))
+
+    def update(self, lat: np.ndarray, lon: np.ndarray) -> "PointStats":
+        # Placeholder (0, 0) points and out-of-range values carry no location
+        valid = (np.abs(lat) <= 90.0) & (np.abs(lon) <= 180.0) & ~((lat == 0.0) & (lon == 0.0))
+        lat, lon = lat[valid], lon[valid]
+        if not len(lat):
+            return self
+        self.count += int(len(lat))
+        self.decimals += np.bincount(decimal_places(np.concatenate((lat, lon))), minlength=len(self.decimals))
+        self.bbox = _merge_bbox(self.bbox, [float(lon.min()), float(lat.min()), float(lon.max()), float(lat.max())])
+        # Distinct points at ~0.1 m: both microdegree integers packed into one sortable int64 key
+        keys = (np.rint(lat * 1e6).astype(np.int64) + 90_000_000) << np.int64(29)
+        keys |= np.rint(lon * 1e6).astype(np.int64) + 180_000_000
+        self.registers = hll_merge(self.registers, hll_registers(hash_integers(keys)))
+        return self
+
+    def merge(self, other: "PointStats") -> "PointStats":
+        return PointStats(
+            count=self.count + other.count,
+            decimals=self.decimals + other.decimals,
+            bbox=_merge_bbox(self.bbox, other.bbox),
+            registers=hll_merge(self.registers, other.registers),
+        )
+
+    def apply(self, evidence: ResolutionEvidence, columns: List[str]) -> None:
+        evidence.coordinate_columns = list(columns)
+        evidence.point_count = self.count
+        if not self.count:
+            return
+
+        evidence.coordinate_decimals = _histogram_median(self.decimals)
+        width, height = extent(*self.bbox)
+        evidence.extent_km = float(np.hypot(width, height))
+        evidence.distinct_points = min(hll_estimate(self.registers), self.count)
+        evidence.point_density = evidence.distinct_points / float(max(width, MIN_EXTENT_KM) * max(height, MIN_EXTENT_KM))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "decimals": self.decimals.tolist(),
+            "bbox": self.bbox,
+            "registers": _encode(self.registers),
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "PointStats":
+        return PointStats(
+            count=data["count"],
+            decimals=np.asarray(data["decimals"], dtype=np.int64),
+            bbox=data["bbox"],
+            registers=_decode(data["registers"]),
+        )
+
+
+@dataclass
+class ColumnResolutionStats:
+    """
+    Mergeable value evidence of one column, collected by what its name suggests it
+    holds: degree range counts (latitude/longitude names), valid and distinct codes
+    (ZIP and borough names) and, when its first non-null value is WKT, the geometry
+    counts, points and bounding box of its geometries.
+    """
+    degree_counts: Optional[List[int]] = None     # numeric values, |value| <= 90, |value| <= 180
+    zip_counts: Optional[List[int]] = None        # valid ZIP codes, non-null values
+    code_registers: Optional[np.ndarray] = None   # HyperLogLog of the distinct ZIP/borough codes
+    wkt: Optional[bool] = None                    # decided by the first non-null value
+    geometry_counts: Optional[List[int]] = None   # geometries, POINT geometries
+    points: Optional[PointStats] = None           # of the POINT geometries
+    bbox: Optional[List[float]] = None            # of all geometries
+
+    def update(self, name: str, series: pd.Series) -> "ColumnResolutionStats":
+        lowered = str(name).lower()
+        values = series.dropna()
+        if LATITUDE_NAME_REGEX.search(lowered) or LONGITUDE_NAME_REGEX.search(lowered):
+            magnitude = np.abs(to_float(values))
+            counts = [np.count_nonzero(~np.isnan(magnitude)), np.count_nonzero(magnitude <= 90.0),
+                      np.count_nonzero(magnitude <= 180.0)]
+            self.degree_counts = [a + int(b) for a, b in zip(self.degree_counts or [0, 0, 0], counts)]
+        is_zip = ZIP_NAME_REGEX.search(lowered) is not None
+        if is_zip or BOROUGH_NAME_REGEX.search(lowered):
+            registers = code_registers(values)
+            self.code_registers = registers if self.code_registers is None else hll_merge(self.code_registers, registers)
+            if is_zip:
+                valid, present = self.zip_counts or [0, 0]
+                self.zip_counts = [valid + zip_code_count(values), present + len(values)]
+
+        if self.wkt is None and len(values):
+            self.wkt = is_wkt(values.iat[0])
+        if self.wkt and len(values):
+            self.update_geometry(values)
+        return self
+
+    def update_geometry(self, values: pd.Series) -> None:
+        geometries = parse_wkt(values)
+        is_point = geometries.type_codes == WKT_TYPE_CODES["POINT"]
+        total, points = self.geometry_counts or [0, 0]
+        self.geometry_counts = [total + len(geometries), points + int(np.count_nonzero(is_point))]
+        xy = geometries.coords[geometries.vertex_offsets[:-1][is_point & (geometries.vertex_counts > 0)]]
+        self.points = (self.points or PointStats()).update(xy[:, 1], xy[:, 0])
+        bbox = geometries.total_bbox()
+        self.bbox = _merge_bbox(self.bbox, list(bbox) if bbox is not None else None)
+
+    def code_count(self) -> int:
+        return 0 if self.code_registers is None else hll_estimate(self.code_registers)
+
+    def coordinate_fraction(self, latitude: bool) -> float:
+        # Share of numeric values that are valid latitudes (or longitudes)
+        if not self.degree_counts or not self.degree_counts[0]:
+            return 0.0
+        return float(self.degree_counts[1 if latitude else 2]) / self.degree_counts[0]
+
+    def zip_fraction(self) -> float:
+        if not self.zip_counts or not self.zip_counts[1]:
+            return 0.0
+        return float(self.zip_counts[0]) / self.zip_counts[1]
+
+    def apply_geometry(self, evidence: ResolutionEvidence, name: str) -> None:
+        # POINT columns count as coordinates, other geometries only contribute their extent
+        total, points = self.geometry_counts or [0, 0]
+        if points >= MIN_COORDINATE_FRACTION * total:
+            (self.points or PointStats()).apply(evidence, [name])
+        elif self.bbox is not None and abs(self.bbox[1]) <= 90.0 and abs(self.bbox[3]) <= 90.0:
+            evidence.extent_km = float(np.hypot(*extent(*self.bbox)))
+
+    def merge(self, other: "ColumnResolutionStats") -> "ColumnResolutionStats":
+        def added(left, right):
+            if left is None or right is None:
+                return right if left is None else list(left)
+            return [a + b for a, b in zip(left, right)]
+
+        points = None
+        if self.points is not None or other.points is not None:
+            points = (self.points or PointStats()).merge(other.points or PointStats())
+        return ColumnResolutionStats(
+            degree_counts=added(self.degree_counts, other.degree_counts),
+            zip_counts=added(self.zip_counts, other.zip_counts),
+            code_registers=_merge_registers(self.code_registers, other.code_registers),
+            wkt=self.wkt if self.wkt is not None else other.wkt,
+            geometry_counts=added(self.geometry_counts, other.geometry_counts),
+            points=points,
+            bbox=_merge_bbox(self.bbox, other.bbox),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "degree_counts": self.degree_counts,
+            "zip_counts": self.zip_counts,
+            "code_registers": None if self.code_registers is None else _encode(self.code_registers),
+            "wkt": self.wkt,
+            "geometry_counts": self.geometry_counts,
+            "points": None if self.points is None else self.points.to_dict(),
+            "bbox": self.bbox,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "ColumnResolutionStats":
+        data = dict(data)
+        registers, points = data.pop("code_registers", None), data.pop("points", None)
+        return ColumnResolutionStats(
+            code_registers=None if registers is None else _decode(registers),
+            points=None if points is None else PointStats.from_dict(points),
+            **data,
+        )
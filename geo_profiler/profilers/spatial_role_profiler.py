@@ -1,11 +1,21 @@
 import re
-from typing import Literal
+from typing import Literal, Optional
 from ..models import DatasetSemanticProfile
+from ..keyword_matcher import KeywordHits, match_column_names
 
 SpatialRole = Literal["event", "boundary", "infrastructure", "observation", "unknown"]
 EVENT_KEYWORDS = ["complaint", "incident", "request", "service", "violation", "call", "ticket", "case", "report", "inspection"]
 BOUNDARY_KEYWORDS = ["district", "tract", "zone", "boundary", "polygon", "shape_area", "shape_len", "borough_boundary", "precinct"]
 INFRASTRUCTURE_KEYWORDS = ["station", "stop", "entrance", "facility", "subway","school", "hospital", "bridge", "tunnel", "park", "library"]
+SHAPE_KEYWORDS = ["shape_area", "shape_leng"]
+
+# Keyword tables compiled into the shared KeywordMatcher
+ROLE_KEYWORD_TABLES = {
+    "role_event": EVENT_KEYWORDS,
+    "role_boundary": BOUNDARY_KEYWORDS,
+    "role_infrastructure": INFRASTRUCTURE_KEYWORDS,
+    "role_shape": SHAPE_KEYWORDS,
+}
 
 class SpatialRoleProfiler:
     """
@@ -17,23 +27,22 @@ class SpatialRoleProfiler:
     """
     
     @staticmethod
-    def infer_spatial_role(profile: DatasetSemanticProfile) -> SpatialRole:    
+    def infer_spatial_role(profile: DatasetSemanticProfile, hits: Optional[KeywordHits] = None) -> SpatialRole:    
         cols = profile.columns
+        if hits is None:
+            hits = match_column_names([c.name for c in cols])
         
         # Helpers    
         spatial_cols = [c for c in cols if c.is_spatial]   
         temporal_cols = [c for c in cols if c.is_temporal]
 
-        col_names_lower = [c.name.lower() for c in cols]   
-        def any_name_matches(keywords):        
-            return any(any(k in name for k in keywords) for name in col_names_lower)    
         
         # 1. Boundary: polygon / administrative units    
         has_polygon_semantics = any(
             (c.raw_type and "polygon" in c.raw_type.lower()) or
             (c.spatial_resolution and c.spatial_resolution.lower() in ("region", "area", "polygon")) or
-            ("shape_area" in c.name.lower() or "shape_leng" in c.name.lower())
-            for c in spatial_cols
+            (i in hits.names("role_shape"))
+            for i, c in enumerate(cols) if c.is_spatial
         )
 
         if has_polygon_semantics:
@@ -42,13 +51,13 @@ class SpatialRoleProfiler:
         # 2. Event: time + coordinates + event-like columns    
         has_temporal = len(temporal_cols) > 0 
         has_point_like_spatial = any((c.spatial_resolution and c.spatial_resolution.lower() in ("coordinates", "street", "zip", "borough")) for c in spatial_cols)    
-        has_event_keywords = any_name_matches(EVENT_KEYWORDS)
+        has_event_keywords = hits.any("role_event")
 
         if has_temporal and has_point_like_spatial and has_event_keywords:       
             return "event"    
 
         # 3. Infrastructure: facilities / fixed infrastructure objects    
-        if spatial_cols and any_name_matches(INFRASTRUCTURE_KEYWORDS):        
+        if spatial_cols and hits.any("role_infrastructure"):        
             return "infrastructure"    
         
         # 4. Observation: spatial but not clearly event/boundary/infrastructure    
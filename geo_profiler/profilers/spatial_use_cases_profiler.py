@@ -1,39 +1,41 @@
-from typing import List
-from ..models import DatasetSemanticProfile
+from typing import Tuple
+from ..models import DatasetSemanticProfile, _intern_tuple
 
 USECASES = {"event_temporal": 
-            ["spatio-temporal incident analysis", 
+            ("spatio-temporal incident analysis", 
              "hotspot mapping", "event clustering", 
              "trend analysis over time",
-            ],    
-            "event_spatial_only": [
+            ),    
+            "event_spatial_only": (
                 "hotspot detection", 
                 "spatial clustering",
-            ],   
-            "observation": [
+            ),   
+            "observation": (
                 "location inventory", 
                 "sensor mapping", 
                 "proximity analysis",
-            ],    
-            "infrastructure": [
+            ),    
+            "infrastructure": (
                 "accessibility mapping", 
                 "navigation support", 
                 "facility density analysis",
-            ],    
-            "boundary": [
+            ),    
+            "boundary": (
                 "area-based aggregation", 
                 "choropleth visualization", 
                 "administrative-region analysis", 
-            ],    
-            "polyline": [
+            ),    
+            "polyline": (
                 "route analysis", 
                 "street-segment mapping", 
                 "mobility pathway visualization",
-            ],    
-            "multi": [
+            ),    
+            "multi": (
                 "combined geometric overlays", 
                 "multi-layer spatial visualization", 
-            ]}
+            )}
+# Registered first, so profiles rebuilt from the cache or a catalog share these tuples
+USECASES = {kind: _intern_tuple(cases) for kind, cases in USECASES.items()}
 
 class SpatialUseCaseProfiler:
 
@@ -45,8 +47,9 @@ class SpatialUseCaseProfiler:
     @staticmethod
     def infer_spatial_use_cases(profile: DatasetSemanticProfile,                            
         spatial_role: str,                            
-        geometry_type: str) -> List[str]:    
+        geometry_type: str) -> Tuple[str, ...]:    
         temporal = SpatialUseCaseProfiler.has_temporal_columns(profile)
+        # The shared USECASES tuples are returned; they are immutable, so profiles cannot alter them
         
         # Boundary    
         if spatial_role == "boundary":        
@@ -74,4 +77,4 @@ class SpatialUseCaseProfiler:
             return USECASES["multi"]
                 
         # If nothing matches 
-        return []
\ No newline at end of file
+        return ()
\ No newline at end of file
@@ -0,0 +1,272 @@
+import csv
+import io
+import mmap
+import os
+from dataclasses import dataclass, field
+from os import PathLike
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from .instrumentation import span
+from .profilers.geometry_type_profiler import GeometryTypeProfiler
+
+# Rows returned by sample_csv by default
+DEFAULT_SAMPLE_ROWS = 10_000
+
+# Expected byte offsets drawn per requested row in the first round, and at most in total
+DEFAULT_OVERSAMPLE = 2
+MAX_OFFSETS_PER_ROW = 50
+
+# Bytes read from the start of the file to estimate the row length
+HEAD_BYTES = 1 << 16
+
+DEFAULT_CONFIDENCE = 0.95
+
+# read_csv options that change which lines are rows or the header; sample_csv finds
+# rows by their newlines and parses the first line as the header, so it rejects them
+UNSUPPORTED_READ_CSV_KWARGS = {
+    "header", "names", "skiprows", "skipfooter", "nrows", "chunksize", "iterator",
+    "comment", "lineterminator", "delim_whitespace",
+}
+
+
+@dataclass
+class Estimate:
+    """
+    A sampled statistic and its confidence interval.
+    """
+    value: float
+    low: float
+    high: float
+
+
+def proportion_estimate(successes: int, n: int,
+    population: Optional[float] = None,
+    confidence: float = DEFAULT_CONFIDENCE) -> Estimate:
+    """
+    Wilson score interval of a proportion observed in `n` sampled rows, narrowed by the
+    finite population correction when the population size is known.
+    """
+    if n <= 0:
+        return Estimate(float("nan"), 0.0, 1.0)
+    p = successes / n
+    if population is not None and population > 1 and n < population:
+        n = n * (population - 1) / (population - n)     # effective sample size under the FPC
+    elif population is not None and n >= population:
+        return Estimate(p, p, p)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return Estimate(p, float(max(0.0, centre - margin)), float(min(1.0, centre + margin)))
+
+
+@dataclass
+class CsvSample:
+    """
+    Rows sampled from a CSV file, with what is needed to bound statistics derived from
+    them. With `exact`, the whole file was read (it held at most twice the requested
+    rows' worth of bytes) and `rows` are a uniform sample of all of its rows.
+    """
+    path: str
+    df: pd.DataFrame
+    file_bytes: int
+    estimated_rows: Estimate        # lines, when values contain newlines
+    exact: bool = False
+    hits: int = 0                   # random byte offsets drawn
+    rejected: int = 0               # accepted rows dropped as misaligned (e.g. quoted newlines)
+    confidence: float = DEFAULT_CONFIDENCE
+    offsets: List[int] = field(default_factory=list, repr=False)
+
+    @property
+    def rows(self) -> int:
+        return len(self.df)
+
+    def proportion(self, successes: int) -> Estimate:
+        return proportion_estimate(successes, self.rows, self.estimated_rows.value, self.confidence)
+
+    def null_fractions(self) -> Dict[str, Estimate]:
+        """
+        Fraction of null values per column, with bounds.
+        """
+        nulls = self.df.isna().sum()
+        return {str(name): self.proportion(int(nulls[name])) for name in self.df.columns}
+
+    def geometry_fractions(self, columns: Optional[List[str]] = None) -> Dict[str, Dict[str, Estimate]]:
+        """
+        Share of each geometry type among the sampled values of every text column.
+        """
+        histograms = GeometryTypeProfiler.scan_geometry_values(self.df, columns=columns)
+        fractions = {}
+        for name, histogram in histograms.items():
+            total = sum(histogram.values())
+            fractions[name] = {
+                key: proportion_estimate(count, total, self.estimated_rows.value, self.confidence)
+                for key, count in histogram.items()
+            }
+        return fractions
+
+
+def sample_csv(path: Union[str, PathLike],
+    n: int = DEFAULT_SAMPLE_ROWS,
+    seed: Optional[int] = None,
+    oversample: int = DEFAULT_OVERSAMPLE,
+    max_offsets: int = MAX_OFFSETS_PER_ROW,
+    confidence: float = DEFAULT_CONFIDENCE,
+    **read_csv_kwargs) -> CsvSample:
+    """
+    Samples about `n` rows of a CSV without parsing the whole file.
+
+    The file is memory-mapped and random byte offsets are drawn in rounds; each offset
+    selects the row containing it, found by scanning to the surrounding newlines. Since
+    long rows are hit more often, a row is accepted with probability (shortest row seen
+    in the first round) / (its length), which makes accepted rows a uniform sample.
+    Rounds continue until `n` distinct rows are accepted or `max_offsets * n` offsets
+    were drawn (then fewer rows are returned). Only the header and the accepted rows
+    are parsed. Rows whose field count does not match the header (a newline inside a
+    quoted value) are rejected; fields are split with the delimiter and quoting of
+    `read_csv_kwargs` (`sep`/`delimiter`, `quotechar`, `quoting`, `doublequote`,
+    `escapechar`), which must be a single character. Options that change which lines
+    are rows (`header`, `skiprows`, `nrows`, ...) raise a ValueError. Small files are
+    read whole instead.
+    """
+    dialect = _csv_dialect(read_csv_kwargs)
+    encoding = read_csv_kwargs.get("encoding") or "utf-8"
+    path = os.fspath(path)
+    rng = np.random.default_rng(seed)
+    file_bytes = os.path.getsize(path)
+
+    with span("stats.sample", file_bytes=file_bytes, requested_rows=n) as stage:
+        with open(path, "rb") as handle:
+            head = handle.read(HEAD_BYTES)
+        header_end = head.find(b"\n") + 1
+        if header_end <= 0 or file_bytes <= header_end:
+            df = pd.read_csv(path, **read_csv_kwargs)
+            return _exact_sample(path, df, file_bytes, n, rng, confidence)
+
+        head_rows = head[header_end:].count(b"\n")
+        average_row = (len(head) - header_end) / max(1, head_rows)
+        if (file_bytes - header_end) <= 2 * n * average_row:
+            df = pd.read_csv(path, **read_csv_kwargs)
+            return _exact_sample(path, df, file_bytes, n, rng, confidence)
+
+        header = head[:header_end]
+        columns = _field_count(header, dialect, encoding)
+        data_bytes = file_bytes - header_end
+        lengths: List[int] = []             # every hit, duplicates included
+        accepted: Dict[int, bytes] = {}     # row start -> row
+        rejected, reference = 0, None
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            while len(accepted) < n and len(lengths) < max_offsets * n:
+                # Size each round from the acceptance rate seen so far
+                rate = len(accepted) / len(lengths) if accepted else 1.0 / oversample
+                draw = min(max_offsets * n - len(lengths), int((n - len(accepted)) / rate * 1.2) + 16)
+                hits = _rows_at(mm, header_end, rng.integers(header_end, file_bytes, draw))
+                round_lengths = np.fromiter((len(row) for _, row in hits), dtype=np.float64, count=len(hits))
+                lengths.extend(round_lengths.astype(np.int64).tolist())
+                if reference is None:
+                    reference = round_lengths.min()
+
+                # A row is hit with probability proportional to its length; accepting it with
+                # probability reference / length makes accepted rows uniform over the file
+                keep = rng.random(len(hits)) < reference / round_lengths
+                for (start, row), kept in zip(hits, keep.tolist()):
+                    if not kept or start in accepted:
+                        continue
+                    if _field_count(row, dialect, encoding) == columns:
+                        accepted[start] = row
+                    else:
+                        rejected += 1
+
+        # Length-biased hits: mean(1 / length) estimates 1 / (mean row length) without bias
+        inverse = 1.0 / np.asarray(lengths, dtype=np.float64)
+        row_estimate = data_bytes * inverse.mean()
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        margin = z * data_bytes * inverse.std(ddof=1) / np.sqrt(len(inverse)) if len(inverse) > 1 else 0.0
+        estimated_rows = Estimate(float(row_estimate), float(max(0.0, row_estimate - margin)), float(row_estimate + margin))
+
+        # The last round may overshoot; the surplus is dropped at random, not by position
+        starts = sorted(accepted)
+        if len(starts) > n:
+            starts = sorted(rng.choice(starts, n, replace=False).tolist())
+        body = b"".join(accepted[start] for start in starts)
+        df = pd.read_csv(io.BytesIO(header + body), **read_csv_kwargs)
+        stage.set(sampled_rows=len(df), offsets=len(lengths), rejected=rejected)
+        return CsvSample(
+            path=path,
+            df=df,
+            file_bytes=file_bytes,
+            estimated_rows=estimated_rows,
+            hits=len(lengths),
+            rejected=rejected,
+            confidence=confidence,
+            offsets=starts,
+        )
+
+
+def _rows_at(mm: mmap.mmap, data_start: int, offsets: np.ndarray) -> List[Tuple[int, bytes]]:
+    # (start offset, bytes including the newline) of the row containing each offset
+    rows = []
+    size = len(mm)
+    for offset in np.sort(offsets).tolist():
+        start = mm.rfind(b"\n", data_start, offset) + 1 or data_start
+        end = mm.find(b"\n", offset)
+        end = size if end < 0 else end + 1
+        row = mm[start:end]
+        if not row.endswith(b"\n"):
+            row += b"\n"
+        rows.append((start, row))
+    return rows
+
+
+def _csv_dialect(read_csv_kwargs: Dict[str, object]) -> Dict[str, object]:
+    # csv.reader options splitting rows the way read_csv does with the same kwargs
+    unsupported = sorted(UNSUPPORTED_READ_CSV_KWARGS.intersection(read_csv_kwargs))
+    if unsupported:
+        raise ValueError(f"sample_csv does not support read_csv options: {', '.join(unsupported)}")
+    delimiter = read_csv_kwargs.get("sep", read_csv_kwargs.get("delimiter"))
+    delimiter = "," if delimiter is None else delimiter
+    if not isinstance(delimiter, str) or len(delimiter) != 1:
+        raise ValueError(f"sample_csv needs a single-character separator, not {delimiter!r}")
+    quoting = read_csv_kwargs.get("quoting", csv.QUOTE_MINIMAL)
+    return {
+        "delimiter": delimiter,
+        "quotechar": read_csv_kwargs.get("quotechar", '"') if quoting != csv.QUOTE_NONE else None,
+        "quoting": quoting,
+        "doublequote": read_csv_kwargs.get("doublequote", True),
+        "escapechar": read_csv_kwargs.get("escapechar"),
+        "strict": True,
+    }
+
+
+def _field_count(row: bytes, dialect: Dict[str, object], encoding: str = "utf-8") -> int:
+    # Fields of one line, or -1 when it cannot be a whole row (an unclosed quote)
+    text = row.decode(encoding, "replace").rstrip("\r\n")
+    quotechar = dialect["quotechar"]
+    if quotechar and dialect["escapechar"] is None and text.count(quotechar) % 2:
+        return -1
+    try:
+        return len(next(csv.reader([text], **dialect), []))
+    except csv.Error:
+        return -1
+
+
+def _exact_sample(path: str,
+    df: pd.DataFrame,
+    file_bytes: int,
+    n: int,
+    rng: np.random.Generator,
+    confidence: float) -> CsvSample:
+    total = len(df)
+    if total > n:
+        df = df.iloc[np.sort(rng.choice(total, n, replace=False))].reset_index(drop=True)
+    return CsvSample(
+        path=path,
+        df=df,
+        file_bytes=file_bytes,
+        estimated_rows=Estimate(float(total), float(total), float(total)),
+        exact=True,
+        hits=total,
+        confidence=confidence,
+    )
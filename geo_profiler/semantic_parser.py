@@ -1,64 +1,141 @@
 import re
+from typing import Dict, List, Optional, Sequence
 from .models import ColumnSemantic, DatasetSemanticProfile
 import pandas as pd
 
-class SemanticParser:
-
-    @staticmethod
-    def parse_semantic_profile_text(text: str, df: pd.DataFrame) -> DatasetSemanticProfile:
-        columns = []
-
-        # Split per column block using '**ColumnName**:'
-        blocks = re.split(r"\*\*(.*?)\*\*:", text)[1:]
+# Number of non-null sample values kept per column
+SAMPLE_SIZE = 3
 
-        for i in range(0, len(blocks), 2):
-            name = blocks[i].strip()
-            content = blocks[i + 1]
+# Column blocks are introduced by '**ColumnName**:'
+BLOCK_HEADER_REGEX = re.compile(r"\*\*(.*?)\*\*:")
 
-            # Defaults
-            is_spatial = False
-            spatial_resolution = None
-            domain_type = None
-            function = None
-            is_temporal = False
-            raw_type = None
+# Single pass over a block: every field starts at one of these anchors ...
+FIELD_ANCHOR_REGEX = re.compile(
+    r"(?P<spatial>Contains spatial data)"
+    r"|(?P<temporal>Contains temporal data)"
+    r"|(?P<resolution>resolution:)"
+    r"|(?P<domain>Domain-specific type:)"
+    r"|(?P<function>Function/Usage context:)"
+    r"|(?P<raw>Represents)"
+)
+# ... and its value is read right after the anchor
+FIELD_VALUE_REGEX = {
+    "resolution": re.compile(r"\s*([^)]+)"),
+    "domain": re.compile(r"\s*([^.]+)"),
+    "function": re.compile(r"\s*([^.]+)"),
+    "raw": re.compile(r"\s+([^.]+)"),
+}
 
-            #Spatial detection
-            if "Contains spatial data" in content:
-                is_spatial = True
+# Lazy sampling reads the column in windows that grow from SAMPLE_WINDOW rows
+SAMPLE_WINDOW = 64
 
-                #Extract spatial resolution
-                res_match = re.search(r"resolution:\s*([^)]+)", content)
-                if res_match:
-                    spatial_resolution = res_match.group(1).strip()
+class SemanticParser:
 
-            #Temporal detection
-            if "Contains temporal data" in content:
-                is_temporal = True
+    @staticmethod
+    def parse_semantic_profile_text(text: str, df: pd.DataFrame) -> DatasetSemanticProfile:
+        return SemanticParser.parse_with_samples(text, SemanticParser.column_samples(text, df))
 
-            #Domain type
-            dom_match = re.search(r"Domain-specific type:\s*([^.]+)", content)
-            if dom_match:
-                domain_type = dom_match.group(1).strip()
+    @staticmethod
+    def column_samples(text: str, df: pd.DataFrame) -> Dict[str, List[str]]:
+        """
+        The first non-null values of every column of `df` named in the profile text,
+        which is all `parse_semantic_profile_text` reads from the frame.
+        """
+        samples = {}
+        for name in SemanticParser.column_names(text):
+            column = SemanticParser.resolve_column(df, name)
+            if column is not None:
+                samples[name] = SemanticParser.first_non_null_values(df[column], SAMPLE_SIZE)
+        return samples
 
-            func_match = re.search(r"Function/Usage context:\s*([^.]+)", content)
-            if func_match:
-                function = func_match.group(1).strip()
+    @staticmethod
+    def parse_with_samples(text: str, samples: Dict[str, List[str]]) -> DatasetSemanticProfile:
+        """
+        Parses the semantic profile text using precomputed sample values per column
+        (e.g. collected from a chunked reader) instead of a loaded DataFrame.
+        Columns without samples get an empty sample list.
+        """
+        columns = []
 
-            raw_match = re.search(r"Represents\s+([^.]+)", content)
-            if raw_match:
-                raw_type = raw_match.group(1).strip()
+        headers = list(BLOCK_HEADER_REGEX.finditer(text))
+        for i, header in enumerate(headers):
+            name = header.group(1).strip()
+            start = header.end()
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+            fields = SemanticParser.parse_block_fields(text, start, end)
 
             columns.append(
                 ColumnSemantic(
                     name=name,
-                    is_spatial=is_spatial,
-                    spatial_resolution=spatial_resolution,
-                    is_temporal=is_temporal,
-                    domain_type=domain_type,
-                    function=function,
-                    raw_type=raw_type,
-                    sample_values=df[name].dropna().astype(str).head(3).tolist())
+                    is_spatial="spatial" in fields,
+                    spatial_resolution=fields.get("resolution") if "spatial" in fields else None,
+                    is_temporal="temporal" in fields,
+                    domain_type=fields.get("domain"),
+                    function=fields.get("function"),
+                    raw_type=fields.get("raw"),
+                    sample_values=list(samples.get(name, [])))
             )
 
-        return DatasetSemanticProfile(columns=columns)
\ No newline at end of file
+        return DatasetSemanticProfile(columns=columns)
+
+    @staticmethod
+    def parse_block_fields(text: str, start: int, end: int) -> Dict[str, Optional[str]]:
+        """
+        Tokenizes text[start:end] in one pass, keeping the first value of every field.
+        """
+        fields = {}
+        for anchor in FIELD_ANCHOR_REGEX.finditer(text, start, end):
+            kind = anchor.lastgroup
+            if kind in fields:
+                continue
+            value_regex = FIELD_VALUE_REGEX.get(kind)
+            if value_regex is None:
+                fields[kind] = None
+                continue
+            value = value_regex.match(text, anchor.end(), end)
+            if value:
+                fields[kind] = value.group(1).strip()
+        return fields
+
+    @staticmethod
+    def column_names(text: str) -> List[str]:
+        """
+        Returns the column names referenced by the semantic profile text, in order.
+        """
+        return [header.group(1).strip() for header in BLOCK_HEADER_REGEX.finditer(text)]
+
+    @staticmethod
+    def resolve_column(df: pd.DataFrame, name: str) -> Optional[str]:
+        """
+        Maps a column name from the profile text to a column of `df`, ignoring case and
+        surrounding whitespace when there is no exact match. None if it is missing.
+        """
+        return SemanticParser.resolve_name(df.columns, name)
+
+    @staticmethod
+    def resolve_name(columns: Sequence, name: str) -> Optional[str]:
+        """
+        `resolve_column` over a plain sequence of column names (e.g. an Arrow schema's).
+        """
+        if name in columns:
+            return name
+        wanted = name.strip().lower()
+        for column in columns:
+            if str(column).strip().lower() == wanted:
+                return column
+        return None
+
+    @staticmethod
+    def first_non_null_values(series: pd.Series, k: int = SAMPLE_SIZE) -> List[str]:
+        """
+        Same as `series.dropna().astype(str).head(k).tolist()`, but only scans rows until
+        `k` non-null values are found, in windows that double in size.
+        """
+        values = []
+        start, window = 0, SAMPLE_WINDOW
+        while len(values) < k and start < len(series):
+            chunk = series.iloc[start:start + window]
+            values.extend(chunk[chunk.notna()].head(k - len(values)).astype(str).tolist())
+            start += window
+            window *= 2
+        return values
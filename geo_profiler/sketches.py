@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# HyperLogLog precision: 2**11 one-byte registers per column, ~2.3% standard error
+HLL_PRECISION = 11
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """
+    64-bit hashes of the non-null values of a column, stable across processes and chunks.
+    Numbers, including numeric text, are hashed as float64: CSV chunks of one column may
+    be parsed as int, float or text depending on their values, and equal values must hash
+    equally in all of them.
+    """
+    values = series.dropna()
+    if pd.api.types.is_bool_dtype(values.dtype):
+        values = values.astype(np.int64)
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return _hash(values.astype(np.float64))
+
+    values = values.astype(str)
+    numbers = pd.to_numeric(values, errors="coerce")
+    is_number = numbers.notna().to_numpy()
+    if not is_number.any():
+        return _hash(values)
+    return np.where(is_number, _hash(numbers.fillna(0.0).astype(np.float64)), _hash(values))
+
+
+def hash_integers(values: np.ndarray) -> np.ndarray:
+    """
+    64-bit hashes of integer keys (the splitmix64 finalizer), for keys that do not
+    survive hash_values' float64 conversion, such as packed coordinates.
+    """
+    z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _hash(values: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Exact bit length of uint64 values, computed on 32-bit halves (exact in float64)
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide="ignore"):
+        high_bits = np.where(high > 0, np.floor(np.log2(np.maximum(high, 1))) + 33, 0)
+        low_bits = np.where(low > 0, np.floor(np.log2(np.maximum(low, 1))) + 1, 0)
+    return np.where(high > 0, high_bits, low_bits).astype(np.int64)
+
+
+def hll_registers(hashes: np.ndarray, precision: int = HLL_PRECISION) -> np.ndarray:
+    """
+    HyperLogLog registers for a batch of 64-bit hashes.
+    """
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    if not len(hashes):
+        return registers
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    rest = hashes << np.uint64(precision)
+    # Position of the leftmost 1-bit in the remaining 64 - precision bits
+    rank = np.minimum(64 - _bit_length(rest) + 1, 64 - precision + 1).astype(np.uint8)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def hll_merge(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    return np.maximum(left, right)
+
+
+def hll_estimate(registers: np.ndarray) -> int:
+    """
+    Distinct-count estimate with the standard small-range (linear counting) correction.
+    """
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
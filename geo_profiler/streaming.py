@@ -0,0 +1,78 @@
+import os
+import time
+from typing import Iterable, Iterator, List, Optional, Union
+import pandas as pd
+from .column_stats import DEFAULT_SAMPLE_SIZE, DatasetStats
+from .instrumentation import span
+
+# Default number of CSV rows read per chunk; bounds peak memory
+DEFAULT_CHUNKSIZE = 100_000
+
+DatasetSource = Union[str, os.PathLike, pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+def iter_dataframe_chunks(source: DatasetSource,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[List[str]] = None,
+    **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Yields DataFrame chunks from a CSV path, a single DataFrame or any iterable of chunks.
+    When `columns` is given, only those columns are parsed from CSV files.
+    """
+    if isinstance(source, pd.DataFrame):
+        yield source
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        usecols = None
+        if columns is not None:
+            wanted = set(columns)
+            usecols = lambda c: c in wanted
+        with pd.read_csv(source, chunksize=chunksize, usecols=usecols, **read_csv_kwargs) as reader:
+            yield from reader
+        return
+
+    yield from source
+
+
+def collect_dataset_stats(source: DatasetSource,
+    columns: Optional[List[str]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    full_scan: bool = False,
+    scan_values: bool = False,
+    sketch: bool = False,
+    temporal_columns: Iterable[str] = (),
+    **read_csv_kwargs) -> DatasetStats:
+    """
+    Folds every chunk of `source` into mergeable DatasetStats.
+
+    Only one chunk is held in memory at a time. Unless `full_scan` is set, reading
+    stops as soon as every tracked column present in the source has `sample_size`
+    non-null values, in which case row and null counts only cover the rows read so far. `scan_values` counts
+    geometry types of every value and `sketch` maintains distinct-count and range
+    sketches (see ColumnStats); both always read the whole source.
+    """
+    full_scan = full_scan or scan_values or sketch
+    stats = DatasetStats(sample_size=sample_size)
+    with span("stats.collect", scan_values=scan_values, sketch=sketch) as stage:
+        chunks = iter_dataframe_chunks(source, chunksize=chunksize, columns=columns, **read_csv_kwargs)
+        read_seconds, rows = 0.0, 0
+        while True:
+            # Reading (CSV parsing) is timed apart from folding the chunk into the stats
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            read_seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            rows += len(chunk)
+            stats.update(
+                chunk, columns=columns, scan_values=scan_values, sketch=sketch, temporal_columns=temporal_columns
+            )
+            if not full_scan and stats.columns and stats.is_sampled:
+                # Requested columns the source does not have never get samples
+                if columns is None or all(c in stats.columns for c in columns if c in chunk.columns):
+                    chunks.close()
+                    break
+        stage.set(rows=rows, read_seconds=read_seconds)
+    return stats
@@ -0,0 +1,38 @@
+import json
+import re
+from typing import Dict, Sequence, Tuple
+
+# Fields every dataset entry of a batched answer must carry
+BATCH_OUTPUT_FIELDS = ("description", "search_description")
+
+CODE_FENCE_REGEX = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+
+
+def parse_batch_output(text: str, dataset_ids: Sequence[str]) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+    """
+    Validates a batched answer against the ids that were asked for. Returns the valid
+    entries ({id: {"description": ..., "search_description": ...}}) and, for every other
+    id, why it is unusable. Markdown code fences and text around the outermost JSON
+    object are tolerated; unknown ids in the answer are ignored.
+    """
+    body = CODE_FENCE_REGEX.sub("", text or "")
+    start, end = body.find("{"), body.rfind("}")
+    try:
+        data = json.loads(body[start:end + 1]) if 0 <= start < end else None
+    except json.JSONDecodeError as exc:
+        return {}, {dataset_id: f"invalid JSON: {exc.msg}" for dataset_id in dataset_ids}
+    if not isinstance(data, dict):
+        return {}, {dataset_id: "answer is not a JSON object" for dataset_id in dataset_ids}
+
+    valid, problems = {}, {}
+    for dataset_id in dataset_ids:
+        entry = data.get(dataset_id)
+        if not isinstance(entry, dict):
+            problems[dataset_id] = "missing" if entry is None else "entry is not an object"
+            continue
+        missing = [f for f in BATCH_OUTPUT_FIELDS if not isinstance(entry.get(f), str) or not entry[f].strip()]
+        if missing:
+            problems[dataset_id] = f"missing or empty {', '.join(missing)}"
+            continue
+        valid[dataset_id] = {f: entry[f].strip() for f in BATCH_OUTPUT_FIELDS}
+    return valid, problems
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+# Eviction runs after this many writes instead of after every single one
+EVICT_EVERY = 64
+
+
+class CompletionCache:
+    """
+    Persistent, content-addressed cache of LLM completions backed by SQLite.
+
+    Entries are keyed by a SHA-256 of (model_name, temperature, system_message, prompt).
+    The database runs in WAL mode, so several threads and processes can read and write
+    the same file concurrently. Entries older than `max_age` seconds are ignored and
+    removed; beyond `max_entries` / `max_bytes` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None):
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+
+    @staticmethod
+    def make_key(model_name: str, temperature: float, system_message: Optional[str], prompt: str) -> str:
+        payload = json.dumps([model_name, float(temperature), system_message, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._connection()
+        row = conn.execute("SELECT value, created FROM completions WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.max_age is not None and now - row[1] > self.max_age):
+            self._count("misses")
+            return None
+        conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO completions (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value.encode("utf-8")), now, now),
+        )
+        self._count("writes")
+        if self.writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes expired entries, then least recently used ones until the size limits hold.
+        """
+        conn = self._connection()
+        removed = 0
+        if self.max_age is not None:
+            removed += conn.execute("DELETE FROM completions WHERE created < ?", (time.time() - self.max_age,)).rowcount
+        if self.max_entries is not None:
+            removed += conn.execute(
+                "DELETE FROM completions WHERE key IN ("
+                " SELECT key FROM completions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if self.max_bytes is not None:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+            if total > self.max_bytes:
+                cutoff = conn.execute(
+                    "SELECT accessed FROM ("
+                    " SELECT accessed, SUM(size) OVER (ORDER BY accessed DESC) AS running FROM completions)"
+                    " WHERE running > ? ORDER BY accessed DESC LIMIT 1",
+                    (self.max_bytes,),
+                ).fetchone()
+                if cutoff is not None:
+                    removed += conn.execute("DELETE FROM completions WHERE accessed <= ?", (cutoff[0],)).rowcount
+        self._count("evictions", removed)
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM completions")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
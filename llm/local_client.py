@@ -0,0 +1,507 @@
+"""
+Deterministic stand-in for an OpenAI-compatible chat completions endpoint.
+
+    python -m llm.local_client --port 8000 --latency lognormal --mean 0.8 --rate-limit-rate 0.05
+
+Used in-process (LocalLLMClient / AsyncLocalLLMClient expose the `chat.completions.create`
+surface AutoDDGGeo calls) or over HTTP (LocalLLMServer, for openai.OpenAI(base_url=...)
+and other processes), so the pipeline can be load-tested without a provider.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from .token_budget import TOKEN_PIECE_REGEX, estimate_tokens
+
+LATENCY_KINDS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+DATASET_HEADER_REGEX = re.compile(r"^### Dataset (.+)$", re.MULTILINE)
+
+# Words the default responder draws from, picked by a hash of the prompt
+RESPONSE_VOCABULARY = (
+    "dataset records location borough street coordinates point polygon zone district "
+    "spatial analysis hotspot mapping aggregation density service complaints parking "
+    "meter landmark park boundary centerline segment resolution city agency status "
+    "date time category identifier address latitude longitude geometry planning"
+).split()
+DEFAULT_RESPONSE_WORDS = 120
+
+
+@dataclass
+class LatencyModel:
+    """
+    Simulated latency: time to first token drawn from `kind` with mean `mean` seconds
+    (`spread` is the half-width for uniform, the standard deviation for normal and the
+    sigma of the underlying normal for lognormal), then `per_token` seconds per
+    streamed token piece.
+    """
+    kind: str = "fixed"
+    mean: float = 0.0
+    spread: float = 0.0
+    per_token: float = 0.0
+
+    def __post_init__(self):
+        if self.kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency kind {self.kind!r}; expected one of {LATENCY_KINDS}")
+
+    def first_token(self, rng: random.Random) -> float:
+        if self.mean <= 0:
+            return 0.0
+        if self.kind == "uniform":
+            delay = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "normal":
+            delay = rng.gauss(self.mean, self.spread)
+        elif self.kind == "lognormal":
+            # mu chosen so that the distribution's mean is `mean`
+            delay = rng.lognormvariate(math.log(self.mean) - self.spread ** 2 / 2, self.spread)
+        elif self.kind == "exponential":
+            delay = rng.expovariate(1.0 / self.mean)
+        else:
+            delay = self.mean
+        return max(0.0, delay)
+
+
+class LocalLLMError(Exception):
+    """
+    Injected failure, shaped like openai.APIStatusError: `status_code`, and a `response`
+    whose headers carry Retry-After for 429s (so is_retryable_error / retry_delay apply).
+    """
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.message = message
+        headers = {"retry-after": f"{retry_after:g}"} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+@dataclass
+class LocalLLMStats:
+    requests: int = 0
+    completed: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    simulated_seconds: float = 0.0
+    max_in_flight: int = 0
+
+
+@dataclass
+class Planned:
+    """
+    Everything decided about one request before it is answered: the payload, the
+    failure to raise (if any) and the simulated delays.
+    """
+    payload: Dict[str, Any]
+    error: Optional[LocalLLMError]
+    first_token_delay: float
+    token_delay: float
+    pieces: List[str] = field(default_factory=list)     # streamed deltas
+
+
+class LocalLLMBackend:
+    """
+    Answers chat completion requests deterministically.
+
+    The content depends only on the model and messages: a `canned` response whose key is
+    a substring of the user message, else `responder(messages, request)` when given,
+    else synthetic text derived from a hash of the prompt (or, for batched prompts with
+    `### Dataset <id>` sections, a JSON object with an entry per id). Latency, injected
+    5xx errors (`error_rate`) and 429s (`rate_limit_rate`, or beyond `max_in_flight`
+    concurrent requests) are drawn from a generator seeded with (`seed`, request number),
+    so a run with the same request order fails the same requests. Token usage is counted
+    with the offline estimate of llm.token_budget.
+    """
+
+    def __init__(self,
+        latency: Optional[LatencyModel] = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.0,
+        max_in_flight: Optional[int] = None,
+        canned: Optional[Dict[str, str]] = None,
+        responder: Optional[Callable[[List[Dict[str, str]], Dict[str, Any]], str]] = None,
+        response_words: int = DEFAULT_RESPONSE_WORDS,
+        seed: int = 0):
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.max_in_flight = max_in_flight
+        self.canned = dict(canned or {})
+        self.responder = responder
+        self.response_words = response_words
+        self.seed = seed
+        self.stats = LocalLLMStats()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def plan(self, request: Dict[str, Any]) -> Planned:
+        """
+        Counts the request in and decides its outcome; `finish` must follow.
+        """
+        with self._lock:
+            number = self.stats.requests
+            self.stats.requests += 1
+            self._in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+            saturated = self.max_in_flight is not None and self._in_flight > self.max_in_flight
+        rng = random.Random(f"{self.seed}:{number}")
+
+        draw = rng.random()
+        error = None
+        if saturated or draw < self.rate_limit_rate:
+            error = LocalLLMError(429, "Rate limit exceeded", retry_after=self.retry_after)
+        elif draw < self.rate_limit_rate + self.error_rate:
+            error = LocalLLMError(rng.choice((500, 502, 503)), "Injected server error")
+        first_token_delay = self.latency.first_token(rng)
+        if error is not None:
+            return Planned({}, error, first_token_delay, 0.0)
+
+        messages = request.get("messages") or []
+        content = self.respond(messages, request)
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        pieces = _pieces(content)
+        payload = completion_payload(request.get("model", "local"), content, prompt_tokens, estimate_tokens(content), number)
+        return Planned(payload, None, first_token_delay, self.latency.per_token, pieces)
+
+    def finish(self, planned: Planned) -> None:
+        usage = planned.payload.get("usage", {})
+        with self._lock:
+            self._in_flight -= 1
+            self.stats.simulated_seconds += planned.first_token_delay + planned.token_delay * len(planned.pieces)
+            if planned.error is None:
+                self.stats.completed += 1
+                self.stats.prompt_tokens += usage.get("prompt_tokens", 0)
+                self.stats.completion_tokens += usage.get("completion_tokens", 0)
+            elif planned.error.status_code == 429:
+                self.stats.rate_limited += 1
+            else:
+                self.stats.errors += 1
+
+    def respond(self, messages: List[Dict[str, str]], request: Dict[str, Any]) -> str:
+        prompt = (messages[-1].get("content") or "") if messages else ""
+        for key, response in self.canned.items():
+            if key in prompt:
+                return response
+        if self.responder is not None:
+            return self.responder(messages, request)
+        ids = DATASET_HEADER_REGEX.findall(prompt)
+        if ids:
+            return json.dumps({
+                dataset_id.strip(): {
+                    "description": synthetic_text(f"{prompt}\0{dataset_id}", self.response_words),
+                    "search_description": synthetic_text(f"{prompt}\0{dataset_id}\0search", 2 * self.response_words),
+                }
+                for dataset_id in ids
+            })
+        return synthetic_text(prompt, self.response_words)
+
+
+def synthetic_text(seed_text: str, words: int) -> str:
+    """
+    `words` words chosen by a hash of `seed_text`; the same text always gives the same answer.
+    """
+    rng = random.Random(hashlib.sha256(seed_text.encode("utf-8")).digest())
+    text = " ".join(rng.choice(RESPONSE_VOCABULARY) for _ in range(words))
+    return text[:1].upper() + text[1:] + "."
+
+
+def _pieces(content: str) -> List[str]:
+    # Streamed deltas: each token piece with the whitespace before it
+    pieces, start = [], 0
+    for match in TOKEN_PIECE_REGEX.finditer(content):
+        pieces.append(content[start:match.end()])
+        start = match.end()
+    if start < len(content) or not pieces:
+        pieces.append(content[start:])
+    return pieces
+
+
+def completion_payload(model: str, content: str, prompt_tokens: int, completion_tokens: int, number: int) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-local-{number}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def chunk_payloads(planned: Planned) -> Iterator[Dict[str, Any]]:
+    """
+    The `chat.completion.chunk` objects of a streamed answer: a role chunk, one chunk per
+    token piece, then a final chunk with the finish reason and usage.
+    """
+    base = {key: planned.payload[key] for key in ("id", "created", "model")}
+    base["object"] = "chat.completion.chunk"
+    yield {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+    for piece in planned.pieces:
+        yield {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": planned.payload["usage"]}
+
+
+def to_namespace(value: Any) -> Any:
+    """
+    JSON payload -> attribute access (response.choices[0].message.content), like the SDK objects.
+    """
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(item) for item in value]
+    return value
+
+
+class LocalLLMClient:
+    """
+    In-process synchronous client: `client.chat.completions.create(model=..., messages=...,
+    stream=False)` sleeps the simulated latency and returns an SDK-shaped response, or an
+    iterator of chunks with `stream=True`.
+    """
+
+    def __init__(self, backend: Optional[LocalLLMBackend] = None, **backend_kwargs):
+        self.backend = backend or LocalLLMBackend(**backend_kwargs)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request: Any):
+        planned = self.backend.plan(request)
+        if not request.get("stream"):
+            try:
+                time.sleep(planned.first_token_delay + planned.token_delay * len(planned.pieces))
+                if planned.error is not None:
+                    raise planned.error
+                return to_namespace(planned.payload)
+            finally:
+                self.backend.finish(planned)
+        try:
+            time.sleep(planned.first_token_delay)
+            if planned.error is not None:
+                raise planned.error
+        except BaseException:
+            self.backend.finish(planned)
+            raise
+        return self._stream(planned)
+
+    def _stream(self, planned: Planned) -> Iterator[Any]:
+        try:
+            for i, chunk in enumerate(chunk_payloads(planned)):
+                if i and planned.token_delay:
+                    time.sleep(planned.token_delay)
+                yield to_namespace(chunk)
+        finally:
+            self.backend.finish(planned)
+
+
+class AsyncLocalLLMClient:
+    """
+    Asyncio counterpart of LocalLLMClient: `await client.chat.completions.create(...)`;
+    with `stream=True` the awaited result is an async iterator of chunks.
+    """
+
+    def __init__(self, backend: Optional[LocalLLMBackend] = None, **backend_kwargs):
+        self.backend = backend or LocalLLMBackend(**backend_kwargs)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request: Any):
+        planned = self.backend.plan(request)
+        if not request.get("stream"):
+            try:
+                delay = planned.first_token_delay + planned.token_delay * len(planned.pieces)
+                if delay:
+                    await asyncio.sleep(delay)
+                if planned.error is not None:
+                    raise planned.error
+                return to_namespace(planned.payload)
+            finally:
+                self.backend.finish(planned)
+        try:
+            if planned.first_token_delay:
+                await asyncio.sleep(planned.first_token_delay)
+            if planned.error is not None:
+                raise planned.error
+        except BaseException:
+            self.backend.finish(planned)
+            raise
+        return self._stream(planned)
+
+    async def _stream(self, planned: Planned) -> AsyncIterator[Any]:
+        try:
+            for i, chunk in enumerate(chunk_payloads(planned)):
+                if i and planned.token_delay:
+                    await asyncio.sleep(planned.token_delay)
+                yield to_namespace(chunk)
+        finally:
+            self.backend.finish(planned)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._json(200, {"object": "list", "data": [{"id": "local", "object": "model"}]})
+        else:
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as exc:
+            self._json(400, {"error": {"message": f"Invalid JSON body: {exc}", "type": "invalid_request_error"}})
+            return
+
+        backend = self.server.backend
+        planned = backend.plan(request)
+        try:
+            if not request.get("stream"):
+                time.sleep(planned.first_token_delay + planned.token_delay * len(planned.pieces))
+            else:
+                time.sleep(planned.first_token_delay)
+            if planned.error is not None:
+                headers = planned.error.response.headers
+                self._json(planned.error.status_code, {
+                    "error": {"message": planned.error.message, "type": "rate_limit_error"
+                              if planned.error.status_code == 429 else "server_error"}
+                }, headers)
+            elif not request.get("stream"):
+                self._json(200, planned.payload)
+            else:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for i, chunk in enumerate(chunk_payloads(planned)):
+                    if i and planned.token_delay:
+                        time.sleep(planned.token_delay)
+                    self.wfile.write(b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n")
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+        finally:
+            backend.finish(planned)
+
+    def _json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], backend: LocalLLMBackend):
+        super().__init__(address, _Handler)
+        self.backend = backend
+
+
+class LocalLLMServer:
+    """
+    The backend behind a local HTTP server speaking the OpenAI REST API
+    (POST /v1/chat/completions, streamed as server-sent events; GET /v1/models).
+    Port 0 picks a free port; use as a context manager or call start()/stop():
+
+        with LocalLLMServer(LocalLLMBackend(seed=1)) as server:
+            client = openai.OpenAI(base_url=server.base_url, api_key="local")
+    """
+
+    def __init__(self, backend: Optional[LocalLLMBackend] = None, host: str = "127.0.0.1", port: int = 0):
+        self.backend = backend or LocalLLMBackend()
+        self._server = _Server((host, port), self.backend)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self._server.server_address[0]}:{self.port}/v1"
+
+    def start(self) -> "LocalLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.stop()
+        return False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m llm.local_client", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", choices=LATENCY_KINDS, default="fixed")
+    parser.add_argument("--mean", type=float, default=0.0, help="mean time to first token, seconds")
+    parser.add_argument("--spread", type=float, default=0.0)
+    parser.add_argument("--per-token", type=float, default=0.0, help="seconds per completion token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 5xx")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests failing with 429")
+    parser.add_argument("--retry-after", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=None, help="concurrent requests beyond this get 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    backend = LocalLLMBackend(
+        latency=LatencyModel(args.latency, args.mean, args.spread, args.per_token),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        max_in_flight=args.max_in_flight,
+        seed=args.seed,
+    )
+    server = LocalLLMServer(backend, args.host, args.port)
+    print(f"Serving on {server.base_url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(json.dumps(vars(backend.stats)), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,38 @@
 from .yaml_prompt_loader import YamlPromptLoader
-from typing import Iterable
+from .token_budget import (
+    DEFAULT_MAX_CELL_CHARS,
+    SECTION_DROP_ORDER,
+    PromptBudgetReport,
+    compact_sample,
+    drop_sample_rows,
+    estimate_tokens,
+    sample_row_count,
+)
+from typing import Any, Dict, Iterable, Sequence, Tuple
+
+# Keyword argument of build_geo_aware_prompt that enables each optional section
+SECTION_FLAGS = {
+    "profile": "use_profile",
+    "semantic": "use_semantic_profile",
+    "topic": "use_topic",
+}
+
+def geo_profile_text(geo_profile) -> str:
+    return (
+        f"Spatial role: {geo_profile.spatial_role}\n"
+        f"Geometry type: {geo_profile.geometry_type}\n"
+        f"Spatial resolution: {geo_profile.spatial_resolution}\n"
+        f"Spatial use cases: {', '.join(geo_profile.spatial_use_cases)}"
+    )
+
 
 class GeoAwarePromptBuilder:
     
     def __init__(self, prompt_type="dataset_description"):
+        # Templates are compiled once per process (see load_prompts), not per builder
         self.loader = YamlPromptLoader("prompts.yaml")
         self.blocks = self.loader.get(prompt_type)
+        self.templates = self.loader.compiled.templates[prompt_type]
         self.system_message = self.blocks["system_message"]
         self.description_words = 150
 
@@ -26,14 +53,14 @@ class GeoAwarePromptBuilder:
         """
         # Introduction
         sections: Iterable[str] = [
-            self.blocks["introduction"].format(dataset_sample=dataset_sample)
+            self.templates["introduction"].format(dataset_sample=dataset_sample)
         ]
         prompt_parts = list(sections)
 
         # Profile
         if use_profile and dataset_profile:
             prompt_parts.append(
-                self.blocks["profile_instruction"].format(
+                self.templates["profile_instruction"].format(
                     dataset_profile=dataset_profile
                 )
             )
@@ -41,30 +68,23 @@ class GeoAwarePromptBuilder:
         # Semantic
         if use_semantic_profile and semantic_profile:
             prompt_parts.append(
-                self.blocks["semantic_instruction"].format(
+                self.templates["semantic_instruction"].format(
                     semantic_profile=semantic_profile
                 )
             )
 
         # Geo
         if use_geo_profile and geo_profile:
-            geo_text = (
-                f"Spatial role: {geo_profile.spatial_role}\n"
-                f"Geometry type: {geo_profile.geometry_type}\n"
-                f"Spatial resolution: {geo_profile.spatial_resolution}\n"
-                f"Spatial use cases: {', '.join(geo_profile.spatial_use_cases)}"
-            )
-
             prompt_parts.append(
-                self.blocks["geospatial_instruction"].format(
-                    geospatial_profile=geo_text
+                self.templates["geospatial_instruction"].format(
+                    geospatial_profile=geo_profile_text(geo_profile)
                 )
             )
 
         # Topic
         if use_topic and data_topic:
             prompt_parts.append(
-                self.blocks["topic_instruction"].format(
+                self.templates["topic_instruction"].format(
                     data_topic=data_topic
                 )
             )
@@ -79,6 +99,76 @@ class GeoAwarePromptBuilder:
 
         return "\n".join(prompt_parts)
     
+    def build_geo_aware_prompt_within_budget(
+        self,
+        token_budget: int,
+        dataset_sample: str,
+        max_cell_chars: int = DEFAULT_MAX_CELL_CHARS,
+        **prompt_kwargs
+    ) -> Tuple[str, PromptBudgetReport]:
+        """
+        Token-budget mode of build_geo_aware_prompt (same keyword arguments).
+        Oversized sample cells are compacted (WKT becomes type, vertex count and bbox),
+        then optional sections are dropped in SECTION_DROP_ORDER and finally trailing
+        sample rows, until the estimated prompt size fits `token_budget`.
+        The geospatial section is never dropped.
+        """
+        report = PromptBudgetReport(token_budget=token_budget)
+        dataset_sample, report.compacted_cells = compact_sample(dataset_sample, max_cell_chars)
+
+        prompt = self.build_geo_aware_prompt(dataset_sample=dataset_sample, **prompt_kwargs)
+        report.estimated_tokens = estimate_tokens(prompt)
+
+        for section in SECTION_DROP_ORDER:
+            flag = SECTION_FLAGS[section]
+            if report.fits:
+                break
+            if prompt_kwargs.get(flag):
+                prompt_kwargs[flag] = False
+                report.dropped_sections.append(section)
+                prompt = self.build_geo_aware_prompt(dataset_sample=dataset_sample, **prompt_kwargs)
+                report.estimated_tokens = estimate_tokens(prompt)
+
+        # Last resort: shorten the sample itself, keeping at least one data row
+        keep = sample_row_count(dataset_sample)
+        while not report.fits and keep > 1:
+            keep -= 1
+            shorter, report.dropped_sample_rows = drop_sample_rows(dataset_sample, keep)
+            prompt = self.build_geo_aware_prompt(dataset_sample=shorter, **prompt_kwargs)
+            report.estimated_tokens = estimate_tokens(prompt)
+
+        return prompt, report
+
+    @property
+    def batch_system_message(self) -> str:
+        return self.loader.compiled.templates["batch_description"]["system_message"].text
+
+    def build_batch_prompt(self, items: Sequence[Tuple[str, Dict[str, Any]]]) -> str:
+        """
+        One prompt asking for the description and search expansion of several datasets
+        as a JSON object keyed by dataset id. `items` are (dataset id, kwargs) pairs with
+        the keyword arguments of build_geo_aware_prompt. The instructions, identical for
+        every batch, come first so that providers can reuse their cached prefix; only
+        the per-dataset sections follow.
+        """
+        blocks = self.loader.compiled.templates["batch_description"]
+        prompt_parts = [blocks["instructions"].format(description_words=self.description_words)]
+        for dataset_id, kwargs in items:
+            prompt_parts.append(blocks["dataset_header"].format(
+                dataset_id=dataset_id, dataset_sample=kwargs["dataset_sample"]
+            ))
+            if kwargs.get("use_profile") and kwargs.get("dataset_profile"):
+                prompt_parts.append(blocks["profile_section"].format(dataset_profile=kwargs["dataset_profile"]))
+            if kwargs.get("use_semantic_profile") and kwargs.get("semantic_profile"):
+                prompt_parts.append(blocks["semantic_section"].format(semantic_profile=kwargs["semantic_profile"]))
+            if kwargs.get("use_geo_profile") and kwargs.get("geo_profile"):
+                prompt_parts.append(blocks["geospatial_section"].format(
+                    geospatial_profile=geo_profile_text(kwargs["geo_profile"])
+                ))
+            if kwargs.get("use_topic") and kwargs.get("data_topic"):
+                prompt_parts.append(blocks["topic_section"].format(data_topic=kwargs["data_topic"]))
+        return "\n".join(prompt_parts)
+
     def build_geo_search_prompt(
         self,
         description: str,
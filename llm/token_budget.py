@@ -0,0 +1,91 @@
+import csv
+import io
+import math
+import re
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+# Cells longer than this are compacted before they reach a prompt
+DEFAULT_MAX_CELL_CHARS = 200
+
+# Optional prompt sections, in the order they are dropped when over budget
+SECTION_DROP_ORDER = ["profile", "semantic", "topic"]
+
+TOKEN_PIECE_REGEX = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+# What the budgeted prompt builder changed to fit the budget
+@dataclass
+class PromptBudgetReport:
+    token_budget: int
+    estimated_tokens: int = 0
+    compacted_cells: int = 0
+    dropped_sections: List[str] = field(default_factory=list)
+    dropped_sample_rows: int = 0
+
+    @property
+    def fits(self) -> bool:
+        return self.estimated_tokens <= self.token_budget
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Offline token estimate close to BPE tokenizers: words cost about one token per five
+    letters, digit runs one per three digits, and every punctuation mark one token.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in TOKEN_PIECE_REGEX.findall(text):
+        if piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece[0].isalpha():
+            tokens += math.ceil(len(piece) / 5)
+        else:
+            tokens += 1
+    return tokens
+
+
+def truncate_cell(value: str, max_chars: int = DEFAULT_MAX_CELL_CHARS) -> str:
+    return f"{value[:max_chars]}... [+{len(value) - max_chars} chars]"
+
+
+def compact_sample(dataset_sample: str, max_cell_chars: int = DEFAULT_MAX_CELL_CHARS) -> Tuple[str, int]:
+    """
+    Compacts oversized cells of a CSV sample (WKT geometries become summaries, other long
+    text is truncated). Returns the new sample and the number of cells compacted.
+    """
+    rows = list(csv.reader(io.StringIO(dataset_sample)))
+    oversized = [(row, i) for row in rows for i, cell in enumerate(row) if len(cell) > max_cell_chars]
+    if not oversized:
+        return dataset_sample, 0
+
+    # All oversized cells are parsed as one geometry column; NumPy/pandas are only
+    # imported once a sample actually needs compacting
+    from geo_profiler.geometry import parse_wkt
+    geometries = parse_wkt([row[i] for row, i in oversized])
+    for k, (row, i) in enumerate(oversized):
+        summary = geometries.summary(k)
+        row[i] = summary if summary is not None else truncate_cell(row[i], max_cell_chars)
+
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerows(rows)
+    return out.getvalue(), len(oversized)
+
+
+def sample_row_count(dataset_sample: str) -> int:
+    return max(0, sum(1 for _ in csv.reader(io.StringIO(dataset_sample))) - 1)
+
+
+def drop_sample_rows(dataset_sample: str, keep: int) -> Tuple[str, int]:
+    """
+    Keeps the header and the first `keep` data rows of a CSV sample.
+    Returns the new sample and the number of rows dropped.
+    """
+    rows = list(csv.reader(io.StringIO(dataset_sample)))
+    dropped = max(0, len(rows) - 1 - keep)
+    if not dropped:
+        return dataset_sample, 0
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerows(rows[: keep + 1])
+    return out.getvalue(), dropped
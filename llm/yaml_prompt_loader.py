@@ -1,16 +1,129 @@
+import os
+import string
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional, Tuple
 import yaml
 
-class YamlPromptLoader:
-    def __init__(self, yaml_path: str):
-        base_dir = Path(__file__).resolve().parent  # llm/
-        full_path = base_dir / yaml_path             # llm/prompts.yaml
+PROMPTS_DIR = Path(__file__).resolve().parent  # llm/
+
+# libyaml's C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Blocks of each known prompt type and the placeholders each one may use
+PROMPT_BLOCKS = {
+    "dataset_description": {
+        "introduction": {"dataset_sample"},
+        "profile_instruction": {"dataset_profile"},
+        "semantic_instruction": {"semantic_profile"},
+        "geospatial_instruction": {"geospatial_profile"},
+        "topic_instruction": {"data_topic"},
+        "closing_instruction": set(),
+        "system_message": set(),
+    },
+    "batch_description": {
+        "system_message": set(),
+        "instructions": {"description_words"},
+        "dataset_header": {"dataset_id", "dataset_sample"},
+        "profile_section": {"dataset_profile"},
+        "semantic_section": {"semantic_profile"},
+        "geospatial_section": {"geospatial_profile"},
+        "topic_section": {"data_topic"},
+    },
+}
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    One prompt block, parsed once: its text and the placeholder names it uses.
+    """
+    text: str
+    fields: FrozenSet[str]
+
+    def format(self, **values: Any) -> str:
+        return self.text.format(**values) if self.fields else self.text
+
+
+@dataclass(frozen=True)
+class CompiledPrompts:
+    path: str
+    stamp: Tuple[int, int]                              # (mtime_ns, size) of the file when loaded
+    prompts: Dict[str, Any]                             # raw YAML content
+    templates: Dict[str, Dict[str, PromptTemplate]]     # prompt type -> block -> template
+
+    def get(self, key: str):
+        return self.prompts.get(key)
 
-        if not full_path.exists():
-            raise FileNotFoundError(f"Prompt file not found at: {full_path}")
 
-        with open(full_path, "r", encoding="utf-8") as f:
-            self.prompts = yaml.safe_load(f)
+def compile_prompts(path: str, stamp: Tuple[int, int] = (0, 0)) -> CompiledPrompts:
+    """
+    Parses and validates a prompts YAML file. Every known prompt type must define all
+    of its blocks as strings using only their allowed placeholders; ValueError otherwise.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        prompts = yaml.load(f, Loader=_YAML_LOADER)
+    if not isinstance(prompts, dict):
+        raise ValueError(f"{path}: expected a mapping of prompt types")
+
+    templates: Dict[str, Dict[str, PromptTemplate]] = {}
+    for prompt_type, blocks in prompts.items():
+        if not isinstance(blocks, dict):
+            continue
+        compiled = {}
+        for block, text in blocks.items():
+            if not isinstance(text, str):
+                raise ValueError(f"{path}: {prompt_type}.{block} must be a string")
+            try:
+                fields = frozenset(name for _, name, _, _ in string.Formatter().parse(text) if name is not None)
+            except ValueError as exc:
+                raise ValueError(f"{path}: {prompt_type}.{block} is not a valid template: {exc}") from None
+            compiled[block] = PromptTemplate(text, fields)
+        templates[prompt_type] = compiled
+
+    for prompt_type, expected in PROMPT_BLOCKS.items():
+        compiled = templates.get(prompt_type, {})
+        for block, allowed in expected.items():
+            if block not in compiled:
+                raise ValueError(f"{path}: {prompt_type} is missing the {block} block")
+            unknown = compiled[block].fields - allowed
+            if unknown:
+                raise ValueError(f"{path}: {prompt_type}.{block} uses unknown placeholders {sorted(unknown)}")
+    return CompiledPrompts(path, stamp, prompts, templates)
+
+
+# Process-wide registry of compiled prompt files, keyed by resolved path
+_registry: Dict[str, CompiledPrompts] = {}
+_registry_lock = threading.Lock()
+
+
+def load_prompts(yaml_path: str = "prompts.yaml") -> CompiledPrompts:
+    """
+    Compiled prompts of `yaml_path` (relative to llm/). The file is parsed once per
+    process; later calls only stat it and re-compile when its mtime or size changed.
+    """
+    full_path = os.path.join(PROMPTS_DIR, yaml_path)
+    try:
+        info = os.stat(full_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt file not found at: {full_path}") from None
+    stamp = (info.st_mtime_ns, info.st_size)
+
+    cached: Optional[CompiledPrompts] = _registry.get(full_path)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    with _registry_lock:
+        cached = _registry.get(full_path)
+        if cached is None or cached.stamp != stamp:
+            cached = _registry[full_path] = compile_prompts(full_path, stamp)
+    return cached
+
+
+class YamlPromptLoader:
+    def __init__(self, yaml_path: str):
+        self.compiled = load_prompts(yaml_path)
+        self.prompts = self.compiled.prompts
 
     def get(self, key: str):
-        return self.prompts.get(key)
\ No newline at end of file
+        return self.prompts.get(key)